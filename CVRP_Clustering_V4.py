@@ -27,122 +27,134 @@
 
 
 import numpy as np
-from typing import List, Dict, Tuple
-import matplotlib.pyplot as plt
+from typing import List, Dict, Optional, Sequence, Tuple, Union
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+import heapq
 import math
+import os
 import re
-from scipy.spatial import ConvexHull
-import math 
-from typing import Dict, Tuple
-import numpy as np
+
+from CVRP_Distance import DEFAULT_EDGE_WEIGHT_TYPE, DistanceMatrix, distance_matrix, haversine_matrix
+from CVRP_Parser import parse_string, read_instance
 
 class CVRPParser:
     """Parser for CVRP problem instances in TSPLIB format."""
     
     @staticmethod
     def parse_file(file_content: str) -> Tuple[Dict, Dict, int, int, int]:
-        """Parse CVRP file content and extract problem information."""
-        lines = file_content.strip().split('\n')
-        coordinates = {}
-        demands = {}
-        capacity = 0
-        num_nodes = 0
-        num_vehicles = 0
-        
-        reading_coords = False
-        reading_demands = False
-        
-        for line in lines:
-            line = line.strip()
-            
-            if not line:
-                continue
-                
-            if 'DIMENSION' in line:
-                num_nodes = int(line.split(':')[1].strip())
-            elif 'CAPACITY' in line:
-                capacity = int(line.split(':')[1].strip())
-            elif 'NAME' in line:
-                match = re.search(r'k(\d+)', line)
-                if match:
-                    num_vehicles = int(match.group(1))
-            elif line == 'NODE_COORD_SECTION':
-                reading_coords = True
-                reading_demands = False
-                continue
-            elif line == 'DEMAND_SECTION':
-                reading_coords = False
-                reading_demands = True
-                continue
-            elif line == 'DEPOT_SECTION':
-                break
-            
-            if reading_coords:
-                parts = line.split()
-                if len(parts) == 3:
-                    node_id = int(parts[0])
-                    x = float(parts[1])
-                    y = float(parts[2])
-                    coordinates[node_id] = (x, y)
-            
-            if reading_demands:
-                parts = line.split()
-                if len(parts) == 2:
-                    node_id = int(parts[0])
-                    demand = int(parts[1])
-                    demands[node_id] = demand
-        
-        return coordinates, demands, capacity, num_nodes, num_vehicles
+        """Parse CVRP file content and extract problem information (see CVRP_Parser)."""
+        instance = parse_string(file_content)
+        return (instance.coordinates, instance.demands, instance.capacity,
+                instance.dimension, instance.num_vehicles)
+
+    @staticmethod
+    def parse_edge_weight_type(file_content: str, default: str = DEFAULT_EDGE_WEIGHT_TYPE) -> str:
+        """Return the EDGE_WEIGHT_TYPE of the file, or default when it has none."""
+        match = re.search(r'^\s*EDGE_WEIGHT_TYPE\s*:\s*(\S+)', file_content, re.MULTILINE)
+        return match.group(1).upper() if match else default
 
 class CVRPSweepCluster:
+    """
+    Sweep clustering of CVRP customers around the depot.
+    
+    Nodes are held as NumPy arrays (node_ids, points, demand_array, angles,
+    radii) indexed by row; the coordinates / demands / polar_angles /
+    distances dicts of the original API are built from them on first use.
+    """
+    
     def __init__(self, coordinates: Dict[int, Tuple[float, float]], 
                  demands: Dict[int, int], 
                  capacity: int,
                  num_vehicles: int,
                  depot_id: int = 1):
         """Initialize the CVRP sweep clustering algorithm."""
-        self.coordinates = coordinates
-        self.demands = demands
+        node_ids = np.fromiter(coordinates, dtype=np.int64, count=len(coordinates))
+        points = np.array(list(coordinates.values()), dtype=float).reshape(-1, 2)
+        demand_array = np.array([demands.get(n, 0) for n in coordinates])
+        self._setup(node_ids, points, demand_array, capacity, num_vehicles, depot_id)
+        self._coordinates = coordinates
+        self._demands = demands
+    
+    @classmethod
+    def from_arrays(cls, node_ids: np.ndarray, points: np.ndarray, demands: np.ndarray,
+                    capacity: int, num_vehicles: int, depot_id: int = 1) -> 'CVRPSweepCluster':
+        """Build the clusterer straight from arrays, without per-node dicts."""
+        clusterer = cls.__new__(cls)
+        clusterer._setup(np.asarray(node_ids, dtype=np.int64),
+                         np.asarray(points, dtype=float).reshape(-1, 2),
+                         np.asarray(demands), capacity, num_vehicles, depot_id)
+        return clusterer
+    
+    def _setup(self, node_ids, points, demand_array, capacity, num_vehicles, depot_id):
         self.capacity = capacity
         self.num_vehicles = num_vehicles
         self.depot_id = depot_id
+        self.sweep_start = 0
+        self.node_ids = node_ids
+        self.points = points
+        self.demand_array = demand_array
+        self._coordinates = self._demands = None
+        self._polar_angles = self._distances = None
+        
+        # Node ID -> row lookup table
+        self._row = np.full(int(node_ids.max()) + 1, -1, dtype=np.intp)
+        self._row[node_ids] = np.arange(len(node_ids))
         
-        # Convert depot-relative polar coordinates
-        self.depot_coord = np.array(coordinates[depot_id])
-        self.polar_angles = {}
-        self.distances = {}
-        
-        for node_id, coord in coordinates.items():
-            if node_id != depot_id:
-                dx = coord[0] - self.depot_coord[0]
-                dy = coord[1] - self.depot_coord[1]
-                angle = math.atan2(dy, dx)
-                angle_deg = math.degrees(angle)
-                if angle_deg < 0:
-                    angle_deg += 360
-                self.polar_angles[node_id] = angle_deg
-                self.distances[node_id] = math.sqrt(dx*dx + dy*dy)
+        # Depot-relative polar coordinates of every node, angles in [0, 360)
+        self.depot_coord = self.points[self._row[depot_id]]
+        self.customers = np.flatnonzero(node_ids != depot_id)
+        delta = self.points - self.depot_coord
+        self.angles = np.degrees(np.arctan2(delta[:, 1], delta[:, 0]))
+        self.angles[self.angles < 0] += 360
+        self.radii = np.sqrt(delta[:, 0] * delta[:, 0] + delta[:, 1] * delta[:, 1])
+    
+    @property
+    def coordinates(self) -> Dict[int, Tuple[float, float]]:
+        if self._coordinates is None:
+            self._coordinates = dict(zip(self.node_ids.tolist(), map(tuple, self.points.tolist())))
+        return self._coordinates
+    
+    @property
+    def demands(self) -> Dict[int, int]:
+        if self._demands is None:
+            self._demands = dict(zip(self.node_ids.tolist(), self.demand_array.tolist()))
+        return self._demands
+    
+    @property
+    def polar_angles(self) -> Dict[int, float]:
+        if self._polar_angles is None:
+            self._polar_angles = dict(zip(self.node_ids[self.customers].tolist(),
+                                          self.angles[self.customers].tolist()))
+        return self._polar_angles
+    
+    @property
+    def distances(self) -> Dict[int, float]:
+        if self._distances is None:
+            self._distances = dict(zip(self.node_ids[self.customers].tolist(),
+                                       self.radii[self.customers].tolist()))
+        return self._distances
+    
+    def rows(self, nodes) -> np.ndarray:
+        """Row indices of the given node IDs."""
+        return self._row[np.asarray(nodes, dtype=np.int64)]
     
     def calculate_cluster_center(self, cluster: List[int]) -> Tuple[float, float]:
         """Calculate the center (centroid) of a cluster."""
-        if not cluster:
+        if len(cluster) == 0:
             return self.depot_coord
-        coords = np.array([self.coordinates[n] for n in cluster])
-        return tuple(np.mean(coords, axis=0))
+        return tuple(np.mean(self.points[self.rows(cluster)], axis=0))
     
     def calculate_cluster_distance(self, cluster1: List[int], cluster2: List[int]) -> float:
         """Calculate the minimum distance between any two points in different clusters."""
-        min_dist = float('inf')
-        for n1 in cluster1:
-            for n2 in cluster2:
-                dist = math.sqrt(sum((self.coordinates[n1][i] - self.coordinates[n2][i])**2 
-                                   for i in range(2)))
-                min_dist = min(min_dist, dist)
-        return min_dist
+        if len(cluster1) == 0 or len(cluster2) == 0:
+            return float('inf')
+        delta = self.points[self.rows(cluster1)][:, None, :] - self.points[self.rows(cluster2)][None, :, :]
+        return float(np.sqrt(delta[..., 0]**2 + delta[..., 1]**2).min())
     
     def get_cluster_demand(self, cluster: List[int]) -> int:
         """Calculate total demand for a cluster."""
-        return sum(self.demands[n] for n in cluster)
+        return self.demand_array[self.rows(cluster)].sum().item() if len(cluster) else 0
     
     def find_best_clusters_to_merge(self, clusters: List[List[int]]) -> Tuple[int, int]:
         """Find the best pair of clusters to merge based on multiple criteria."""
@@ -178,52 +190,108 @@ class CVRPSweepCluster:
         return best_pair
     
     def merge_clusters(self, clusters: List[List[int]]) -> List[List[int]]:
-        """Merge clusters until we have exactly num_vehicles clusters."""
-        while len(clusters) > self.num_vehicles:
-            i, j = self.find_best_clusters_to_merge(clusters)
-            
-            # Merge clusters[j] into clusters[i]
-            clusters[i].extend(clusters[j])
-            clusters.pop(j)
-            
-            # Sort nodes within merged cluster by polar angle
-            clusters[i].sort(key=lambda x: self.polar_angles[x])
+        """
+        Merge clusters until we have exactly num_vehicles clusters.
         
-        return clusters
-    
-    def create_initial_clusters(self) -> List[List[int]]:
-        """Create initial clusters using sweep algorithm with capacity constraints."""
-        # Sort nodes by polar angle
-        sorted_nodes = sorted(self.polar_angles.keys(), 
-                            key=lambda x: self.polar_angles[x])
+        Makes the same merges as repeatedly calling find_best_clusters_to_merge,
+        but caches each cluster's demand, centre angle and KD-tree and keeps the
+        feasible pair scores in a heap, so a merge only scores the pairs that
+        involve the merged cluster.
+        """
+        from scipy.spatial import cKDTree
+        
+        # Cluster ids follow list order; a merged cluster keeps the smaller id,
+        # so (score, id, id) heap order breaks ties like the pair scan
+        members = {c: self.rows(cluster) for c, cluster in enumerate(clusters)}
+        demand, angle, tree, version = {}, {}, {}, {}
+        
+        def summarize(c):
+            rows = members[c]
+            demand[c] = self.demand_array[rows].sum().item()
+            center = np.mean(self.points[rows], axis=0)
+            angle[c] = math.atan2(center[1] - self.depot_coord[1], 
+                                  center[0] - self.depot_coord[0])
+            tree[c] = cKDTree(self.points[rows])
+            version[c] = version.get(c, -1) + 1
+        
+        def candidate(a, b):
+            # Nearest node pair from the KD-tree, measured as calculate_cluster_distance does
+            small, large = (a, b) if len(members[a]) <= len(members[b]) else (b, a)
+            gaps, nearest = tree[large].query(self.points[members[small]])
+            k = int(np.argmin(gaps))
+            dx, dy = (self.points[members[small][k]] - self.points[members[large][nearest[k]]]).tolist()
+            distance = math.sqrt(dx**2 + dy**2)
+            angle_diff = abs(math.degrees(angle[a] - angle[b]))
+            if angle_diff > 180:
+                angle_diff = 360 - angle_diff
+            return (distance + 2 * angle_diff, a, b, version[a], version[b])
+        
+        for c in members:
+            summarize(c)
+        demands = np.array([demand[c] for c in range(len(clusters))])
+        feasible = np.triu(demands[:, None] + demands[None, :] <= self.capacity, 1)
+        heap = [candidate(a, b) for a, b in np.argwhere(feasible).tolist()]
+        heapq.heapify(heap)
         
-        clusters = []
-        current_cluster = []
-        current_demand = 0
+        def stale(entry):
+            _, a, b, version_a, version_b = entry
+            return (a not in members or b not in members
+                    or version[a] != version_a or version[b] != version_b)
         
-        for node in sorted_nodes:
-            node_demand = self.demands[node]
+        while len(members) > self.num_vehicles:
+            while heap and stale(heap[0]):
+                heapq.heappop(heap)
+            if not heap:
+                # No pair fits the capacity; the pair scan then returns (0, 0),
+                # which drops the first cluster
+                del members[min(members)]
+                continue
+            _, a, b, _, _ = heapq.heappop(heap)
             
-            # If adding this node would exceed capacity, start new cluster
-            if current_demand + node_demand > self.capacity:
-                if current_cluster:
-                    clusters.append(current_cluster)
-                current_cluster = [node]
-                current_demand = node_demand
-            else:
-                current_cluster.append(node)
-                current_demand += node_demand
+            # Merge cluster b into cluster a, sorted by polar angle
+            merged = np.concatenate([members[a], members.pop(b)])
+            members[a] = merged[np.argsort(self.angles[merged], kind='stable')]
+            summarize(a)
+            for c in members:
+                if c != a and demand[a] + demand[c] <= self.capacity:
+                    heapq.heappush(heap, candidate(min(a, c), max(a, c)))
         
-        # Add final cluster if not empty
-        if current_cluster:
-            clusters.append(current_cluster)
+        return [self.node_ids[members[c]].tolist() for c in sorted(members)]
+    
+    def sweep_cut(self, order: np.ndarray) -> List[np.ndarray]:
+        """
+        Cut rows, in sweep order, into consecutive runs that fit the capacity.
+        
+        Each run is extended while its demand stays within capacity, found by
+        binary search on the cumulative demand; a node whose demand alone
+        exceeds capacity gets a run of its own.
+        """
+        if len(order) == 0:
+            return []
+        prefix = np.concatenate(([0], np.cumsum(self.demand_array[order])))
+        cuts = [0]
+        while cuts[-1] < len(order):
+            start = cuts[-1]
+            end = int(np.searchsorted(prefix, prefix[start] + self.capacity, side='right')) - 1
+            cuts.append(max(end, start + 1))
+        return np.split(order, cuts[1:-1])
+    
+    def create_initial_clusters(self, start: int = 0) -> List[List[int]]:
+        """
+        Create initial clusters using sweep algorithm with capacity constraints.
         
-        return clusters
+        start rotates the sweep to begin at the start-th node in angle order.
+        """
+        # Sort nodes by polar angle
+        order = self.customers[np.argsort(self.angles[self.customers], kind='stable')]
+        order = np.roll(order, -start)
+        return [self.node_ids[rows].tolist() for rows in self.sweep_cut(order)]
     
-    def create_clusters(self) -> Tuple[List[List[int]], List[int]]:
-        """Create exactly num_vehicles clusters."""
+    def create_clusters(self, start: int = 0) -> Tuple[List[List[int]], List[int]]:
+        """Create exactly num_vehicles clusters, sweeping from the start-th node."""
         # Create initial clusters
-        clusters = self.create_initial_clusters()
+        self.sweep_start = start
+        clusters = self.create_initial_clusters(start)
         
         # If we have too many clusters, merge them
         if len(clusters) > self.num_vehicles:
@@ -234,8 +302,76 @@ class CVRPSweepCluster:
         
         return clusters, cluster_demands
     
+    def estimate_route_cost(self, clusters: List[List[int]]) -> float:
+        """
+        Cheap estimate of the total route length of a partition: each cluster is
+        driven from the depot through its nodes in the given (polar) order and
+        back, measured as straight lines in the coordinate plane.
+        """
+        clusters = [cluster for cluster in clusters if len(cluster)]
+        if not clusters:
+            return 0.0
+        sizes = np.fromiter(map(len, clusters), dtype=np.intp, count=len(clusters))
+        ends = np.cumsum(sizes)
+        rows = self.rows(np.concatenate(clusters))
+        legs = np.diff(self.points[rows], axis=0)
+        legs = np.sqrt(legs[:, 0]**2 + legs[:, 1]**2)
+        legs[ends[:-1] - 1] = 0.0  # last node of a cluster to the first of the next
+        return float(legs.sum() + self.radii[rows[ends - sizes]].sum() + self.radii[rows[ends - 1]].sum())
+    
+    def create_clusters_multistart(self, starts: Union[str, int, Sequence[int]] = 'all',
+                                   workers: Optional[int] = None
+                                   ) -> Tuple[List[List[int]], List[int]]:
+        """
+        Run create_clusters from several sweep starts and keep the cheapest.
+        
+        Candidates are ranked by estimate_route_cost; a partition that had to
+        drop customers in merge_clusters ranks behind every complete one.
+        
+        Args:
+            starts: 'all' to try every starting node, an int for that many
+                evenly spaced starts, or explicit offsets into the angle order
+            workers: Process pool size, defaults to the CPU count; 1 runs serially
+            
+        Returns:
+            Same as create_clusters, for the best start
+        """
+        num_customers = len(self.customers)
+        if num_customers == 0:
+            return self.create_clusters()
+        if isinstance(starts, str):
+            if starts != 'all':
+                raise ValueError(f"Unknown sweep starts '{starts}', expected 'all', an int or offsets")
+            starts = range(num_customers)
+        elif isinstance(starts, (int, np.integer)):
+            count = max(1, min(int(starts), num_customers))
+            starts = np.linspace(0, num_customers, count, endpoint=False).astype(int)
+        starts = sorted({int(start) % num_customers for start in starts})
+        
+        workers = min(workers or os.cpu_count() or 1, len(starts))
+        if workers <= 1:
+            scores = _evaluate_sweep_starts(self, starts)
+        else:
+            chunks = [starts[w::workers] for w in range(workers)]
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                scores = [score for chunk in pool.map(_evaluate_sweep_starts, repeat(self), chunks)
+                          for score in chunk]
+        
+        # Lowest (missing customers, cost), ties to the earliest start
+        _, _, best_start = min(scores)
+        return self.create_clusters(best_start)
+    
+    def __getstate__(self):
+        # The dict views are rebuilt from the arrays on demand, don't ship them to workers
+        state = self.__dict__.copy()
+        state.update(_coordinates=None, _demands=None, _polar_angles=None, _distances=None)
+        return state
+    
     def plot_clusters(self, clusters: List[List[int]], show_demands: bool = True):
         """Visualize the clustering solution with sweep regions."""
+        # matplotlib is only needed for plotting, keep it out of solver start-up
+        import matplotlib.pyplot as plt
+
         plt.figure(figsize=(12, 8))
         
         # Plot depot
@@ -296,75 +432,209 @@ class CVRPSweepCluster:
 
 
 
-def create_distance_matrix_geo(coordinates, nodes: List[int]):
+class CVRPCapacitatedKMeans(CVRPSweepCluster):
+    """
+    Capacitated k-means clustering with Fisher-Jaikumar style assignment.
+    
+    Works on the same node arrays as the sweep, but does not depend on the
+    customers being spread radially around the depot. num_vehicles seeds are
+    chosen farthest-first, customers are assigned to seeds by insertion cost
+    in order of decreasing regret while respecting capacity, and the seeds
+    move to their cluster centroids until the assignment settles.
+    """
+    
+    def __init__(self, coordinates: Dict[int, Tuple[float, float]], 
+                 demands: Dict[int, int], 
+                 capacity: int,
+                 num_vehicles: int,
+                 depot_id: int = 1,
+                 max_iter: int = 20):
+        super().__init__(coordinates, demands, capacity, num_vehicles, depot_id)
+        self.max_iter = max_iter
+    
+    @classmethod
+    def from_arrays(cls, node_ids: np.ndarray, points: np.ndarray, demands: np.ndarray,
+                    capacity: int, num_vehicles: int, depot_id: int = 1,
+                    max_iter: int = 20) -> 'CVRPCapacitatedKMeans':
+        clusterer = super().from_arrays(node_ids, points, demands, capacity, num_vehicles, depot_id)
+        clusterer.max_iter = max_iter
+        return clusterer
+    
+    def select_seeds(self, start: int = 0) -> np.ndarray:
+        """
+        Farthest-first seed points: the start-th customer farthest from the
+        depot, then repeatedly the customer farthest from every chosen seed.
+        """
+        points = self.points[self.customers]
+        k = min(self.num_vehicles, len(points))
+        chosen = [np.argsort(-self.radii[self.customers], kind='stable')[start % len(points)]]
+        nearest = np.hypot(*(points - points[chosen[0]]).T)
+        for _ in range(k - 1):
+            chosen.append(int(np.argmax(nearest)))
+            nearest = np.minimum(nearest, np.hypot(*(points - points[chosen[-1]]).T))
+        return points[chosen]
+    
+    def insertion_costs(self, seeds: np.ndarray) -> np.ndarray:
+        """
+        (customers, seeds) Fisher-Jaikumar cost of serving each customer on
+        the route depot -> seed -> depot: d(depot, i) + d(i, s) - d(depot, s).
+        """
+        points = self.points[self.customers]
+        to_seed = np.hypot(points[:, None, 0] - seeds[None, :, 0], points[:, None, 1] - seeds[None, :, 1])
+        seed_radii = np.hypot(*(seeds - self.depot_coord).T)
+        return self.radii[self.customers][:, None] + to_seed - seed_radii[None, :]
+    
+    def assign(self, costs: np.ndarray) -> np.ndarray:
+        """
+        Assign customers to clusters greedily, highest regret first.
+        
+        Each customer goes to its cheapest cluster with room left; one that
+        fits nowhere goes to the cluster with the most room and is moved out
+        again by repair().
+        
+        Returns:
+            np.ndarray: Cluster index of each customer
+        """
+        demands = self.demand_array[self.customers]
+        k = costs.shape[1]
+        preferences = np.argsort(costs, axis=1, kind='stable')
+        if k > 1:
+            ranked = np.take_along_axis(costs, preferences[:, :2], axis=1)
+            regret = ranked[:, 1] - ranked[:, 0]
+        else:
+            regret = np.zeros(len(costs))
+        
+        load = [0] * k
+        labels = np.empty(len(costs), dtype=np.intp)
+        for i in np.lexsort((-demands, -regret)).tolist():
+            demand = demands[i].item()
+            for j in preferences[i].tolist():
+                if load[j] + demand <= self.capacity:
+                    break
+            else:
+                j = int(np.argmin(load))
+            labels[i] = j
+            load[j] += demand
+        return self.repair(labels, costs)
+    
+    def repair(self, labels: np.ndarray, costs: np.ndarray) -> np.ndarray:
+        """
+        Move customers out of over-capacity clusters, cheapest move first,
+        into clusters with room. Stops when no such move is left, so a
+        cluster may still be over capacity (create_clusters checks).
+        """
+        demands = self.demand_array[self.customers]
+        k = costs.shape[1]
+        load = np.bincount(labels, weights=demands, minlength=k)
+        for j in np.flatnonzero(load > self.capacity).tolist():
+            while load[j] > self.capacity:
+                members = np.flatnonzero(labels == j)
+                room = self.capacity - load
+                fits = (demands[members, None] <= room[None, :])
+                fits[:, j] = False
+                if not fits.any():
+                    break
+                delta = np.where(fits, costs[members] - costs[members, j][:, None], np.inf)
+                i, t = np.unravel_index(np.argmin(delta), delta.shape)
+                labels[members[i]] = t
+                load[j] -= demands[members[i]]
+                load[t] += demands[members[i]]
+        return labels
+    
+    def create_clusters(self, start: int = 0) -> Tuple[List[List[int]], List[int]]:
+        """
+        Create up to num_vehicles capacitated clusters.
+        
+        start picks the first seed (see select_seeds), so
+        create_clusters_multistart restarts k-means from different seeds.
+        Clusters are ordered by the polar angle of their centroid and list
+        their nodes in polar order, as the sweep does. If repair() leaves a
+        cluster over capacity, the sweep clusters of the same start are
+        returned instead.
+        """
+        self.sweep_start = start
+        if len(self.customers) == 0:
+            return [], []
+        seeds = self.select_seeds(start)
+        labels = None
+        for _ in range(self.max_iter):
+            new_labels = self.assign(self.insertion_costs(seeds))
+            if labels is not None and np.array_equal(new_labels, labels):
+                break
+            labels = new_labels
+            # Move each seed to its cluster centroid; empty clusters keep their seed
+            counts = np.bincount(labels, minlength=len(seeds))
+            points = self.points[self.customers]
+            for axis in range(2):
+                sums = np.bincount(labels, weights=points[:, axis], minlength=len(seeds))
+                seeds[:, axis] = np.where(counts > 0, sums / np.maximum(counts, 1), seeds[:, axis])
+        
+        load = np.bincount(labels, weights=self.demand_array[self.customers], minlength=len(seeds))
+        if (load > self.capacity).any():
+            # Too tight for k-means to repair; the sweep keeps every cluster within capacity
+            return super().create_clusters(start)
+        
+        angle_order = np.argsort(self.angles[self.customers], kind='stable')
+        clusters = [self.node_ids[self.customers[angle_order[labels[angle_order] == j]]].tolist()
+                    for j in range(len(seeds))]
+        clusters = [cluster for cluster in clusters if cluster]
+        center_angles = [math.atan2(center[1] - self.depot_coord[1], center[0] - self.depot_coord[0])
+                         for center in map(self.calculate_cluster_center, clusters)]
+        clusters = [clusters[c] for c in np.argsort(center_angles, kind='stable')]
+        return clusters, [self.get_cluster_demand(cluster) for cluster in clusters]
     
-    def calculate_geo_distance(coord1: Tuple[float, float], coord2: Tuple[float, float]) -> float:
-        """Calculate great circle distance between two points on Earth."""
-        lat1, lon1 = coord1
-        lat2, lon2 = coord2
-        R = 6371  # Earth's radius in kilometers
-        
-        # Convert degrees to radians
-        phi1 = math.radians(lat1)
-        phi2 = math.radians(lat2)
-        delta_phi = math.radians(lat2 - lat1)
-        delta_lambda = math.radians(lon2 - lon1)
-        
-        # Haversine formula
-        a = (math.sin(delta_phi/2)**2 + 
-             math.cos(phi1) * math.cos(phi2) * math.sin(delta_lambda/2)**2)
-        c = 2 * math.atan2(math.sqrt(a), math.sqrt(1-a))
-        
-        return R * c
-    
-    node_ids = nodes
-    n = len(node_ids)
-    distance_matrix = np.zeros((n, n))
-    for i in range(n):
-            for j in range(n):
-                if i == j:
-                    distance_matrix[i][j] = 0                
-                else:
-                    coord1 = coordinates[node_ids[i]]
-                    coord2 = coordinates[node_ids[j]]
-                    distance = calculate_geo_distance(coord1, coord2)
-                    distance_matrix[i][j] = distance
-        
-    return distance_matrix
 
-def generate_distance_matrix(coordinates: Dict[int, Tuple[float, float]], nodes: List[int]) -> np.ndarray:
-    EARTH_RADIUS_M = 6371.0
+CLUSTERERS = {
+    'sweep': CVRPSweepCluster,
+    'kmeans': CVRPCapacitatedKMeans,
+}
+
+
+def get_clusterer(name: str, *args, **kwargs) -> CVRPSweepCluster:
+    """Create the clustering engine registered under name (see CLUSTERERS)."""
+    if name not in CLUSTERERS:
+        raise ValueError(f"Unknown clustering '{name}', expected one of {sorted(CLUSTERERS)}")
+    return CLUSTERERS[name](*args, **kwargs)
+
+
+def _evaluate_sweep_starts(clusterer: CVRPSweepCluster, starts: List[int]
+                          ) -> List[Tuple[int, float, int]]:
+    """Pool worker: (missing customers, estimated cost, start) of each sweep start."""
+    scores = []
+    for start in starts:
+        clusters, _ = clusterer.create_clusters(start)
+        missing = len(clusterer.customers) - sum(map(len, clusters))
+        scores.append((missing, clusterer.estimate_route_cost(clusters), start))
+    return scores
+
+def create_distance_matrix_geo(coordinates, nodes: List[int]):
+    """Great-circle distance matrix in km between nodes, coordinates as (lat, lon)."""
+    points = np.array([coordinates[node] for node in nodes], dtype=float).reshape(-1, 2)
+    return haversine_matrix(points)
+
+def generate_distance_matrix(coordinates: Dict[int, Tuple[float, float]], nodes: List[int],
+                             edge_weight_type: str = DEFAULT_EDGE_WEIGHT_TYPE) -> np.ndarray:
     """
-    Generate a simple distance matrix for the given nodes.
+    Generate a distance matrix for the given nodes.
+    
+    Prefer building one DistanceMatrix per problem and slicing it per cluster;
+    this computes the matrix of nodes on its own.
     
     Args:
         coordinates: Dictionary mapping node ID to (x, y) coordinates
         nodes: List of node IDs to include in the matrix
+        edge_weight_type: EUC_2D, or GEO for (lat, lon) in degrees
         
     Returns:
         np.ndarray: Distance matrix where entry (i,j) is distance from nodes[i] to nodes[j]
     """
-    n = len(nodes)
-    distance_matrix = np.zeros((n, n), dtype=float)
-
-    # preconvert to radians to save time
-    lats = np.array([np.deg2rad(coordinates[k][0]) for k in nodes])
-    lons = np.array([np.deg2rad(coordinates[k][1]) for k in nodes])
-
-    for i in range(n):
-        # vectorized against all j
-        dlat = lats - lats[i]
-        dlon = lons - lons[i]
-        a = np.sin(dlat/2.0)**2 + np.cos(lats[i]) * np.cos(lats) * np.sin(dlon/2.0)**2
-        c = 2.0 * np.arctan2(np.sqrt(a), np.sqrt(1.0 - a))
-        distance_matrix[i, :] = EARTH_RADIUS_M * c
-
-    np.fill_diagonal(distance_matrix, 0.0)
-    return distance_matrix
+    points = np.array([coordinates[node] for node in nodes], dtype=float).reshape(-1, 2)
+    return distance_matrix(points, edge_weight_type)
 
 def get_cluster_matrices(coordinates: Dict[int, Tuple[float, float]], 
                         clusters: List[List[int]], 
-                        depot_id: int = 1) -> List[np.ndarray]:
+                        depot_id: int = 1,
+                        edge_weight_type: str = DEFAULT_EDGE_WEIGHT_TYPE) -> List[np.ndarray]:
     """
     Generate distance matrices for each cluster including depot.
     
@@ -372,10 +642,12 @@ def get_cluster_matrices(coordinates: Dict[int, Tuple[float, float]],
         coordinates: Dictionary mapping node ID to (x, y) coordinates
         clusters: List of clusters, where each cluster is a list of node IDs
         depot_id: ID of the depot node
+        edge_weight_type: EUC_2D, or GEO for (lat, lon) in degrees
         
     Returns:
         List[np.ndarray]: List of distance matrices, one for each cluster
     """
+    distances = DistanceMatrix.from_coordinates(coordinates, edge_weight_type)
     matrices = []
     i = 0
     for cluster in clusters:
@@ -384,7 +656,7 @@ def get_cluster_matrices(coordinates: Dict[int, Tuple[float, float]],
         # Include depot as first node
         nodes = [depot_id] + cluster
         print(nodes)
-        matrix = generate_distance_matrix(coordinates, nodes)
+        matrix = distances.submatrix(nodes)
         print(type(matrix))
         matrices.append(matrix)
     
@@ -393,10 +665,9 @@ def get_cluster_matrices(coordinates: Dict[int, Tuple[float, float]],
 # Example usage
 if __name__ == "__main__":
     # Parse file and get coordinates (using existing parser)
-    with open('Datasets/E-n33-k4.txt', 'r') as f:
-        file_content = f.read()
-    
-    coordinates, demands, capacity, num_nodes, num_vehicles = CVRPParser.parse_file(file_content)
+    instance = read_instance('Datasets/E-n33-k4.txt')
+    coordinates, demands = instance.coordinates, instance.demands
+    capacity, num_vehicles = instance.capacity, instance.num_vehicles
     
     # Create clusters (using existing sweep clusterer)
     clusterer = CVRPSweepCluster(coordinates, demands, capacity, num_vehicles)
@@ -405,7 +676,8 @@ if __name__ == "__main__":
     clusterer.plot_clusters(clusters)
 
     # Generate distance matrices
-    distance_matrices = get_cluster_matrices(coordinates, clusters)
+    distance_matrices = get_cluster_matrices(
+        coordinates, clusters, edge_weight_type=instance.edge_weight_type)
     
     # Print matrices
     # for i, matrix in enumerate(distance_matrices):
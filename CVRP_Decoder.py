@@ -0,0 +1,167 @@
+#------------------------------------------------------------------------------
+#
+#            (c) Copyright 2025 by QUANFLUENCE PRIVATE LIMITED
+#                          All rights reserved.
+#
+#   Trade Secret of QUANFLUENCE PRIVATE LIMITED  Do not disclose.
+#
+#   Use of this file in any form or means is permitted only
+#   with a valid, written license agreement with QUANFLUENCE PRIVATE LIMTED.
+#   The licensee shall strictly limit use of information contained herein
+#   to the conditions specified in the written license agreement.
+#
+#   Licensee shall keep all information contained herein confidential
+#   and shall protect same in whole or in part from disclosure and
+#   dissemination to all third parties.
+#
+#                         QUANFLUENCE PRIVATE LIMITED
+#                        E-Mail: assist@quanfluence.com
+#                             www.quanfluence.com
+#
+# -----------------------------------------------------------------------------
+#  File:   CVRP_Decoder.py
+#  Author: Rishi Mittal
+#
+#  Description: Vectorized decoding and scoring of TSP sample sets
+#------------------------------------------------------------------------------
+
+from typing import Dict, List, Optional, Sequence, Tuple
+import numpy as np
+
+
+def samples_to_array(results: List[Dict], num_variables: int) -> np.ndarray:
+    """
+    Stack sampler results into a binary sample matrix.
+
+    Args:
+        results: Sampler results, each {'result': {variable: spin}, 'energy': e}
+        num_variables: Number of QUBO variables
+
+    Returns:
+        np.ndarray: (num_samples, num_variables) array of 0/1 values
+    """
+    spins = np.zeros((len(results), num_variables))
+    for s, result in enumerate(results):
+        spin_map = result['result']
+        idx = np.fromiter((int(k) for k in spin_map), dtype=np.int64, count=len(spin_map))
+        spins[s, idx] = np.fromiter(spin_map.values(), dtype=float, count=len(spin_map))
+    return (1 + spins) / 2
+
+
+def expand_reduced_samples(samples: np.ndarray, n_cities: int) -> np.ndarray:
+    """
+    Full (num_samples, n_cities**2) samples from samples of the reduced
+    layout (see CVRP_QUBO.reduced_tsp_qubo_arrays), with city 0 at step 0.
+    """
+    m = n_cities - 1
+    reduced = np.asarray(samples).reshape(-1, m, m)
+    full = np.zeros((len(reduced), n_cities, n_cities))
+    full[:, 0, 0] = 1
+    full[:, 1:, 1:] = reduced
+    return full.reshape(len(reduced), -1)
+
+
+def decode_samples(samples: np.ndarray, n_cities: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Decode a sample set into tours and a validity mask.
+
+    Each sample is viewed as an (n_cities, n_cities) city-by-time matrix. The
+    city of a time slot is the first 1 in its column, as in decode_solution,
+    and a sample is valid when every slot has a city and the slots form a
+    permutation of the cities.
+
+    Args:
+        samples: (num_samples, n_cities**2) binary samples
+        n_cities: Number of cities
+
+    Returns:
+        tours: (num_samples, n_cities) city index per time slot
+        valid: (num_samples,) boolean mask of permutation tours
+    """
+    bits = np.asarray(samples).reshape(-1, n_cities, n_cities) > 0.5
+    tours = bits.argmax(axis=1)
+    has_city = bits.any(axis=1).all(axis=1)
+    is_permutation = (np.sort(tours, axis=1) == np.arange(n_cities)).all(axis=1)
+    return tours, has_city & is_permutation
+
+
+def insert_cheapest(tour: List[int], cities: Sequence[int], distances: np.ndarray) -> List[int]:
+    """Insert each city into the cyclic tour where it adds the least length."""
+    tour = list(tour)
+    for city in cities:
+        if not tour:
+            tour.append(city)
+            continue
+        a = np.array(tour)
+        b = np.roll(a, -1)
+        added = distances[a, city] + distances[city, b] - distances[a, b]
+        tour.insert(int(np.argmin(added)) + 1, city)
+    return tour
+
+
+def repair_tour(bits: np.ndarray, distances: np.ndarray) -> List[int]:
+    """
+    Turn one (n_cities, n_cities) city-by-time bit matrix into a valid tour.
+
+    Cities are matched to time slots by a maximum assignment on the bits, so
+    every 1 that can be kept is kept. Cities that could only be matched to a
+    slot they were not sampled in are taken out and put back by cheapest
+    insertion.
+    """
+    from scipy.optimize import linear_sum_assignment
+
+    bits = np.asarray(bits) > 0.5
+    cities, slots = linear_sum_assignment(bits, maximize=True)
+    kept = bits[cities, slots]
+    tour = cities[kept][np.argsort(slots[kept])].tolist()
+    return insert_cheapest(tour, cities[~kept].tolist(), distances)
+
+
+def repair_samples(samples: np.ndarray, distances: np.ndarray, tours: Optional[np.ndarray] = None,
+                   valid: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Tours of every sample of a sample set, repairing the invalid ones.
+
+    tours / valid from decode_samples can be passed in to avoid decoding twice.
+    """
+    n_cities = len(distances)
+    if tours is None or valid is None:
+        tours, valid = decode_samples(samples, n_cities)
+    tours = tours.copy()
+    bits = np.asarray(samples).reshape(-1, n_cities, n_cities)
+    for s in np.nonzero(~valid)[0]:
+        tours[s] = repair_tour(bits[s], distances)
+    return tours
+
+
+def tour_lengths(tours: np.ndarray, distances: np.ndarray) -> np.ndarray:
+    """Cyclic length of each tour (rows of tours), gathered from the distance matrix."""
+    tours = np.atleast_2d(tours)
+    return distances[tours, np.roll(tours, -1, axis=1)].sum(axis=1)
+
+
+def best_valid_tour(samples: np.ndarray, distances: np.ndarray, repair: bool = False
+                    ) -> Tuple[Optional[List[int]], float, int]:
+    """
+    Pick the shortest valid tour from a sample set.
+
+    With repair, invalid samples are turned into tours by repair_tour and
+    compete with the valid ones instead of being discarded, so a non-empty
+    sample set always yields a tour.
+
+    Returns:
+        tour: City indices of the best tour, None if no sample is valid (and
+            repair is off)
+        length: Its length, inf if there is no tour
+        num_valid: Number of samples that were valid before any repair
+    """
+    tours, valid = decode_samples(samples, len(distances))
+    num_valid = int(valid.sum())
+    if repair and len(tours):
+        tours = repair_samples(samples, distances, tours, valid)
+        valid = np.ones(len(tours), dtype=bool)
+    if not valid.any():
+        return None, float('inf'), 0
+    lengths = np.where(valid, tour_lengths(tours, distances), np.inf)
+    best = int(np.argmin(lengths))
+    return tours[best].tolist(), float(lengths[best]), num_valid
@@ -0,0 +1,168 @@
+#------------------------------------------------------------------------------
+#
+#            (c) Copyright 2025 by QUANFLUENCE PRIVATE LIMITED
+#                          All rights reserved.
+#
+#   Trade Secret of QUANFLUENCE PRIVATE LIMITED  Do not disclose.
+#
+#   Use of this file in any form or means is permitted only
+#   with a valid, written license agreement with QUANFLUENCE PRIVATE LIMTED.
+#   The licensee shall strictly limit use of information contained herein
+#   to the conditions specified in the written license agreement.
+#
+#   Licensee shall keep all information contained herein confidential
+#   and shall protect same in whole or in part from disclosure and
+#   dissemination to all third parties.
+#
+#                         QUANFLUENCE PRIVATE LIMITED
+#                        E-Mail: assist@quanfluence.com
+#                             www.quanfluence.com
+#
+# -----------------------------------------------------------------------------
+#  File:   CVRP_Decomposition.py
+#  Author: Rishi Mittal
+#
+#  Description: Split cluster tours into sub-paths that fit a QUBO variable budget
+#------------------------------------------------------------------------------
+
+from typing import Dict, List, Sequence, Tuple
+import math
+import numpy as np
+
+from CVRP_Distance import DistanceMatrix
+
+# A piece of a route: a path from start through every interior node to end.
+# start and end are fixed, so only the interior order is left to the sampler.
+Piece = Tuple[int, List[int], int]
+
+SPLITS = ('angular', 'spatial')
+
+
+def max_interior(max_variables: int, reduced: bool = False) -> int:
+    """
+    Largest piece interior whose QUBO fits max_variables.
+
+    A piece with m interior nodes is solved as a tour over m + 1 cities (see
+    piece_matrix), i.e. (m + 1)**2 one-hot variables, or m**2 in the reduced
+    formulation where the merged city 0 is fixed at the first step.
+    """
+    m = math.isqrt(int(max_variables)) - (0 if reduced else 1)
+    if m < 1:
+        raise ValueError(f"A budget of {max_variables} QUBO variables cannot hold any piece, "
+                         f"at least {1 if reduced else 4} are needed")
+    return m
+
+
+def angular_order(nodes: Sequence[int], coordinates: Dict[int, Tuple[float, float]],
+                  depot: int) -> List[int]:
+    """Nodes by polar angle around the depot, starting after the widest angular gap."""
+    if len(nodes) < 2:
+        return list(nodes)
+    x0, y0 = coordinates[depot]
+    points = np.array([coordinates[node] for node in nodes], dtype=float)
+    angles = np.arctan2(points[:, 1] - y0, points[:, 0] - x0)
+    order = np.argsort(angles, kind='stable')
+    gaps = np.diff(angles[order], append=angles[order[0]] + 2 * np.pi)
+    order = np.roll(order, -(int(np.argmax(gaps)) + 1))
+    return [nodes[k] for k in order]
+
+
+def spatial_order(nodes: Sequence[int], coordinates: Dict[int, Tuple[float, float]],
+                  start: int) -> List[int]:
+    """Nodes along their principal axis, beginning at the end nearest to start."""
+    if len(nodes) < 2:
+        return list(nodes)
+    points = np.array([coordinates[node] for node in nodes], dtype=float)
+    centred = points - points.mean(axis=0)
+    axis = np.linalg.svd(centred, full_matrices=False)[2][0]
+    projection = centred @ axis
+    if (np.asarray(coordinates[start], dtype=float) - points.mean(axis=0)) @ axis > 0:
+        projection = -projection
+    return [nodes[k] for k in np.argsort(projection, kind='stable')]
+
+
+def split_piece(piece: Piece, distances: DistanceMatrix, coordinates: Dict[int, Tuple[float, float]],
+                limit: int, split: str = 'angular') -> List[Piece]:
+    """
+    Recursively halve a piece until every interior has at most limit nodes.
+
+    The interior (already in angular order for 'angular') is cut in two
+    halves A and B; the shortest edge a -> b between them becomes the bridge,
+    so the piece turns into start -> A -> a and b -> B -> end.
+    """
+    start, interior, end = piece
+    if len(interior) <= limit:
+        return [piece]
+    if split == 'spatial':
+        interior = spatial_order(interior, coordinates, start)
+    half = len(interior) // 2
+    first, second = interior[:half], interior[half:]
+    bridge = distances.submatrix(first + second)[:half, half:]
+    a, b = np.unravel_index(int(np.argmin(bridge)), bridge.shape)
+    a, b = first[a], second[b]
+    return (split_piece((start, [node for node in first if node != a], a), distances,
+                        coordinates, limit, split)
+            + split_piece((b, [node for node in second if node != b], end), distances,
+                          coordinates, limit, split))
+
+
+def decompose_cluster(nodes: Sequence[int], distances: DistanceMatrix,
+                      coordinates: Dict[int, Tuple[float, float]], max_variables: int,
+                      split: str = 'angular', reduced: bool = False) -> List[Piece]:
+    """
+    Pieces of the route of one cluster, in route order.
+
+    Args:
+        nodes: Cluster node IDs, depot first
+        distances: Distances of the whole problem
+        coordinates: Node ID to coordinates, used to order the split
+        max_variables: QUBO variable budget of one piece
+        split: 'angular' (polar angle around the depot) or 'spatial'
+            (principal axis of each piece)
+        reduced: Size pieces for the reduced QUBO formulation
+
+    Returns:
+        list of (start, interior, end); a cluster within the budget is the
+        single piece (depot, customers, depot)
+    """
+    if split not in SPLITS:
+        raise ValueError(f"Unknown split '{split}', expected one of {SPLITS}")
+    depot, customers = nodes[0], list(nodes[1:])
+    if split == 'angular':
+        customers = angular_order(customers, coordinates, depot)
+    return split_piece((depot, customers, depot), distances, coordinates,
+                       max_interior(max_variables, reduced), split)
+
+
+def piece_matrix(distances: DistanceMatrix, piece: Piece) -> np.ndarray:
+    """
+    Distance matrix of the tour equivalent to a piece.
+
+    start and end are merged into city 0: leaving it costs as leaving start,
+    entering it costs as entering end. A tour from city 0 around the interior
+    and back is then exactly the path start -> interior -> end.
+    """
+    start, interior, end = piece
+    matrix = distances.submatrix([start] + interior).copy()
+    matrix[1:, 0] = distances.submatrix(interior + [end])[:-1, -1]
+    return matrix
+
+
+def piece_path(piece: Piece, tour: Sequence[int]) -> List[int]:
+    """Interior node IDs of a piece in the order of a tour over its piece_matrix."""
+    start, interior, end = piece
+    tour = list(tour)
+    k = tour.index(0)
+    return [interior[idx - 1] for idx in tour[k + 1:] + tour[:k]]
+
+
+def stitch_pieces(pieces: Sequence[Piece], paths: Sequence[Sequence[int]], depot: int) -> List[int]:
+    """Route of a cluster (depot first, not repeated at the end) from its ordered pieces."""
+    route = [depot]
+    for (start, _, end), path in zip(pieces, paths):
+        if start != depot:
+            route.append(start)
+        route.extend(path)
+        if end != depot:
+            route.append(end)
+    return route
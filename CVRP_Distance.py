@@ -0,0 +1,138 @@
+#------------------------------------------------------------------------------
+#
+#            (c) Copyright 2025 by QUANFLUENCE PRIVATE LIMITED
+#                          All rights reserved.
+#
+#   Trade Secret of QUANFLUENCE PRIVATE LIMITED  Do not disclose.
+#
+#   Use of this file in any form or means is permitted only
+#   with a valid, written license agreement with QUANFLUENCE PRIVATE LIMTED.
+#   The licensee shall strictly limit use of information contained herein
+#   to the conditions specified in the written license agreement.
+#
+#   Licensee shall keep all information contained herein confidential
+#   and shall protect same in whole or in part from disclosure and
+#   dissemination to all third parties.
+#
+#                         QUANFLUENCE PRIVATE LIMITED
+#                        E-Mail: assist@quanfluence.com
+#                             www.quanfluence.com
+#
+# -----------------------------------------------------------------------------
+#  File:   CVRP_Distance.py
+#  Author: Rishi Mittal
+#
+#  Description: Distance matrices for CVRP instances, computed once per problem
+#------------------------------------------------------------------------------
+
+from typing import Dict, Iterable, Optional, Sequence, Tuple
+import numpy as np
+
+EUC_2D = 'EUC_2D'
+GEO = 'GEO'
+EXPLICIT = 'EXPLICIT'
+
+# Coordinates coming from the map front end are (lat, lng) in decimal degrees
+DEFAULT_EDGE_WEIGHT_TYPE = GEO
+EARTH_RADIUS_KM = 6371.0
+
+
+def euclidean_matrix(points: np.ndarray, dtype=np.float64) -> np.ndarray:
+    """Pairwise Euclidean distances between (x, y) points."""
+    points = np.asarray(points, dtype=np.float64)
+    dx = points[:, 0, None] - points[None, :, 0]
+    dy = points[:, 1, None] - points[None, :, 1]
+    return np.hypot(dx, dy).astype(dtype, copy=False)
+
+
+def haversine_matrix(points: np.ndarray, dtype=np.float64) -> np.ndarray:
+    """Pairwise great-circle distances in km between (lat, lon) points in decimal degrees."""
+    lat, lon = np.deg2rad(np.asarray(points, dtype=np.float64)).T
+    a = (np.sin((lat[:, None] - lat[None, :]) / 2.0) ** 2
+         + np.cos(lat)[:, None] * np.cos(lat)[None, :]
+         * np.sin((lon[:, None] - lon[None, :]) / 2.0) ** 2)
+    a = np.clip(a, 0.0, 1.0)
+    distances = EARTH_RADIUS_KM * 2.0 * np.arctan2(np.sqrt(a), np.sqrt(1.0 - a))
+    np.fill_diagonal(distances, 0.0)
+    return distances.astype(dtype, copy=False)
+
+
+METRICS = {
+    EUC_2D: euclidean_matrix,
+    GEO: haversine_matrix,
+}
+
+
+def distance_matrix(points: np.ndarray, edge_weight_type: str = DEFAULT_EDGE_WEIGHT_TYPE,
+                    dtype=np.float64) -> np.ndarray:
+    """
+    Full distance matrix of an (n, 2) coordinate array.
+
+    Args:
+        points: (n, 2) coordinates, (x, y) for EUC_2D or (lat, lon) for GEO
+        edge_weight_type: TSPLIB EDGE_WEIGHT_TYPE, EUC_2D or GEO
+        dtype: float64, or float32 to halve the memory of large instances
+
+    Returns:
+        np.ndarray: (n, n) matrix, computed in float64 and cast to dtype
+    """
+    edge_weight_type = (edge_weight_type or DEFAULT_EDGE_WEIGHT_TYPE).upper()
+    if edge_weight_type not in METRICS:
+        raise ValueError(f"Unsupported EDGE_WEIGHT_TYPE '{edge_weight_type}', "
+                         f"expected one of {sorted(METRICS)} or an explicit matrix")
+    return METRICS[edge_weight_type](points, dtype)
+
+
+class DistanceMatrix:
+    """
+    Distances between all nodes of one problem, addressed by node ID.
+
+    The matrix is built once; clusters and solvers gather their rows and
+    columns through index arrays (submatrix) instead of recomputing them.
+    """
+
+    def __init__(self, node_ids: Sequence[int], matrix: np.ndarray):
+        matrix = np.asarray(matrix)
+        if matrix.shape != (len(node_ids), len(node_ids)):
+            raise ValueError(f"Distance matrix of shape {matrix.shape} does not match "
+                             f"{len(node_ids)} nodes")
+        self.node_ids = list(node_ids)
+        self.matrix = matrix
+        self._position = {node: k for k, node in enumerate(self.node_ids)}
+
+    @classmethod
+    def from_coordinates(cls, coordinates: Dict[int, Tuple[float, float]],
+                         edge_weight_type: str = DEFAULT_EDGE_WEIGHT_TYPE,
+                         dtype=np.float64) -> 'DistanceMatrix':
+        """Build the matrix of every node in coordinates, in node ID order."""
+        node_ids = sorted(coordinates)
+        points = np.array([coordinates[node] for node in node_ids], dtype=np.float64).reshape(-1, 2)
+        return cls(node_ids, distance_matrix(points, edge_weight_type, dtype))
+
+    @classmethod
+    def from_explicit(cls, matrix: np.ndarray, node_ids: Optional[Sequence[int]] = None,
+                      dtype=np.float64) -> 'DistanceMatrix':
+        """Wrap an EXPLICIT matrix; node IDs default to 1..n as in TSPLIB."""
+        matrix = np.asarray(matrix, dtype=dtype)
+        if node_ids is None:
+            node_ids = range(1, len(matrix) + 1)
+        return cls(node_ids, matrix)
+
+    def __len__(self) -> int:
+        return len(self.node_ids)
+
+    @property
+    def dtype(self):
+        return self.matrix.dtype
+
+    def positions(self, nodes: Iterable[int]) -> np.ndarray:
+        """Row indices of the given node IDs."""
+        return np.fromiter((self._position[node] for node in nodes), dtype=np.intp)
+
+    def submatrix(self, nodes: Sequence[int]) -> np.ndarray:
+        """(len(nodes), len(nodes)) distances between nodes, in the order given."""
+        idx = self.positions(nodes)
+        return self.matrix[np.ix_(idx, idx)]
+
+    def distance(self, u: int, v: int) -> float:
+        return float(self.matrix[self._position[u], self._position[v]])
@@ -0,0 +1,80 @@
+#------------------------------------------------------------------------------
+#
+#            (c) Copyright 2025 by QUANFLUENCE PRIVATE LIMITED
+#                          All rights reserved.
+#
+#   Trade Secret of QUANFLUENCE PRIVATE LIMITED  Do not disclose.
+#
+#   Use of this file in any form or means is permitted only
+#   with a valid, written license agreement with QUANFLUENCE PRIVATE LIMTED.
+#   The licensee shall strictly limit use of information contained herein
+#   to the conditions specified in the written license agreement.
+#
+#   Licensee shall keep all information contained herein confidential
+#   and shall protect same in whole or in part from disclosure and
+#   dissemination to all third parties.
+#
+#                         QUANFLUENCE PRIVATE LIMITED
+#                        E-Mail: assist@quanfluence.com
+#                             www.quanfluence.com
+#
+# -----------------------------------------------------------------------------
+#  File:   CVRP_Heuristics.py
+#  Author: Rishi Mittal
+#
+#  Description: Fast classical tour heuristics for cluster TSPs
+#------------------------------------------------------------------------------
+
+from typing import Tuple
+import numpy as np
+
+
+def nearest_neighbour_tour(distances: np.ndarray, start: int = 0) -> np.ndarray:
+    """Greedy tour over all cities of distances, starting from start."""
+    n = len(distances)
+    visited = np.zeros(n, dtype=bool)
+    tour = np.empty(n, dtype=np.intp)
+    tour[0] = current = start
+    visited[start] = True
+    for step in range(1, n):
+        current = int(np.argmin(np.where(visited, np.inf, distances[current])))
+        tour[step] = current
+        visited[current] = True
+    return tour
+
+
+def two_opt(distances: np.ndarray, tour: np.ndarray, max_iter: int = 1000) -> np.ndarray:
+    """
+    Best-improvement 2-opt on a cyclic tour.
+
+    Every move is scored at once: reversing tour[i+1..j] replaces edges
+    (a, b) and (c, e) with (a, c) and (b, e).
+    """
+    tour = np.array(tour, dtype=np.intp)
+    n = len(tour)
+    if n < 4:
+        return tour
+    i, j = np.triu_indices(n, 2)
+    keep = ~((i == 0) & (j == n - 1))  # those two edges are adjacent
+    i, j = i[keep], j[keep]
+    for _ in range(max_iter):
+        a, b = tour[i], tour[(i + 1) % n]
+        c, e = tour[j], tour[(j + 1) % n]
+        delta = distances[a, c] + distances[b, e] - distances[a, b] - distances[c, e]
+        best = int(np.argmin(delta))
+        if delta[best] >= -1e-9:
+            break
+        tour[i[best] + 1:j[best] + 1] = tour[i[best] + 1:j[best] + 1][::-1].copy()
+    return tour
+
+
+def tour_length(distances: np.ndarray, tour: np.ndarray) -> float:
+    """Length of the cyclic tour."""
+    tour = np.asarray(tour)
+    return float(distances[tour, np.roll(tour, -1)].sum())
+
+
+def solve_tour(distances: np.ndarray, start: int = 0) -> Tuple[np.ndarray, float]:
+    """Nearest-neighbour tour from start improved by 2-opt, with its length."""
+    tour = two_opt(distances, nearest_neighbour_tour(distances, start))
+    return tour, tour_length(distances, tour)
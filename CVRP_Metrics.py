@@ -0,0 +1,165 @@
+#------------------------------------------------------------------------------
+#
+#            (c) Copyright 2025 by QUANFLUENCE PRIVATE LIMITED
+#                          All rights reserved.
+#
+#   Trade Secret of QUANFLUENCE PRIVATE LIMITED  Do not disclose.
+#
+#   Use of this file in any form or means is permitted only
+#   with a valid, written license agreement with QUANFLUENCE PRIVATE LIMTED.
+#   The licensee shall strictly limit use of information contained herein
+#   to the conditions specified in the written license agreement.
+#
+#   Licensee shall keep all information contained herein confidential
+#   and shall protect same in whole or in part from disclosure and
+#   dissemination to all third parties.
+#
+#                         QUANFLUENCE PRIVATE LIMITED
+#                        E-Mail: assist@quanfluence.com
+#                             www.quanfluence.com
+#
+# -----------------------------------------------------------------------------
+#  File:   CVRP_Metrics.py
+#  Author: Rishi Mittal
+#
+#  Description: Stage timing spans of the solvers, aggregated as histograms
+#------------------------------------------------------------------------------
+
+from bisect import bisect_left
+from contextlib import nullcontext
+from typing import Dict, List, Tuple
+import os
+import threading
+import time
+
+# Bucket upper bounds in seconds, from a small QUBO build to a long CP-SAT run
+BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0, 60.0, 300.0, float('inf'))
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+class Histogram:
+    """Per-bucket counts (not cumulative) and sum of observed durations."""
+
+    __slots__ = ('counts', 'sum')
+
+    def __init__(self):
+        self.counts = [0] * len(BUCKETS)
+        self.sum = 0.0
+
+    def observe(self, seconds: float) -> None:
+        self.counts[bisect_left(BUCKETS, seconds)] += 1
+        self.sum += seconds
+
+    @property
+    def count(self) -> int:
+        return sum(self.counts)
+
+
+class StageRecorder:
+    """
+    Thread-safe histograms of stage durations, one per (stage, labels).
+
+    snapshot() / merge() move the histograms between processes as plain
+    lists, e.g. from a solver worker back to the server.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms: Dict[Tuple[str, Labels], Histogram] = {}
+
+    def observe(self, stage: str, seconds: float, labels: Labels = ()) -> None:
+        with self._lock:
+            histogram = self._histograms.get((stage, labels))
+            if histogram is None:
+                histogram = self._histograms[(stage, labels)] = Histogram()
+            histogram.observe(seconds)
+
+    def snapshot(self) -> List[Tuple[str, Labels, List[int], float]]:
+        with self._lock:
+            return [(stage, labels, list(h.counts), h.sum)
+                    for (stage, labels), h in self._histograms.items()]
+
+    def merge(self, snapshot: List[Tuple[str, Labels, List[int], float]]) -> None:
+        with self._lock:
+            for stage, labels, counts, total in snapshot:
+                key = (stage, tuple(tuple(label) for label in labels))
+                histogram = self._histograms.get(key)
+                if histogram is None:
+                    histogram = self._histograms[key] = Histogram()
+                histogram.counts = [a + b for a, b in zip(histogram.counts, counts)]
+                histogram.sum += total
+
+    def drain(self) -> List[Tuple[str, Labels, List[int], float]]:
+        """Snapshot and reset, so each observation is handed on once."""
+        with self._lock:
+            snapshot = [(stage, labels, h.counts, h.sum)
+                        for (stage, labels), h in self._histograms.items()]
+            self._histograms = {}
+            return snapshot
+
+    def items(self) -> List[Tuple[str, Labels, Histogram]]:
+        """Histograms sorted by stage and labels; copies, safe to read unlocked."""
+        with self._lock:
+            items = []
+            for (stage, labels), h in sorted(self._histograms.items()):
+                copy = Histogram()
+                copy.counts, copy.sum = list(h.counts), h.sum
+                items.append((stage, labels, copy))
+            return items
+
+
+class _Span:
+    __slots__ = ('stage', 'labels', 'start')
+
+    def __init__(self, stage: str, labels: Labels):
+        self.stage = stage
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        RECORDER.observe(self.stage, time.perf_counter() - self.start, self.labels)
+        return False
+
+
+RECORDER = StageRecorder()
+_NULL_SPAN = nullcontext()
+_enabled = os.environ.get('CVRP_METRICS', '').lower() in ('1', 'true', 'yes')
+
+
+def enable(on: bool = True) -> None:
+    """Turn recording on or off for this process (CVRP_METRICS=1 turns it on at import)."""
+    global _enabled
+    _enabled = on
+
+
+def enabled() -> bool:
+    return _enabled
+
+
+def _labels(labels: Dict[str, object]) -> Labels:
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+def span(stage: str, **labels):
+    """
+    Context manager timing one stage into RECORDER.
+
+    Disabled, it returns a shared no-op context, so the cost is one call.
+
+    Example:
+        with span('solve', solver='classical', engine='cp-sat'):
+            status = solver.Solve(model)
+    """
+    if not _enabled:
+        return _NULL_SPAN
+    return _Span(stage, _labels(labels))
+
+
+def record(stage: str, seconds: float, **labels) -> None:
+    """Record a duration measured elsewhere, e.g. returned by a pool worker."""
+    if _enabled:
+        RECORDER.observe(stage, seconds, _labels(labels))
@@ -0,0 +1,387 @@
+#------------------------------------------------------------------------------
+#
+#            (c) Copyright 2025 by QUANFLUENCE PRIVATE LIMITED
+#                          All rights reserved.
+#
+#   Trade Secret of QUANFLUENCE PRIVATE LIMITED  Do not disclose.
+#
+#   Use of this file in any form or means is permitted only
+#   with a valid, written license agreement with QUANFLUENCE PRIVATE LIMTED.
+#   The licensee shall strictly limit use of information contained herein
+#   to the conditions specified in the written license agreement.
+#
+#   Licensee shall keep all information contained herein confidential
+#   and shall protect same in whole or in part from disclosure and
+#   dissemination to all third parties.
+#
+#                         QUANFLUENCE PRIVATE LIMITED
+#                        E-Mail: assist@quanfluence.com
+#                             www.quanfluence.com
+#
+# -----------------------------------------------------------------------------
+#  File:   CVRP_Parser.py
+#  Author: Rishi Mittal
+#
+#  Description: Single-pass TSPLIB / CVRP instance parser and .npz instance cache
+#------------------------------------------------------------------------------
+
+from typing import Dict, Iterable, Optional, Tuple
+import json
+import os
+import re
+import struct
+import zipfile
+import numpy as np
+
+from CVRP_Distance import DEFAULT_EDGE_WEIGHT_TYPE, EXPLICIT, DistanceMatrix, distance_matrix
+
+CACHE_SUFFIX = '.npz'
+CACHE_VERSION = 1
+
+# Order of the values of an EDGE_WEIGHT_SECTION, as (lower or upper triangle, with diagonal).
+# Column-wise formats of a symmetric matrix list the same values as the other triangle row-wise.
+EDGE_WEIGHT_FORMATS = {
+    'FULL_MATRIX': None,
+    'UPPER_ROW': ('upper', False),
+    'LOWER_ROW': ('lower', False),
+    'UPPER_DIAG_ROW': ('upper', True),
+    'LOWER_DIAG_ROW': ('lower', True),
+    'UPPER_COL': ('lower', False),
+    'LOWER_COL': ('upper', False),
+    'UPPER_DIAG_COL': ('lower', True),
+    'LOWER_DIAG_COL': ('upper', True),
+}
+
+SECTIONS = ('NODE_COORD_SECTION', 'DISPLAY_DATA_SECTION', 'DEMAND_SECTION',
+            'DEPOT_SECTION', 'EDGE_WEIGHT_SECTION')
+
+
+class CVRPParseError(ValueError):
+    """Malformed instance file; the message starts with source:line."""
+
+    def __init__(self, message: str, source: str = '<string>', line: Optional[int] = None):
+        self.source = source
+        self.line = line
+        where = f"{source}:{line}" if line is not None else source
+        super().__init__(f"{where}: {message}")
+
+
+class CVRPInstance:
+    """
+    A parsed CVRP instance held as NumPy arrays.
+
+    Rows of node_ids, points and demand_array follow the file order; points is
+    None for an EXPLICIT instance without NODE_COORD / DISPLAY_DATA sections
+    and matrix is None unless the file has an EDGE_WEIGHT_SECTION. The dicts
+    of the older parsers are available as coordinates / demands.
+    """
+
+    def __init__(self, name: str, dimension: int, capacity: int, num_vehicles: int,
+                 edge_weight_type: str, node_ids: np.ndarray, points: Optional[np.ndarray],
+                 demand_array: np.ndarray, depots: np.ndarray, matrix: Optional[np.ndarray] = None):
+        self.name = name
+        self.dimension = dimension
+        self.capacity = capacity
+        self.num_vehicles = num_vehicles
+        self.edge_weight_type = edge_weight_type
+        self.node_ids = node_ids
+        self.points = points
+        self.demand_array = demand_array
+        self.depots = depots
+        self.matrix = matrix
+
+    @property
+    def depot(self) -> int:
+        return int(self.depots[0]) if len(self.depots) else int(self.node_ids[0])
+
+    @property
+    def coordinates(self) -> Dict[int, Tuple[float, float]]:
+        if self.points is None:
+            return {}
+        return dict(zip(self.node_ids.tolist(), map(tuple, self.points.tolist())))
+
+    @property
+    def demands(self) -> Dict[int, int]:
+        return dict(zip(self.node_ids.tolist(), self.demand_array.tolist()))
+
+    def distance_matrix(self, dtype=np.float64) -> DistanceMatrix:
+        """Explicit matrix of the file, or distances computed from its coordinates."""
+        if self.matrix is not None:
+            return DistanceMatrix.from_explicit(self.matrix, self.node_ids.tolist(), dtype)
+        if self.points is None:
+            raise ValueError(f"Instance '{self.name}' has neither coordinates nor edge weights")
+        return DistanceMatrix(self.node_ids.tolist(),
+                              distance_matrix(self.points, self.edge_weight_type, dtype))
+
+    def to_npz(self, path: str, source_stat: Optional[os.stat_result] = None) -> None:
+        """Write the instance as an uncompressed .npz, so load_npz can memory-map it."""
+        meta = {'version': CACHE_VERSION, 'name': self.name, 'dimension': self.dimension,
+                'capacity': self.capacity, 'num_vehicles': self.num_vehicles,
+                'edge_weight_type': self.edge_weight_type}
+        if source_stat is not None:
+            meta['source'] = [source_stat.st_size, source_stat.st_mtime_ns]
+        arrays = {'meta': np.frombuffer(json.dumps(meta).encode('utf-8'), dtype=np.uint8),
+                  'node_ids': self.node_ids, 'demand_array': self.demand_array,
+                  'depots': self.depots}
+        if self.points is not None:
+            arrays['points'] = self.points
+        if self.matrix is not None:
+            arrays['matrix'] = self.matrix
+        tmp = f"{path}.tmp"
+        with open(tmp, 'wb') as f:
+            np.savez(f, **arrays)
+        os.replace(tmp, path)
+
+
+def _memmap_npz(path: str) -> Dict[str, np.ndarray]:
+    """Map every array of an uncompressed .npz read-only instead of reading it."""
+    arrays = {}
+    with zipfile.ZipFile(path) as archive, open(path, 'rb') as f:
+        for info in archive.infolist():
+            if info.compress_type != zipfile.ZIP_STORED:
+                return dict(np.load(path))
+            # Data follows the 30-byte local header, the file name and the extra field
+            f.seek(info.header_offset + 26)
+            name_length, extra_length = struct.unpack('<HH', f.read(4))
+            f.seek(info.header_offset + 30 + name_length + extra_length)
+            version = np.lib.format.read_magic(f)
+            read_header = (np.lib.format.read_array_header_1_0 if version == (1, 0)
+                           else np.lib.format.read_array_header_2_0)
+            shape, fortran_order, dtype = read_header(f)
+            name = info.filename[:-len('.npy')]
+            if dtype.hasobject or 0 in shape or not shape:
+                arrays[name] = np.load(path)[name]
+            else:
+                arrays[name] = np.memmap(path, dtype=dtype, mode='r', offset=f.tell(), shape=shape,
+                                         order='F' if fortran_order else 'C')
+    return arrays
+
+
+def load_npz(path: str, source: Optional[str] = None, mmap: bool = True) -> Optional[CVRPInstance]:
+    """
+    Load an instance written by CVRPInstance.to_npz.
+
+    Returns None when the cache is from another format version or, given the
+    source file, was written for a different size or modification time.
+    """
+    arrays = _memmap_npz(path) if mmap else dict(np.load(path))
+    meta = json.loads(bytes(arrays.pop('meta')).decode('utf-8'))
+    if meta.get('version') != CACHE_VERSION:
+        return None
+    if source is not None:
+        stat = os.stat(source)
+        if meta.get('source') != [stat.st_size, stat.st_mtime_ns]:
+            return None
+    return CVRPInstance(meta['name'], meta['dimension'], meta['capacity'], meta['num_vehicles'],
+                        meta['edge_weight_type'], arrays['node_ids'], arrays.get('points'),
+                        arrays['demand_array'], arrays['depots'], arrays.get('matrix'))
+
+
+def infer_num_vehicles(name: str, comment: str = '', source: str = '') -> int:
+    """Vehicle count from NAME (E-n22-k4), the COMMENT (no of trucks: 4) or the file name, else 0."""
+    for text, pattern in ((name, r'k(\d+)'), (comment, r'trucks\s*:\s*(\d+)'),
+                          (os.path.basename(source), r'-k(\d+)')):
+        match = re.search(pattern, text or '', re.IGNORECASE)
+        if match:
+            return int(match.group(1))
+    return 0
+
+
+def explicit_matrix(values: np.ndarray, dimension: int, edge_weight_format: str) -> np.ndarray:
+    """Square matrix from the values of an EDGE_WEIGHT_SECTION."""
+    layout = EDGE_WEIGHT_FORMATS[edge_weight_format]
+    if layout is None:
+        return values.reshape(dimension, dimension)
+    triangle, diagonal = layout
+    offset = 0 if diagonal else 1
+    rows, cols = (np.triu_indices(dimension, offset) if triangle == 'upper'
+                  else np.tril_indices(dimension, -offset))
+    matrix = np.zeros((dimension, dimension))
+    matrix[rows, cols] = values
+    matrix[cols, rows] = values
+    return matrix
+
+
+def edge_weight_count(dimension: int, edge_weight_format: str) -> int:
+    layout = EDGE_WEIGHT_FORMATS[edge_weight_format]
+    if layout is None:
+        return dimension * dimension
+    return dimension * (dimension + 1) // 2 if layout[1] else dimension * (dimension - 1) // 2
+
+
+def _to_array(values: list, dtype, lines: list, source: str, what: str) -> np.ndarray:
+    """Convert the strings of one section at once, naming the first bad line on failure."""
+    try:
+        return np.array(values, dtype=dtype)
+    except ValueError:
+        for value, line in zip(values, lines):
+            try:
+                np.array(value, dtype=dtype)
+            except ValueError:
+                raise CVRPParseError(f"invalid {what} {value}", source, line) from None
+        raise
+
+
+def parse_lines(lines: Iterable[str], source: str = '<string>') -> CVRPInstance:
+    """
+    Parse a TSPLIB / CVRP instance in one pass over its lines.
+
+    Node coordinates (or display data), demands, depots and EXPLICIT edge
+    weights are collected per section and converted to arrays once, after the
+    last line. Malformed lines raise CVRPParseError with the line number.
+    """
+    header, header_lines = {}, {}
+    section = None
+    coord_ids, coords, coord_lines = [], [], []
+    demand_ids, demand_values, demand_lines = [], [], []
+    depots, depot_lines = [], []
+    weights, weight_lines = [], []
+    lineno = 0
+
+    for lineno, line in enumerate(lines, 1):
+        parts = line.split()
+        if not parts:
+            continue
+        if parts[0][0].isalpha():
+            keyword, _, value = line.partition(':')
+            keyword = keyword.strip().upper()
+            if keyword == 'EOF':
+                break
+            if keyword in SECTIONS:
+                if 'DIMENSION' not in header:
+                    raise CVRPParseError(f"{keyword} before DIMENSION", source, lineno)
+                section = keyword
+            elif keyword.endswith('_SECTION'):
+                raise CVRPParseError(f"unsupported section {keyword}", source, lineno)
+            else:
+                section = None
+                header[keyword] = value.strip()
+                header_lines[keyword] = lineno
+            continue
+
+        if section in ('NODE_COORD_SECTION', 'DISPLAY_DATA_SECTION'):
+            if len(parts) != 3:
+                raise CVRPParseError(f"expected 'node x y', got '{line.strip()}'", source, lineno)
+            coord_ids.append(parts[0])
+            coords.append(parts[1:])
+            coord_lines.append(lineno)
+        elif section == 'DEMAND_SECTION':
+            if len(parts) != 2:
+                raise CVRPParseError(f"expected 'node demand', got '{line.strip()}'", source, lineno)
+            demand_ids.append(parts[0])
+            demand_values.append(parts[1])
+            demand_lines.append(lineno)
+        elif section == 'DEPOT_SECTION':
+            depots.extend(parts)
+            depot_lines.extend([lineno] * len(parts))
+        elif section == 'EDGE_WEIGHT_SECTION':
+            weights.extend(parts)
+            weight_lines.extend([lineno] * len(parts))
+        else:
+            raise CVRPParseError(f"data outside of a section: '{line.strip()}'", source, lineno)
+
+    def header_int(keyword):
+        if keyword not in header:
+            raise CVRPParseError(f"missing {keyword}", source)
+        try:
+            return int(header[keyword])
+        except ValueError:
+            raise CVRPParseError(f"{keyword} must be an integer, got '{header[keyword]}'",
+                                 source, header_lines[keyword]) from None
+
+    dimension = header_int('DIMENSION')
+    capacity = header_int('CAPACITY')
+
+    points = None
+    if coord_ids:
+        if len(coord_ids) != dimension:
+            raise CVRPParseError(f"{len(coord_ids)} nodes for DIMENSION = {dimension}", source,
+                                 coord_lines[min(dimension, len(coord_ids) - 1)])
+        node_ids = _to_array(coord_ids, np.int64, coord_lines, source, 'node')
+        points = _to_array(coords, np.float64, coord_lines, source, 'coordinates')
+    else:
+        node_ids = np.arange(1, dimension + 1, dtype=np.int64)
+
+    # Row of every node ID, through a sorted copy so IDs need not be 1..n
+    order = np.argsort(node_ids, kind='stable')
+    sorted_ids = node_ids[order]
+    duplicate = np.nonzero(sorted_ids[1:] == sorted_ids[:-1])[0]
+    if len(duplicate):
+        raise CVRPParseError(f"duplicate node {sorted_ids[duplicate[0]]}", source,
+                             coord_lines[order[duplicate[0] + 1]])
+
+    def rows_of(ids, lines):
+        pos = np.minimum(np.searchsorted(sorted_ids, ids), dimension - 1)
+        unknown = np.nonzero(sorted_ids[pos] != ids)[0]
+        if len(unknown):
+            raise CVRPParseError(f"unknown node {ids[unknown[0]]}", source, lines[unknown[0]])
+        return order[pos]
+
+    demand_array = np.zeros(dimension, dtype=np.int64)
+    if demand_ids:
+        ids = _to_array(demand_ids, np.int64, demand_lines, source, 'node')
+        values = _to_array(demand_values, np.int64, demand_lines, source, 'demand')
+        demand_array[rows_of(ids, demand_lines)] = values
+
+    depot_ids = _to_array(depots, np.int64, depot_lines, source, 'depot')
+    depot_lines = [line for line, depot in zip(depot_lines, depot_ids) if depot != -1]
+    depot_ids = depot_ids[depot_ids != -1]
+    rows_of(depot_ids, depot_lines)
+    if not len(depot_ids):
+        depot_ids = node_ids[:1].copy()
+
+    edge_weight_type = header.get('EDGE_WEIGHT_TYPE', DEFAULT_EDGE_WEIGHT_TYPE).upper()
+    matrix = None
+    if weights:
+        edge_weight_format = header.get('EDGE_WEIGHT_FORMAT', 'FULL_MATRIX').upper()
+        if edge_weight_format not in EDGE_WEIGHT_FORMATS:
+            raise CVRPParseError(f"unsupported EDGE_WEIGHT_FORMAT '{edge_weight_format}'",
+                                 source, header_lines['EDGE_WEIGHT_FORMAT'])
+        expected = edge_weight_count(dimension, edge_weight_format)
+        if len(weights) != expected:
+            raise CVRPParseError(f"{len(weights)} edge weights, expected {expected} for "
+                                 f"{edge_weight_format} with DIMENSION = {dimension}",
+                                 source, weight_lines[min(expected, len(weights) - 1)])
+        values = _to_array(weights, np.float64, weight_lines, source, 'edge weight')
+        matrix = explicit_matrix(values, dimension, edge_weight_format)
+    elif edge_weight_type == EXPLICIT:
+        raise CVRPParseError("EDGE_WEIGHT_TYPE is EXPLICIT but there is no EDGE_WEIGHT_SECTION", source)
+    elif points is None:
+        raise CVRPParseError("no NODE_COORD_SECTION or EDGE_WEIGHT_SECTION", source)
+
+    name = header.get('NAME', '')
+    vehicles = header.get('VEHICLES', '')
+    return CVRPInstance(
+        name=name, dimension=dimension, capacity=capacity,
+        num_vehicles=int(vehicles) if vehicles.isdigit()
+        else infer_num_vehicles(name, header.get('COMMENT', ''), source),
+        edge_weight_type=edge_weight_type, node_ids=node_ids, points=points,
+        demand_array=demand_array, depots=depot_ids, matrix=matrix)
+
+
+def parse_string(content: str, source: str = '<string>') -> CVRPInstance:
+    """Parse instance file content already in memory."""
+    return parse_lines(content.splitlines(), source)
+
+
+def read_instance(path: str, cache: bool = False, mmap: bool = True) -> CVRPInstance:
+    """
+    Read a .vrp / .txt instance file.
+
+    With cache, the parsed arrays are kept in a <path>.npz sidecar that later
+    calls load (memory-mapped unless mmap is False) instead of parsing again,
+    until the source file changes. A sidecar that cannot be written is skipped.
+    """
+    sidecar = path + CACHE_SUFFIX
+    if cache and os.path.exists(sidecar):
+        instance = load_npz(sidecar, source=path, mmap=mmap)
+        if instance is not None:
+            return instance
+    with open(path, 'r') as f:
+        instance = parse_lines(f, source=path)
+    if cache:
+        try:
+            instance.to_npz(sidecar, os.stat(path))
+        except OSError:
+            pass
+    return instance
@@ -0,0 +1,154 @@
+#------------------------------------------------------------------------------
+#
+#            (c) Copyright 2025 by QUANFLUENCE PRIVATE LIMITED
+#                          All rights reserved.
+#
+#   Trade Secret of QUANFLUENCE PRIVATE LIMITED  Do not disclose.
+#
+#   Use of this file in any form or means is permitted only
+#   with a valid, written license agreement with QUANFLUENCE PRIVATE LIMTED.
+#   The licensee shall strictly limit use of information contained herein
+#   to the conditions specified in the written license agreement.
+#
+#   Licensee shall keep all information contained herein confidential
+#   and shall protect same in whole or in part from disclosure and
+#   dissemination to all third parties.
+#
+#                         QUANFLUENCE PRIVATE LIMITED
+#                        E-Mail: assist@quanfluence.com
+#                             www.quanfluence.com
+#
+# -----------------------------------------------------------------------------
+#  File:   CVRP_Penalty.py
+#  Author: Rishi Mittal
+#
+#  Description: Calibration of the TSP QUBO constraint penalty per cluster
+#------------------------------------------------------------------------------
+
+from typing import Callable, Dict, Optional, Tuple
+import json
+import os
+import threading
+import numpy as np
+
+PENALTY_MODES = ('bounds', 'feedback')
+BUCKET_WIDTH = 4         # clusters of 8..11 nodes share one calibrated factor, and so on
+TARGET_VALID_RATE = 0.5  # feedback stops once this share of samples is valid
+GROWTH = 1.5             # penalty factor step of one feedback round
+MARGIN = 1.2             # default factor; at exactly the lower bound a dropped city costs nothing
+MAX_ROUNDS = 3
+
+
+def penalty_bounds(distances: np.ndarray) -> Tuple[float, float]:
+    """
+    Range of sensible Lagrange weights for the one-hot TSP QUBO.
+
+    Dropping city i from a valid tour saves at most its longest way in plus
+    its longest way out, and costs 4 * lagrange (see tsp_qubo_arrays), so
+    the lower bound is the largest such saving / 4. Above the upper bound a
+    single violation outweighs any tour, the objective only flattens further.
+
+    Returns:
+        (lower, upper) weights in distance units
+    """
+    distances = np.asarray(distances, dtype=float)
+    if len(distances) < 2:
+        return 1.0, 1.0
+    lower = float((distances.max(axis=0) + distances.max(axis=1)).max()) / 4
+    upper = float(distances.max(axis=1).sum()) / 4
+    return lower, max(upper, lower)
+
+
+def size_bucket(n: int, width: int = BUCKET_WIDTH) -> int:
+    return n // width * width
+
+
+class PenaltyCache:
+    """
+    Thread-safe store of calibrated penalty factors per (formulation, size bucket).
+
+    Factors are relative to the lower bound of penalty_bounds, so they carry
+    over between clusters of different scale. With a path, factors are also
+    kept in a JSON file, which lets pool workers and later runs reuse them;
+    concurrent writers may overwrite each other's newest entries.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self._factors: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def _load(self) -> Dict[str, float]:
+        try:
+            with open(self.path, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def get(self, key: str) -> Optional[float]:
+        with self._lock:
+            if key not in self._factors and self.path:
+                self._factors.update(self._load())
+            return self._factors.get(key)
+
+    def set(self, key: str, factor: float) -> None:
+        with self._lock:
+            self._factors[key] = factor
+            if self.path:
+                factors = {**self._load(), key: factor}
+                tmp = f"{self.path}.tmp"
+                with open(tmp, 'w') as f:
+                    json.dump(factors, f)
+                os.replace(tmp, self.path)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._factors.clear()
+
+
+_CACHE = PenaltyCache(os.environ.get('CVRP_PENALTY_CACHE'))
+
+
+def get_penalty_cache() -> PenaltyCache:
+    """The process-wide cache, persisted to CVRP_PENALTY_CACHE when that is set."""
+    return _CACHE
+
+
+def calibrate_multiplier(distances: np.ndarray, mode: str = 'bounds',
+                         evaluate: Optional[Callable[[float], float]] = None,
+                         formulation: str = 'full', cache: Optional[PenaltyCache] = None) -> float:
+    """
+    Multiplier for tsp_qubo_arrays calibrated to one cluster.
+
+    The weight is factor * lower bound (see penalty_bounds), expressed as a
+    multiplier of mean(distances). 'bounds' uses the cached factor of the
+    cluster's size bucket, or MARGIN. 'feedback' without a cached factor calls
+    evaluate(multiplier) -> share of valid samples, starting from MARGIN and
+    raising the factor by GROWTH up to the upper bound until
+    TARGET_VALID_RATE is met, and caches the factor with the best rate for
+    the bucket.
+    """
+    if mode not in PENALTY_MODES:
+        raise ValueError(f"Unknown penalty mode '{mode}', expected a number or one of {PENALTY_MODES}")
+    distances = np.asarray(distances, dtype=float)
+    mean = float(np.mean(distances))
+    if mean == 0:
+        return 1.0
+    lower, upper = penalty_bounds(distances)
+    cache = cache or get_penalty_cache()
+    key = f"{formulation}:{size_bucket(len(distances))}"
+
+    factor = cache.get(key)
+    if factor is not None or mode == 'bounds' or evaluate is None:
+        return (factor or MARGIN) * lower / mean
+
+    factor, best = MARGIN, None
+    for _ in range(MAX_ROUNDS):
+        rate = evaluate(factor * lower / mean)
+        if best is None or rate > best[0]:
+            best = (rate, factor)
+        if rate >= TARGET_VALID_RATE or factor * lower >= upper:
+            break
+        factor = min(factor * GROWTH, upper / lower)
+    cache.set(key, best[1])
+    return best[1] * lower / mean
@@ -0,0 +1,210 @@
+#------------------------------------------------------------------------------
+#
+#            (c) Copyright 2025 by QUANFLUENCE PRIVATE LIMITED
+#                          All rights reserved.
+#
+#   Trade Secret of QUANFLUENCE PRIVATE LIMITED  Do not disclose.
+#
+#   Use of this file in any form or means is permitted only
+#   with a valid, written license agreement with QUANFLUENCE PRIVATE LIMTED.
+#   The licensee shall strictly limit use of information contained herein
+#   to the conditions specified in the written license agreement.
+#
+#   Licensee shall keep all information contained herein confidential
+#   and shall protect same in whole or in part from disclosure and
+#   dissemination to all third parties.
+#
+#                         QUANFLUENCE PRIVATE LIMITED
+#                        E-Mail: assist@quanfluence.com
+#                             www.quanfluence.com
+#
+# -----------------------------------------------------------------------------
+#  File:   CVRP_QUBO.py
+#  Author: Rishi Mittal
+#
+#  Description: Array-native TSP QUBO builder used by CVRP_Solver
+#------------------------------------------------------------------------------
+
+from typing import Dict, Optional, Tuple
+import numpy as np
+
+
+def tsp_qubo_arrays(distances: np.ndarray, multiplier: float = 1
+                    ) -> Tuple[np.ndarray, Tuple[np.ndarray, np.ndarray, np.ndarray], float]:
+    """
+    Build the one-hot TSP QUBO as NumPy arrays.
+
+    Variable i*n + t is 1 when city i is visited at time step t. The terms are
+    the same as the original loop builder: both one-hot constraints scaled by
+    multiplier*mean(distances) and the cyclic tour-distance couplers.
+
+    Args:
+        distances: (n, n) distance matrix
+        multiplier: Multiplier for the constraint penalty
+
+    Returns:
+        linear: (n*n,) linear biases
+        quadratic: (rows, cols, coeffs) COO triplets with rows < cols; duplicate
+            pairs are allowed and must be summed by the consumer
+        offset: Constant energy offset
+    """
+    distances = np.asarray(distances, dtype=float)
+    n = len(distances)
+    lagrange = multiplier * np.mean(distances)
+
+    # Each variable takes -2*lagrange from its city row and its time column
+    linear = np.full(n * n, -4.0 * lagrange)
+    offset = 2.0 * n * lagrange
+
+    grid = np.arange(n * n).reshape(n, n)
+    a, b = np.triu_indices(n, 1)
+
+    # Same city at two time steps / two cities at the same time step
+    row_u, row_v = grid[:, a].ravel(), grid[:, b].ravel()
+    col_u, col_v = grid[a, :].ravel(), grid[b, :].ravel()
+    penalty = np.full(row_u.size + col_u.size, 2.0 * lagrange)
+
+    # Tour distance: city i at time t followed by city j at time t+1 (cyclic)
+    i, j = np.nonzero(~np.eye(n, dtype=bool))
+    t = np.arange(n)
+    dist_u = (i[:, None] * n + t).ravel()
+    dist_v = (j[:, None] * n + (t + 1) % n).ravel()
+    dist_w = np.repeat(distances[i, j], n)
+
+    u = np.concatenate([row_u, col_u, dist_u])
+    v = np.concatenate([row_v, col_v, dist_v])
+    rows, cols = np.minimum(u, v), np.maximum(u, v)
+    coeffs = np.concatenate([penalty, dist_w])
+
+    return linear, (rows, cols, coeffs), offset
+
+
+def nearest_neighbour_pairs(distances: np.ndarray, k: int) -> np.ndarray:
+    """(n, n) mask of the pairs where either city is among the k nearest of the other."""
+    distances = np.asarray(distances, dtype=float)
+    n = len(distances)
+    k = min(k, n - 1)
+    masked = distances + np.diag(np.full(n, np.inf))
+    nearest = np.argpartition(masked, k - 1, axis=1)[:, :k] if k > 0 else np.empty((n, 0), int)
+    keep = np.zeros((n, n), dtype=bool)
+    keep[np.repeat(np.arange(n), k), nearest.ravel()] = True
+    return keep | keep.T
+
+
+def reduced_tsp_qubo_arrays(distances: np.ndarray, multiplier: float = 1, knn: Optional[int] = None,
+                            knn_margin: int = 2
+                            ) -> Tuple[np.ndarray, Tuple[np.ndarray, np.ndarray, np.ndarray], float]:
+    """
+    Build the TSP QUBO with city 0 (the depot) fixed at time step 0.
+
+    Only cities 1..n-1 over time steps 1..n-1 are variables: variable
+    (i-1)*(n-1) + (t-1) is city i at step t, (n-1)**2 in total. Leaving and
+    returning to the depot become linear terms of the first and last step.
+
+    With knn, the city-to-city couplers between consecutive steps are kept
+    only for pairs where one city is among the knn + knn_margin nearest of the
+    other. Leaving city i then costs c_i, its longest kept distance, as a
+    linear term, and kept couplers are weighted d - c_i: a tour pays d for a
+    kept pair and c_i rather than nothing for a dropped one.
+
+    Args:
+        distances: (n, n) distance matrix, city 0 is the depot
+        multiplier: Multiplier for the constraint penalty, as in tsp_qubo_arrays
+        knn: Neighbours kept per city, None keeps every pair
+        knn_margin: Extra neighbours kept on top of knn
+
+    Returns:
+        Same layout as tsp_qubo_arrays, over the (n-1)**2 reduced variables
+    """
+    distances = np.asarray(distances, dtype=float)
+    n = len(distances)
+    m = n - 1
+    lagrange = multiplier * np.mean(distances)
+
+    linear = np.full(m * m, -4.0 * lagrange)
+    offset = 2.0 * m * lagrange
+    grid = np.arange(m * m).reshape(m, m)
+    # Depot -> city at the first step, city -> depot at the last step
+    linear[grid[:, 0]] += distances[0, 1:]
+    linear[grid[:, -1]] += distances[1:, 0]
+
+    a, b = np.triu_indices(m, 1)
+    row_u, row_v = grid[:, a].ravel(), grid[:, b].ravel()
+    col_u, col_v = grid[a, :].ravel(), grid[b, :].ravel()
+    penalty = np.full(row_u.size + col_u.size, 2.0 * lagrange)
+
+    customers = distances[1:, 1:]
+    keep = ~np.eye(m, dtype=bool)
+    shift = np.zeros(m)
+    if knn is not None:
+        keep &= nearest_neighbour_pairs(customers, knn + knn_margin)
+        shift = np.where(keep, customers, 0.0).max(axis=1)
+        linear[grid[:, :-1]] += shift[:, None]
+    i, j = np.nonzero(keep)
+    t = np.arange(m - 1)
+    dist_u = (i[:, None] * m + t).ravel()
+    dist_v = (j[:, None] * m + t + 1).ravel()
+    dist_w = np.repeat(customers[i, j] - shift[i], m - 1)
+
+    u = np.concatenate([row_u, col_u, dist_u])
+    v = np.concatenate([row_v, col_v, dist_v])
+    rows, cols = np.minimum(u, v), np.maximum(u, v)
+    coeffs = np.concatenate([penalty, dist_w])
+
+    return linear, (rows, cols, coeffs), offset
+
+
+def coalesce_quadratic(rows: np.ndarray, cols: np.ndarray, coeffs: np.ndarray,
+                       num_variables: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Sum duplicate (row, col) pairs of a COO upper-triangular QUBO."""
+    keys = rows.astype(np.int64) * num_variables + cols
+    unique_keys, inverse = np.unique(keys, return_inverse=True)
+    summed = np.bincount(inverse, weights=coeffs, minlength=unique_keys.size)
+    return unique_keys // num_variables, unique_keys % num_variables, summed
+
+
+def qubo_to_dict(linear: np.ndarray, quadratic: Tuple[np.ndarray, np.ndarray, np.ndarray]
+                 ) -> Dict[Tuple[int, int], float]:
+    """
+    Convert QUBO arrays to the {(u, v): bias} dict expected by the device.
+
+    Linear biases are stored on the diagonal, as in BinaryQuadraticModel.to_qubo.
+    """
+    num_variables = len(linear)
+    rows, cols, coeffs = coalesce_quadratic(*quadratic, num_variables)
+    diag = np.arange(num_variables)
+    keys = zip(np.concatenate([diag, rows]).tolist(), np.concatenate([diag, cols]).tolist())
+    return dict(zip(keys, np.concatenate([linear, coeffs]).tolist()))
+
+
+def create_tsp_qubo(distances: np.ndarray, multiplier: float = 1
+                    ) -> Tuple[Dict[Tuple[int, int], float], float]:
+    """Create the TSP QUBO dict and offset directly, without building a BQM."""
+    linear, quadratic, offset = tsp_qubo_arrays(distances, multiplier)
+    return qubo_to_dict(linear, quadratic), offset
+
+
+def build_tsp_qubo(distances: np.ndarray, multiplier: float = 1, reduced: bool = False,
+                   knn: Optional[int] = None, knn_margin: int = 2
+                   ) -> Tuple[Dict[Tuple[int, int], float], float]:
+    """
+    TSP QUBO dict and offset in the full or the reduced (depot fixed) layout.
+
+    Samples of the reduced layout are turned back into full city-by-time
+    samples by CVRP_Decoder.expand_reduced_samples.
+    """
+    if not reduced:
+        if knn is not None:
+            raise ValueError("knn pruning needs the reduced formulation")
+        return create_tsp_qubo(distances, multiplier)
+    linear, quadratic, offset = reduced_tsp_qubo_arrays(distances, multiplier, knn, knn_margin)
+    return qubo_to_dict(linear, quadratic), offset
+
+
+def qubo_energies(samples: np.ndarray, linear: np.ndarray,
+                  quadratic: Tuple[np.ndarray, np.ndarray, np.ndarray], offset: float = 0.0
+                  ) -> np.ndarray:
+    """Evaluate the QUBO energy of one or more binary samples (rows of samples)."""
+    samples = np.atleast_2d(samples).astype(float)
+    rows, cols, coeffs = quadratic
+    return samples @ linear + (samples[:, rows] * samples[:, cols]) @ coeffs + offset
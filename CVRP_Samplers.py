@@ -0,0 +1,322 @@
+#------------------------------------------------------------------------------
+#
+#            (c) Copyright 2025 by QUANFLUENCE PRIVATE LIMITED
+#                          All rights reserved.
+#
+#   Trade Secret of QUANFLUENCE PRIVATE LIMITED  Do not disclose.
+#
+#   Use of this file in any form or means is permitted only
+#   with a valid, written license agreement with QUANFLUENCE PRIVATE LIMTED.
+#   The licensee shall strictly limit use of information contained herein
+#   to the conditions specified in the written license agreement.
+#
+#   Licensee shall keep all information contained herein confidential
+#   and shall protect same in whole or in part from disclosure and
+#   dissemination to all third parties.
+#
+#                         QUANFLUENCE PRIVATE LIMITED
+#                        E-Mail: assist@quanfluence.com
+#                             www.quanfluence.com
+#
+# -----------------------------------------------------------------------------
+#  File:   CVRP_Samplers.py
+#  Author: Rishi Mittal
+#
+#  Description: QUBO sampler backends used by CVRP_Solver
+#------------------------------------------------------------------------------
+
+from typing import Callable, Dict, List, Optional, Tuple, Union
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import partial
+import inspect
+import math
+import os
+import queue
+import threading
+import time
+import numpy as np
+
+DEFAULT_SAMPLER = 'quanfluence'
+
+
+class QuboSampler:
+    """
+    Base class for QUBO samplers.
+
+    A sampler takes a QUBO dict {(u, v): bias} and returns a result in the
+    shape of the Quanfluence device: {'result': {variable: spin}, 'energy': e},
+    where spins are +1/-1 and e is the QUBO energy without the offset.
+    """
+
+    def sample_qubo(self, Q: Dict[Tuple[int, int], float]) -> Dict:
+        """Return the best sample found for Q."""
+        raise NotImplementedError
+
+    def sample_qubo_many(self, Q: Dict[Tuple[int, int], float], num_reads: int) -> List[Dict]:
+        """
+        Return num_reads samples for Q, sorted by energy.
+
+        The default makes num_reads sample_qubo calls; backends that can draw
+        several reads in one call (SimulatedAnnealingSampler) override it.
+        """
+        results = [self.sample_qubo(Q) for _ in range(num_reads)]
+        return sorted(results, key=lambda result: result['energy'])
+
+
+class QuanfluenceSession:
+    """
+    Long-lived, thread-safe manager of Quanfluence device clients.
+
+    Clients are signed in and bound to the device once, then pooled and reused
+    for every QUBO. A client older than token_ttl seconds is signed in again
+    before use. Up to max_in_flight QUBOs run concurrently, each on its own
+    client, and a failed call is retried with exponential backoff on a fresh
+    client.
+    """
+
+    def __init__(self, username: str, password: str, device_id: int,
+                 max_in_flight: int = 4, max_retries: int = 3, backoff: float = 0.5,
+                 token_ttl: float = 1800.0, client_factory: Optional[Callable] = None):
+        self.username = username
+        self.password = password
+        self.device_id = device_id
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.token_ttl = token_ttl
+        self.client_factory = client_factory
+        self._clients = queue.LifoQueue()  # (client, signed_in_at)
+        self._executor = ThreadPoolExecutor(max_workers=max_in_flight)
+
+    def _sign_in(self, client) -> Tuple[object, float]:
+        try:
+            client.signin(self.username, self.password)
+        except Exception:
+            print("Please use appropriate login credentials")
+            raise
+        client.update_device(self.device_id, {'description': '001'})
+        return client, time.monotonic()
+
+    def _acquire(self) -> Tuple[object, float]:
+        try:
+            client, signed_in_at = self._clients.get_nowait()
+        except queue.Empty:
+            if self.client_factory is None:
+                from quanfluence_sdk import QuanfluenceClient
+                self.client_factory = QuanfluenceClient
+            return self._sign_in(self.client_factory())
+        if time.monotonic() - signed_in_at > self.token_ttl:
+            return self._sign_in(client)
+        return client, signed_in_at
+
+    def execute(self, Q: Dict[Tuple[int, int], float]) -> Dict:
+        """Run one QUBO on the device, retrying failed attempts with backoff."""
+        for attempt in range(self.max_retries + 1):
+            try:
+                client, signed_in_at = self._acquire()
+                result = client.execute_device_qubo_input(self.device_id, Q)
+            except Exception as error:
+                # Drop the client so the next attempt signs in from scratch
+                if attempt == self.max_retries:
+                    raise RuntimeError(f"Device call failed after {attempt + 1} attempts") from error
+                time.sleep(self.backoff * 2 ** attempt)
+            else:
+                self._clients.put((client, signed_in_at))
+                return result
+
+    def submit(self, Q: Dict[Tuple[int, int], float]) -> Future:
+        """Queue one QUBO and return a future for its result."""
+        return self._executor.submit(self.execute, Q)
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=True)
+
+
+_SESSIONS: Dict[Tuple, QuanfluenceSession] = {}
+_SESSIONS_LOCK = threading.Lock()
+
+
+def get_session(username: str, password: str, device_id: int, **kwargs) -> QuanfluenceSession:
+    """
+    Return the process-wide session for these arguments, creating it once.
+
+    Every QuanfluenceSession argument is part of the key, defaults filled
+    in, so a different password or max_in_flight gets its own session
+    rather than the settings of an earlier one.
+    """
+    arguments = inspect.signature(QuanfluenceSession).bind(username, password, device_id, **kwargs)
+    arguments.apply_defaults()
+    key = tuple(arguments.arguments.items())
+    with _SESSIONS_LOCK:
+        if key not in _SESSIONS:
+            _SESSIONS[key] = QuanfluenceSession(username, password, device_id, **kwargs)
+        return _SESSIONS[key]
+
+
+class QuanfluenceSampler(QuboSampler):
+    """Sampler running on the Quanfluence server through a shared QuanfluenceSession."""
+
+    def __init__(self, username: str = 'pranatree_user0', password: str = 'Pranatree@123',
+                 device_id: int = 18, **session_kwargs):
+        # To be updated, please request for login credentials from quanfluence
+        self.username = username
+        self.password = password
+        # Please Request from quanfluence or setup with API calls
+        self.device_id = device_id
+        self.session_kwargs = session_kwargs
+
+    @property
+    def session(self) -> QuanfluenceSession:
+        return get_session(self.username, self.password, self.device_id, **self.session_kwargs)
+
+    def sample_qubo(self, Q: Dict[Tuple[int, int], float]) -> Dict:
+        return self.session.execute(Q)
+
+    def sample_qubo_many(self, Q: Dict[Tuple[int, int], float], num_reads: int) -> List[Dict]:
+        """
+        Keep num_reads device jobs in flight and collect them as they finish.
+
+        execute_device_qubo_input returns a single sample and the SDK has no
+        multi-read call, so every read is still its own device job and round
+        trip. They run concurrently on the session's clients (up to
+        max_in_flight), which hides latency but does not remove the calls.
+        """
+        futures = [self.session.submit(Q) for _ in range(num_reads)]
+        return sorted((future.result() for future in futures), key=lambda result: result['energy'])
+
+
+class SimulatedAnnealingSampler(QuboSampler):
+    """
+    Local simulated-annealing sampler.
+
+    Runs num_replicas independent Metropolis chains as one batched array: each
+    sweep visits the variables in order and flips variable i in every replica
+    at once, keeping the local fields of all replicas up to date.
+    """
+
+    def __init__(self, num_replicas: int = 32, num_sweeps: int = 500,
+                 beta_range: Optional[Tuple[float, float]] = None, seed: Optional[int] = None):
+        self.num_replicas = num_replicas
+        self.num_sweeps = num_sweeps
+        self.beta_range = beta_range
+        self.rng = np.random.default_rng(seed)
+
+    @staticmethod
+    def qubo_to_arrays(Q: Dict[Tuple[int, int], float]) -> Tuple[List, np.ndarray, np.ndarray]:
+        """Convert a QUBO dict to (labels, linear, symmetric coupling matrix)."""
+        labels = sorted({v for pair in Q for v in pair})
+        index = {label: k for k, label in enumerate(labels)}
+        n = len(labels)
+        linear = np.zeros(n)
+        couplings = np.zeros((n, n))
+        for (u, v), bias in Q.items():
+            i, j = index[u], index[v]
+            if i == j:
+                linear[i] += bias
+            else:
+                couplings[i, j] += bias
+                couplings[j, i] += bias
+        return labels, linear, couplings
+
+    @staticmethod
+    def default_beta_range(linear: np.ndarray, couplings: np.ndarray) -> Tuple[float, float]:
+        """
+        Pick a hot beta that accepts the largest possible flip half the time and
+        a cold beta that accepts the smallest one 1% of the time.
+        """
+        max_delta = np.max(np.abs(linear) + np.abs(couplings).sum(axis=1), initial=0.0)
+        biases = np.abs(np.concatenate([linear, couplings.ravel()]))
+        biases = biases[biases > 0]
+        if max_delta == 0 or biases.size == 0:
+            return 0.1, 1.0
+        return math.log(2) / max_delta, math.log(100) / biases.min()
+
+    def anneal(self, linear: np.ndarray, couplings: np.ndarray, num_replicas: int
+               ) -> Tuple[np.ndarray, np.ndarray]:
+        """Anneal num_replicas binary states, returning (states, energies)."""
+        n = len(linear)
+        states = self.rng.integers(0, 2, size=(num_replicas, n)).astype(float)
+        fields = linear + states @ couplings
+
+        beta_min, beta_max = self.beta_range or self.default_beta_range(linear, couplings)
+        for beta in np.geomspace(beta_min, beta_max, self.num_sweeps):
+            # Metropolis thresholds for the whole sweep drawn at once
+            thresholds = -np.log(self.rng.random((num_replicas, n))) / beta
+            for i in range(n):
+                step = 1.0 - 2.0 * states[:, i]
+                flip = step * fields[:, i] < thresholds[:, i]
+                if flip.any():
+                    step = np.where(flip, step, 0.0)
+                    states[:, i] += step
+                    fields += np.outer(step, couplings[i])
+
+        energies = states @ linear + 0.5 * np.einsum('ri,ri->r', states @ couplings, states)
+        return states, energies
+
+    def sample_qubo_many(self, Q: Dict[Tuple[int, int], float], num_reads: int) -> List[Dict]:
+        """Anneal at least num_replicas replicas and return the num_reads best."""
+        labels, linear, couplings = self.qubo_to_arrays(Q)
+        states, energies = self.anneal(linear, couplings, max(num_reads, self.num_replicas))
+        spins = (2 * states - 1).astype(int)
+        return [{'result': dict(zip(labels, spins[r].tolist())), 'energy': float(energies[r])}
+                for r in np.argsort(energies)[:num_reads]]
+
+    def sample_qubo(self, Q: Dict[Tuple[int, int], float]) -> Dict:
+        return self.sample_qubo_many(Q, self.num_replicas)[0]
+
+
+class LocalDeviceClient:
+    """
+    Stand-in for quanfluence_sdk.QuanfluenceClient backed by the local annealer.
+
+    Mirrors the signin / update_device / execute_device_qubo_input calls so the
+    session, pipelining and retry logic can run without the device. latency
+    adds a fixed delay per QUBO and failure_rate makes calls fail at random.
+    """
+
+    def __init__(self, latency: float = 0.0, failure_rate: float = 0.0, seed: Optional[int] = None):
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.rng = np.random.default_rng(seed)
+        self.annealer = SimulatedAnnealingSampler(seed=seed)
+        self.signed_in = False
+
+    def signin(self, username: str, password: str) -> None:
+        self.signed_in = True
+
+    def update_device(self, device_id: int, fields: Dict) -> Dict:
+        return {'id': device_id, **fields}
+
+    def execute_device_qubo_input(self, device_id: int, Q: Dict[Tuple[int, int], float]) -> Dict:
+        if not self.signed_in:
+            raise RuntimeError("Not signed in")
+        time.sleep(self.latency)
+        if self.rng.random() < self.failure_rate:
+            raise ConnectionError("Simulated device failure")
+        return self.annealer.sample_qubo(Q)
+
+
+SAMPLERS = {
+    'quanfluence': QuanfluenceSampler,
+    'quanfluence-stub': partial(QuanfluenceSampler, client_factory=LocalDeviceClient),
+    'local': SimulatedAnnealingSampler,
+}
+
+
+def get_sampler(sampler: Union[str, QuboSampler, None] = None, **kwargs) -> QuboSampler:
+    """
+    Resolve a sampler by name or instance.
+
+    Args:
+        sampler: A QuboSampler instance, a name from SAMPLERS, or None to use
+            the CVRP_SAMPLER environment variable (default 'quanfluence')
+        kwargs: Passed to the sampler constructor when a name is given
+
+    Returns:
+        QuboSampler: The sampler to dispatch through
+    """
+    if isinstance(sampler, QuboSampler):
+        return sampler
+    name = sampler or os.environ.get('CVRP_SAMPLER', DEFAULT_SAMPLER)
+    if name not in SAMPLERS:
+        raise ValueError(f"Unknown sampler '{name}', expected one of {sorted(SAMPLERS)}")
+    return SAMPLERS[name](**kwargs)
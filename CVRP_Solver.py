@@ -25,69 +25,30 @@
 #  Description: Solves CVRP using Quanfluence Server
 #------------------------------------------------------------------------------
 
-from CVRP_Clustering_V4 import CVRPSweepCluster, CVRPParser, generate_distance_matrix
+from CVRP_Clustering_V4 import get_clusterer
+from CVRP_Distance import DEFAULT_EDGE_WEIGHT_TYPE, DistanceMatrix
+from CVRP_Parser import read_instance
+from CVRP_QUBO import tsp_qubo_arrays, create_tsp_qubo, build_tsp_qubo
+from CVRP_Samplers import QuboSampler, get_sampler
+from CVRP_Decoder import (samples_to_array, decode_samples, best_valid_tour, expand_reduced_samples,
+                          repair_tour, tour_lengths)
+from CVRP_Decomposition import decompose_cluster, piece_matrix, piece_path, stitch_pieces
+from CVRP_Penalty import calibrate_multiplier
+import CVRP_Metrics as metrics
 from typing import List, Dict, Tuple, Callable, Union, Optional
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from multiprocessing import shared_memory
+import os
 import time 
-from dimod import BinaryQuadraticModel
 import numpy as np
 
 def create_tsp_bqm(distances, multiplier = 1):
     """Create a BQM for TSP with the given distance matrix"""
-    n = len(distances)
-    lagrange = np.mean(distances)
-    bqm = BinaryQuadraticModel('BINARY')
-    
-    # Create numeric variable keys
-    def var_key(i, t):
-        return i * n + t
-    
-    # Add variables
-    for i in range(n):
-        for t in range(n):
-            bqm.add_variable(var_key(i, t), 0.0)
+    # dimod is only needed for the BQM object; run_Solver works on the QUBO dict
+    from dimod import BinaryQuadraticModel
 
-    
-    # Constraint: Each city is visited exactly once (implemented manually)
-    lagrange_city = multiplier*lagrange
-    for i in range(n):
-        # Add quadratic terms for pairs of variables
-        for t1 in range(n):
-            # Add linear term (penalty for not visiting city)
-            bqm.add_variable(var_key(i, t1), -2.0 * lagrange_city) 
-            
-            for t2 in range(t1+1, n):
-                # Add quadratic term (penalty for visiting city more than once)
-                bqm.add_interaction(var_key(i, t1), var_key(i, t2), 2.0 * lagrange_city)
-                
-        # Add constant term (constraint constant)
-        bqm.offset += lagrange_city
-    
-    # Constraint: At each time step, exactly one city is visited (implemented manually)
-    lagrange_time = multiplier*lagrange
-    for t in range(n):
-        # Add quadratic terms for pairs of variables
-        for i1 in range(n):
-            # Add linear term (penalty for not visiting any city at time t)
-            bqm.add_variable(var_key(i1, t), -2.0 * lagrange_time)
-            
-            for i2 in range(i1+1, n):
-                # Add quadratic term (penalty for visiting multiple cities at same time)
-                bqm.add_interaction(var_key(i1, t), var_key(i2, t), 2.0 * lagrange_time)
-                
-        # Add constant term (constraint constant)
-        bqm.offset += lagrange_time
-    
-    # Objective: Minimize total distance
-    for i in range(n):
-        for j in range(n):
-            if i != j:
-                # Consecutive cities
-                for t in range(n-1):
-                    bqm.add_interaction(var_key(i, t), var_key(j, (t+1) % n), distances[i, j])
-                # Connect last city to first
-                bqm.add_interaction(var_key(i, n-1), var_key(j, 0), distances[i, j])
-    
-    return bqm
+    linear, quadratic, offset = tsp_qubo_arrays(distances, multiplier)
+    return BinaryQuadraticModel.from_numpy_vectors(linear, quadratic, offset, 'BINARY')
 
 def decode_solution(solution, n_cities):
     """
@@ -199,7 +160,7 @@ def calculate_tour_length(tour, distances):
         length += distances[tour[i], tour[(i+1) % n]]
     return length
 
-def run_Solver(distances, multiplier, nodes=None):
+def run_Solver(distances, multiplier, nodes=None, sampler: Union[str, QuboSampler, None] = None):
     """
     Run the solver on a distance matrix and return the optimized tour.
     
@@ -212,6 +173,9 @@ def run_Solver(distances, multiplier, nodes=None):
     nodes : list, optional
         List of actual node IDs corresponding to the indices in distances matrix.
         If provided, the returned path will be mapped to these node IDs.
+    sampler : str or QuboSampler, optional
+        Sampler backend or its name (see CVRP_Samplers.SAMPLERS).
+        Defaults to the CVRP_SAMPLER environment variable or 'quanfluence'.
         
     Returns:
     --------
@@ -221,21 +185,10 @@ def run_Solver(distances, multiplier, nodes=None):
         Total length of the optimized tour
     """
     fact = 1 
-    bqm = create_tsp_bqm(distances/fact, multiplier=multiplier)
-    # print(bqm)
-    Q, offset = bqm.to_qubo()
+    Q, offset = create_tsp_qubo(distances/fact, multiplier=multiplier)
 
-    #******* Running on Quanfluence Server *********
-    from quanfluence_sdk import QuanfluenceClient
-
-    client = QuanfluenceClient()
-    try:
-        client.signin('pranatree_user0', 'Pranatree@123')  #To be updated, please request for login credentials from quanfluence
-        device_id = 18                        # Please Request from quanfluence or setup with API calls 
-        device = client.update_device(device_id,{'description':'001'})
-        result = client.execute_device_qubo_input(device_id, Q)
-    except Exception:
-        print("Please use appropriate login credentials")
+    #******* Running on the selected sampler *********
+    result = get_sampler(sampler).sample_qubo(Q)
     
     print(f'Result:{result}')
     spin_opt, energy_opt = result['result'], result['energy'] + offset 
@@ -243,8 +196,10 @@ def run_Solver(distances, multiplier, nodes=None):
     spin_opt = dict_to_numpy(spin_opt, size=len(distances)**2)  
     solution_array = (1+spin_opt)/2
     
-    # Decode the solution to get the tour (indices)
+    # Decode the solution to get the tour (indices), repairing a non-permutation
     tour_indices = decode_solution(solution_array, len(distances))
+    if sorted(tour_indices) != list(range(len(distances))):
+        tour_indices = repair_tour(solution_array.reshape(len(distances), -1), distances)
     
     # Calculate tour length
     length = calculate_tour_length(tour_indices, distances)
@@ -259,7 +214,244 @@ def run_Solver(distances, multiplier, nodes=None):
     else:
         return tour_indices, length
 
-def CVRP_Solver(file_path: str, output_file_path: str = "CVRP_solution.txt"):
+def solve_cluster(distances, nodes, sampler=None, num_reads=5, multiplier=3.6, repair=True,
+                  qubo_options=None):
+    """
+    Solve the TSP of a single cluster from num_reads sampler reads.
+    
+    The QUBO is built once and handed to sampler.sample_qubo_many; the
+    returned sample set is decoded, checked and scored as a whole and the
+    shortest valid tour is kept. How the reads reach the sampler is up to
+    the backend: the local annealer runs them as one batch, the Quanfluence
+    device takes one job per read (see QuanfluenceSampler.sample_qubo_many).
+    Invalid samples are repaired into tours (see CVRP_Decoder.repair_tour)
+    unless repair is off, in which case they are discarded.
+    
+    Parameters:
+    -----------
+    distances : numpy.ndarray
+        Distance matrix of the cluster nodes
+    nodes : list
+        Node IDs of the cluster, depot first
+    sampler : str or QuboSampler, optional
+        Sampler backend or its name
+    num_reads : int, optional
+        Number of samples requested from the sampler
+    multiplier : float or str, optional
+        Multiplier for the BQM parameters, or a penalty mode of
+        CVRP_Penalty.calibrate_multiplier: 'bounds' or 'feedback'
+    repair : bool, optional
+        Repair invalid samples instead of discarding them
+    qubo_options : dict, optional
+        Formulation options of CVRP_QUBO.build_tsp_qubo: reduced (depot fixed
+        at step 0), knn and knn_margin (neighbour pruning)
+        
+    Returns:
+    --------
+    path : list or None
+        Best tour as node IDs, None if no sample was valid and repair is off
+    length : float
+        Length of the best tour, inf if no sample was valid
+    runtime : float
+        Wall time spent on the cluster in seconds
+    stages : dict
+        Seconds of runtime spent in QUBO build ('qubo'), the sampler
+        ('sample') and decoding ('decode')
+    """
+    start_time = time.time()
+    n = len(distances)
+    sampler = get_sampler(sampler)
+    qubo_options = dict(qubo_options or {})
+    # With the depot alone there is nothing left to reduce
+    reduced = qubo_options.pop('reduced', False) and n > 2
+    if not reduced:
+        qubo_options.pop('knn', None)
+
+    stages = {'qubo': 0.0, 'sample': 0.0, 'decode': 0.0}
+
+    def sample(multiplier):
+        start = time.time()
+        Q, offset = build_tsp_qubo(distances, multiplier, reduced, **qubo_options)
+        built = time.time()
+        results = sampler.sample_qubo_many(Q, num_reads)
+        stages['qubo'] += built - start
+        stages['sample'] += time.time() - built
+        if reduced:
+            return expand_reduced_samples(samples_to_array(results, (n - 1)**2), n)
+        return samples_to_array(results, n**2)
+
+    # Calibration rounds sample the same cluster, their tours are kept as reads
+    rounds = []
+    if isinstance(multiplier, str):
+        def evaluate(multiplier):
+            rounds.append(sample(multiplier))
+            return float(decode_samples(rounds[-1], n)[1].mean())
+        formulation = ('reduced-knn' if qubo_options.get('knn') else 'reduced') if reduced else 'full'
+        multiplier = calibrate_multiplier(distances, multiplier, evaluate, formulation)
+    samples = np.vstack(rounds) if rounds else sample(multiplier)
+
+    start_decode = time.time()
+    tour_indices, length, num_valid = best_valid_tour(samples, distances, repair)
+    print(f"Valid samples: {num_valid}/{len(samples)}")
+    end_time = time.time()
+    # Whatever is not build or sampling (array conversion, calibration decodes) counts as decode
+    stages['decode'] = end_time - start_time - stages['qubo'] - stages['sample']
+
+    if tour_indices is None:
+        return None, float('inf'), end_time - start_time, stages
+    path = [nodes[idx] for idx in tour_indices]
+    return path, length, end_time - start_time, stages
+
+def _solve_cluster_shared(shm_name, offset, nodes, sampler, num_reads, multiplier, repair,
+                          qubo_options):
+    """Pool worker: solve one cluster whose distance matrix lives in shared memory."""
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        n = len(nodes)
+        distances = np.ndarray((n, n), dtype=np.float64, buffer=shm.buf, offset=offset)
+        result = solve_cluster(distances, nodes, sampler, num_reads, multiplier, repair,
+                               qubo_options)
+        # Release the view before closing the shared block
+        del distances
+        return result
+    finally:
+        shm.close()
+
+def solve_clusters_parallel(distance_matrices, cluster_nodes, sampler=None, num_reads=5,
+                            multiplier=3.6, workers=None, executor='process', repair=True,
+                            qubo_options=None):
+    """
+    Solve every cluster TSP in a worker pool.
+    
+    Clusters are handed out largest first so the slowest solve starts earliest.
+    With the process executor all distance matrices are packed into a single
+    shared memory block, so workers read them in place instead of receiving
+    pickled copies.
+    
+    Parameters:
+    -----------
+    distance_matrices : list of numpy.ndarray
+        Distance matrix of each cluster
+    cluster_nodes : list of list
+        Node IDs of each cluster, depot first
+    sampler : str or QuboSampler, optional
+        Sampler backend or its name; must be picklable for the process executor
+    num_reads : int, optional
+        Number of sampler reads per cluster
+    multiplier : float or str, optional
+        Multiplier for the BQM parameters or penalty mode, see solve_cluster
+    workers : int, optional
+        Pool size, defaults to min(number of clusters, CPU count); 1 solves serially
+    executor : str, optional
+        'process' for CPU-bound local samplers, 'thread' for device samplers
+    repair, qubo_options : optional
+        See solve_cluster
+        
+    Returns:
+    --------
+    list of (path, length, runtime, stages) tuples in cluster order
+    """
+    num_clusters = len(cluster_nodes)
+    workers = workers or min(num_clusters, os.cpu_count() or 1)
+    if workers <= 1 or num_clusters <= 1:
+        return [solve_cluster(distances, nodes, sampler, num_reads, multiplier, repair, qubo_options)
+                for distances, nodes in zip(distance_matrices, cluster_nodes)]
+
+    order = sorted(range(num_clusters), key=lambda c: len(cluster_nodes[c]), reverse=True)
+
+    if executor == 'thread':
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = {c: pool.submit(solve_cluster, distance_matrices[c], cluster_nodes[c],
+                                      sampler, num_reads, multiplier, repair, qubo_options)
+                       for c in order}
+            return [futures[c].result() for c in range(num_clusters)]
+    if executor != 'process':
+        raise ValueError(f"Unknown executor '{executor}', expected 'process' or 'thread'")
+
+    distance_matrices = [np.ascontiguousarray(d, dtype=np.float64) for d in distance_matrices]
+    offsets = np.cumsum([0] + [d.nbytes for d in distance_matrices]).tolist()
+    shm = shared_memory.SharedMemory(create=True, size=max(offsets[-1], 1))
+    try:
+        for c, distances in enumerate(distance_matrices):
+            np.ndarray(distances.shape, dtype=np.float64, buffer=shm.buf, offset=offsets[c])[:] = distances
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {c: pool.submit(_solve_cluster_shared, shm.name, offsets[c], cluster_nodes[c],
+                                      sampler, num_reads, multiplier, repair, qubo_options)
+                       for c in order}
+            return [futures[c].result() for c in range(num_clusters)]
+    finally:
+        shm.close()
+        shm.unlink()
+
+def solve_clusters_decomposed(distances: DistanceMatrix, cluster_nodes, coordinates, max_variables,
+                              split='angular', sampler=None, num_reads=5, multiplier=3.6,
+                              workers=None, executor='process', repair=True, qubo_options=None):
+    """
+    Solve every cluster TSP with QUBOs of at most max_variables variables.
+    
+    Clusters over the budget are split into pieces with fixed entry and exit
+    nodes (see CVRP_Decomposition.decompose_cluster). The pieces of all
+    clusters are solved together by solve_clusters_parallel and stitched back
+    into one route per cluster; a cluster is invalid if any of its pieces is.
+    
+    Parameters:
+    -----------
+    distances : DistanceMatrix
+        Distances of the whole problem
+    cluster_nodes : list of list
+        Node IDs of each cluster, depot first
+    coordinates : dict
+        Node ID to coordinates, used to split clusters
+    max_variables : int
+        QUBO variable budget per piece
+    split : str, optional
+        'angular' or 'spatial', see CVRP_Decomposition.decompose_cluster
+    sampler, num_reads, multiplier, workers, executor, repair, qubo_options :
+        See solve_clusters_parallel
+        
+    Returns:
+    --------
+    list of (path, length, runtime, stages) tuples in cluster order; runtime
+    and stages are sums over the pieces of the cluster
+    """
+    reduced = bool((qubo_options or {}).get('reduced'))
+    cluster_pieces = [decompose_cluster(nodes, distances, coordinates, max_variables, split, reduced)
+                      for nodes in cluster_nodes]
+    # Pieces with a single interior node have only one order and need no QUBO
+    jobs = [(c, p) for c, pieces in enumerate(cluster_pieces)
+            for p, piece in enumerate(pieces) if len(piece[1]) > 1]
+    matrices = [piece_matrix(distances, cluster_pieces[c][p]) for c, p in jobs]
+    results = solve_clusters_parallel(matrices, [list(range(len(m))) for m in matrices], sampler,
+                                      num_reads, multiplier, workers, executor, repair, qubo_options)
+    tours = dict(zip(jobs, results))
+
+    cluster_results = []
+    for c, (nodes, pieces) in enumerate(zip(cluster_nodes, cluster_pieces)):
+        paths, runtime, stages = [], 0.0, {'qubo': 0.0, 'sample': 0.0, 'decode': 0.0}
+        for p, piece in enumerate(pieces):
+            if (c, p) not in tours:
+                paths.append(piece[1])
+                continue
+            tour, _, piece_runtime, piece_stages = tours[(c, p)]
+            runtime += piece_runtime
+            for stage, seconds in piece_stages.items():
+                stages[stage] += seconds
+            paths.append(None if tour is None else piece_path(piece, tour))
+        if any(path is None for path in paths):
+            cluster_results.append((None, float('inf'), runtime, stages))
+            continue
+        route = stitch_pieces(pieces, paths, nodes[0])
+        length = float(tour_lengths(np.arange(len(route)), distances.submatrix(route))[0])
+        cluster_results.append((route, length, runtime, stages))
+    return cluster_results
+
+def CVRP_Solver(file_path: str, output_file_path: str = "CVRP_solution.txt",
+                sampler: Union[str, QuboSampler, None] = None,
+                workers: Optional[int] = None, executor: str = 'process',
+                distance_dtype=np.float64, sweep_starts=None, clustering: str = 'sweep',
+                instance_cache: bool = False, max_qubo_variables: Optional[int] = None,
+                split: str = 'angular', repair: bool = True, reduced_qubo: bool = False,
+                knn: Optional[int] = None, penalty: Union[float, str] = 'bounds'):
     """
     Solve the CVRP problem using solver and write the results to a text file.
     
@@ -269,17 +461,119 @@ def CVRP_Solver(file_path: str, output_file_path: str = "CVRP_solution.txt"):
         Path to the CVRP problem file
     output_file_path : str, optional
         Path to the output file where results will be stored
+    sampler : str or QuboSampler, optional
+        Sampler backend or its name, shared by every cluster
+    workers : int, optional
+        Number of clusters solved in parallel (see solve_clusters_parallel)
+    executor : str, optional
+        'process' or 'thread' pool for the per-cluster solves
+    distance_dtype : numpy dtype, optional
+        Precision of the problem distance matrix, float32 halves its memory
+    sweep_starts : 'all', int or list of int, optional
+        Multi-start sweep (see CVRPSweepCluster.create_clusters_multistart),
+        run on `workers` processes; None sweeps once from angle 0
+    clustering : str, optional
+        Clustering engine from CVRP_Clustering_V4.CLUSTERERS: 'sweep' or
+        'kmeans' (capacitated k-means, for customers not spread around the depot)
+    instance_cache : bool, optional
+        Keep the parsed instance in a memory-mapped <file_path>.npz sidecar
+        (see CVRP_Parser.read_instance)
+    max_qubo_variables : int, optional
+        QUBO variable budget per sampler call; larger clusters are split into
+        pieces (see solve_clusters_decomposed). None solves each cluster whole
+    split : str, optional
+        'angular' or 'spatial' splitting of clusters over max_qubo_variables
+    repair : bool, optional
+        Repair invalid sampler outputs into tours instead of discarding them
+    reduced_qubo : bool, optional
+        Fix the depot at the first time step, (n-1)**2 instead of n**2 variables
+    knn : int, optional
+        With reduced_qubo, keep tour couplers only between near neighbours
+        (see CVRP_QUBO.reduced_tsp_qubo_arrays); None keeps them all
+    penalty : float or str, optional
+        Constraint penalty of the cluster QUBOs: a fixed multiplier of the mean
+        distance, or 'bounds' / 'feedback' to calibrate it per cluster
+        (see CVRP_Penalty.calibrate_multiplier)
+        
+    Returns:
+    --------
+    dict, see solve_CVRP_instance, with the file read time in timings['parse'];
+    also prints results and writes solution to file
+    """
+    start_time_parse = time.time()
+    instance = read_instance(file_path, cache=instance_cache)
+    if instance.points is None:
+        raise ValueError(f"{file_path} has no node coordinates, which clustering needs")
+
+    distances = None
+    if instance.matrix is not None:
+        distances = instance.distance_matrix(distance_dtype)
+    parse_time = time.time() - start_time_parse
+    result = solve_CVRP_instance(instance.coordinates, instance.demands, instance.capacity,
+                        instance.num_vehicles, output_file_path,
+                        problem_name=file_path, num_nodes=instance.dimension, sampler=sampler,
+                        workers=workers, executor=executor,
+                        edge_weight_type=instance.edge_weight_type, distances=distances,
+                        distance_dtype=distance_dtype, sweep_starts=sweep_starts,
+                        clustering=clustering, max_qubo_variables=max_qubo_variables, split=split,
+                        repair=repair, reduced_qubo=reduced_qubo, knn=knn, penalty=penalty)
+    result["timings"]["parse"] = parse_time
+    metrics.record('parse', parse_time, solver='qubo')
+    return result
+
+def solve_CVRP_instance(coordinates: Dict[int, Tuple[float, float]], demands: Dict[int, int],
+                        capacity: int, num_vehicles: int,
+                        output_file_path: Optional[str] = "CVRP_solution.txt", problem_name: str = "",
+                        num_nodes: Optional[int] = None,
+                        sampler: Union[str, QuboSampler, None] = None,
+                        workers: Optional[int] = None, executor: str = 'process',
+                        edge_weight_type: str = DEFAULT_EDGE_WEIGHT_TYPE,
+                        distances: Optional[DistanceMatrix] = None,
+                        distance_dtype=np.float64, sweep_starts=None, clustering: str = 'sweep',
+                        max_qubo_variables: Optional[int] = None, split: str = 'angular',
+                        repair: bool = True, reduced_qubo: bool = False, knn: Optional[int] = None,
+                        penalty: Union[float, str] = 'bounds'):
+    """
+    Solve an already parsed CVRP instance and return the results as a dict.
+    
+    Parameters:
+    -----------
+    coordinates : dict
+        Node ID to (x, y) coordinates, depot is node 1
+    demands : dict
+        Node ID to demand
+    capacity : int
+        Vehicle capacity
+    num_vehicles : int
+        Number of vehicles (clusters)
+    output_file_path : str or None, optional
+        Path to the output file where results will be stored, None to skip it
+    problem_name : str, optional
+        Problem label written to the output file
+    num_nodes : int, optional
+        Number of nodes including the depot, defaults to len(coordinates)
+    sampler, workers, executor, distance_dtype, sweep_starts, clustering,
+    max_qubo_variables, split, repair, reduced_qubo, knn, penalty :
+        See CVRP_Solver
+    edge_weight_type : str, optional
+        EUC_2D, or GEO for (lat, lon) coordinates in degrees
+    distances : DistanceMatrix, optional
+        Precomputed distances of the problem, e.g. an EXPLICIT matrix;
+        overrides edge_weight_type
         
     Returns:
     --------
-    None, prints results to console and writes solution to file
+    dict
+        JSON-ready result: per-cluster nodes, path (node IDs, None if invalid),
+        length, demand and runtime, plus totals and per-stage timings in seconds
+        (clustering, distanceMatrix, solve split into qubo / sample / decode,
+        write, total)
     """
-    with open(file_path, 'r') as file:
-        file_content = file.read()
+    if num_nodes is None:
+        num_nodes = len(coordinates)
 
     start_time_total = time.time()
     start_time_clustering = time.time()
-    coordinates, demands, capacity, num_nodes, num_vehicles = CVRPParser.parse_file(file_content)
     
     # Print problem information
     print(f"\nProblem Information:")
@@ -288,10 +582,15 @@ def CVRP_Solver(file_path: str, output_file_path: str = "CVRP_solution.txt"):
     print(f"Vehicle capacity: {capacity}")
     
     # Create clustering object
-    clusterer = CVRPSweepCluster(coordinates, demands, capacity, num_vehicles)
+    clusterer = get_clusterer(clustering, coordinates, demands, capacity, num_vehicles)
     
     # Create clusters
-    clusters, cluster_demands = clusterer.create_clusters()
+    if sweep_starts is None:
+        clusters, cluster_demands = clusterer.create_clusters()
+    else:
+        clusters, cluster_demands = clusterer.create_clusters_multistart(sweep_starts, workers)
+        print(f"Best sweep start: {clusterer.sweep_start}")
+    sampler = get_sampler(sampler)
     end_time_clustering = time.time()
     Total_distance = 0
     
@@ -301,45 +600,46 @@ def CVRP_Solver(file_path: str, output_file_path: str = "CVRP_solution.txt"):
     # Store all cluster solutions for writing to file
     all_clusters_data = []
     
-    j = 0 
-    for cluster in clusters:
-        j+= 1
+    start_time_matrix = time.time()
+    # One matrix for the whole problem, each cluster gathers its rows from it
+    if distances is None:
+        distances = DistanceMatrix.from_coordinates(coordinates, edge_weight_type, distance_dtype)
+    cluster_nodes = []
+    distance_matrices = []
+    for j, cluster in enumerate(clusters, 1):
         print(f"\nCluster {j}:")
         # Include depot as first node
-        cluster = sorted(cluster)
-        nodes = [1] + cluster
+        nodes = [1] + sorted(cluster)
         print(f"Cluster nodes: {nodes}")
-        
-        distances = generate_distance_matrix(coordinates, nodes)
-        # print(distances)
-        
-        # Solve 
-        start_time = time.time()
-        best_length = []
-        best_path = []
-        n = 5
-        for k in range(n):
-            # Solve TSP with node mapping
-            n_cities = len(distances)
-            path_k, length_k = run_Solver(distances, multiplier=3.6, nodes=nodes)
-            
-            if set(path_k) == set(nodes):   
-                best_length.append(length_k)
-                best_path.append(path_k)
+        cluster_nodes.append(nodes)
+        distance_matrices.append(distances.submatrix(nodes))
+    end_time_matrix = time.time()
+    
+    # Solve 
+    n = 5
+    qubo_options = {'reduced': reduced_qubo, 'knn': knn}
+    if max_qubo_variables is None:
+        cluster_results = solve_clusters_parallel(distance_matrices, cluster_nodes, sampler,
+                                                  num_reads=n, multiplier=penalty,
+                                                  workers=workers, executor=executor, repair=repair,
+                                                  qubo_options=qubo_options)
+    else:
+        cluster_results = solve_clusters_decomposed(distances, cluster_nodes, coordinates,
+                                                    max_qubo_variables, split, sampler,
+                                                    num_reads=n, multiplier=penalty,
+                                                    workers=workers, executor=executor,
+                                                    repair=repair, qubo_options=qubo_options)
+    end_time_solve = time.time()
 
-        # Calculate best path and length in samples
-        if len(best_length) == 0:
+    for j, (path, length, runtime_cluster, _) in enumerate(cluster_results, 1):
+        print(f"\nCluster {j}:")
+        if path is None:
             print('Invalid Solution')
             all_clusters_data.append((None, float('inf')))  # Store invalid solution
         else:
-            length = min(best_length)
-            path = best_path[best_length.index(length)]
-
             all_clusters_data.append((path, length))  # Store valid solution
             
             Total_distance += length
-            end_time = time.time()
-            runtime_cluster = end_time - start_time 
             print_solution(path, length)
             print(f"Runtime: {runtime_cluster:.2f} seconds")
     
@@ -352,8 +652,56 @@ def CVRP_Solver(file_path: str, output_file_path: str = "CVRP_solution.txt"):
     print(f'\nAverage runtime: {Average_runtime:.2f} seconds')
     
     # Write solutions to file
+    if output_file_path is not None:
+        write_solution_file(output_file_path, problem_name, num_nodes, num_vehicles, capacity,
+                            all_clusters_data, Total_distance, runtime, Average_runtime)
+    end_time_write = time.time()
+    if metrics.enabled():
+        metrics.record('cluster', end_time_clustering - start_time_clustering, solver='qubo')
+        metrics.record('matrix', end_time_matrix - start_time_matrix, solver='qubo')
+        for j, (_, _, _, stages) in enumerate(cluster_results, 1):
+            metrics.record('build_qubo', stages['qubo'], solver='qubo', cluster=j)
+            metrics.record('sample', stages['sample'], solver='qubo', cluster=j)
+            metrics.record('decode', stages['decode'], solver='qubo', cluster=j)
+        metrics.record('write', end_time_write - end_time_total, solver='qubo')
+
+    return {
+        "problem": problem_name,
+        "numNodes": num_nodes,
+        "numVehicles": num_vehicles,
+        "capacity": capacity,
+        "clusters": [
+            {
+                "cluster": j,
+                "nodes": nodes,
+                "path": path,
+                "length": None if path is None else length,
+                "demand": cluster_demand,
+                "runtime": runtime_cluster,
+            }
+            for j, (nodes, cluster_demand, (path, length, runtime_cluster, _))
+            in enumerate(zip(cluster_nodes, cluster_demands, cluster_results), 1)
+        ],
+        "totalDistance": Total_distance,
+        "runtime": runtime,
+        "averageRuntime": Average_runtime,
+        "timings": {
+            "clustering": end_time_clustering - start_time_clustering,
+            "distanceMatrix": end_time_matrix - start_time_matrix,
+            "solve": end_time_solve - end_time_matrix,
+            # Summed over clusters, so with parallel workers they can exceed solve
+            **{stage: sum(result[3][stage] for result in cluster_results)
+               for stage in ('qubo', 'sample', 'decode')},
+            "write": end_time_write - end_time_total,
+            "total": end_time_write - start_time_total,
+        },
+    }
+
+def write_solution_file(output_file_path, problem_name, num_nodes, num_vehicles, capacity,
+                        all_clusters_data, Total_distance, runtime, Average_runtime):
+    """Write the cluster solutions and summary in the CVRP_solution.txt format."""
     with open(output_file_path, 'w') as output_file:
-        output_file.write(f"Problem: {file_path}\n")
+        output_file.write(f"Problem: {problem_name}\n")
         output_file.write(f"Number of nodes: {num_nodes}\n")
         output_file.write(f"Number of vehicles: {num_vehicles}\n")
         output_file.write(f"Vehicle capacity: {capacity}\n\n")
@@ -379,5 +727,6 @@ if __name__ == "__main__":
     # txt_file_path = "./Map_Datasets/E-n22-k4.txt"
     import sys
     txt_file_path = sys.argv[1] if len(sys.argv) > 1 else "./Map_Datasets/E-n22-k4.txt"
+    sampler_name = sys.argv[2] if len(sys.argv) > 2 else None  # e.g. 'local'
     output_path = "./CVRP_solution.txt"  # Default output path
-    CVRP_Solver(txt_file_path, output_path)
+    CVRP_Solver(txt_file_path, output_path, sampler=sampler_name)
@@ -0,0 +1,122 @@
+"""
+Benchmark CP-SAT model construction and route reconstruction time and memory.
+
+The array builder of classical_OR_2 is compared with the previous networkx
+builder (skipped when networkx is not installed). Memory is the Python heap
+peak seen by tracemalloc; the model size is given as its constraint count.
+
+Run from the repository root:
+    python -m benchmarks.cpsat_build --sizes 100 500 2000
+"""
+
+import argparse
+import time
+import tracemalloc
+import numpy as np
+from ortools.sat.python import cp_model
+
+from classical_OR_2 import build_cpsat_model, routes_from_successors
+
+
+def random_instance(n, k, seed=0):
+    rng = np.random.default_rng(seed)
+    points = rng.random((n + 1, 2)) * 100
+    costs = (np.hypot(*(points[:, None, :] - points[None, :, :]).transpose(2, 0, 1)) * 100).astype(int)
+    q = rng.integers(1, 30, n + 1)
+    q[0] = 0
+    capacity = int(np.ceil(q.sum() / k * 1.2))
+    return costs, q, capacity
+
+
+def legacy_build(costs, q, capacity, k):
+    """The networkx model build that classical_OR_2 used before."""
+    import networkx as nx
+    n = len(costs) - 1
+    G = nx.complete_graph(n + 1, nx.DiGraph())
+    model = cp_model.CpModel()
+    x = {(i, j): model.NewBoolVar(f'x_{i}_{j}') for i, j in G.edges}
+    u = {i: model.NewIntVar(0 if i == 0 else int(q[i]), capacity, f'u_{i}') for i in G.nodes}
+    model.Minimize(sum(int(costs[i, j]) * x[(i, j)] for i, j in G.edges))
+    for j in range(1, n + 1):
+        model.Add(sum(x[(i, j)] for i in G.predecessors(j)) == 1)
+        model.Add(sum(x[(j, i)] for i in G.successors(j)) == 1)
+    model.Add(sum(x[(0, j)] for j in G.successors(0)) == k)
+    for i, j in G.edges:
+        if j != 0:
+            model.Add(u[i] - u[j] + capacity * x[(i, j)] <= capacity - int(q[j]))
+    return model
+
+
+def legacy_routes(used_edges, depot=0):
+    """The edge-list route reconstruction classical_OR_2 used before."""
+    routes, remaining = [], list(used_edges)
+    for edge in [(i, j) for i, j in remaining if i == depot]:
+        route, current = [depot, edge[1]], edge[1]
+        remaining.remove(edge)
+        while current != depot:
+            nxt = [(i, j) for i, j in remaining if i == current][0]
+            current = nxt[1]
+            route.append(current)
+            remaining.remove(nxt)
+        routes.append(route)
+    return routes
+
+
+def measure(fn):
+    """(seconds, Python heap peak in MB, result) of fn(); tracing slows it, so it runs twice."""
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    result = fn()
+    peak = tracemalloc.get_traced_memory()[1] / 2**20
+    tracemalloc.stop()
+    return elapsed, peak, result
+
+
+def random_routes(n, k, seed=0):
+    """Successor array and depot successors of k random routes over n customers."""
+    order = np.random.default_rng(seed).permutation(np.arange(1, n + 1))
+    successor = np.zeros(n + 1, dtype=np.int64)
+    firsts = []
+    for route in np.array_split(order, k):
+        firsts.append(route[0])
+        successor[route[:-1]] = route[1:]
+        successor[route[-1]] = 0
+    return successor, firsts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100, 500, 2000])
+    parser.add_argument('--vehicles', type=int, default=10)
+    parser.add_argument('--no-legacy', action='store_true', help="only time the array builder")
+    args = parser.parse_args()
+    try:
+        import networkx  # noqa: F401
+        legacy = not args.no_legacy
+    except ImportError:
+        legacy = False
+
+    print(f"{'n':>5} {'builder':<8} {'build (s)':>10} {'heap (MB)':>10} {'constraints':>11} {'routes (s)':>11}")
+    for n in args.sizes:
+        costs, q, capacity = random_instance(n, args.vehicles)
+        successor, firsts = random_routes(n, args.vehicles)
+
+        t_build, peak, (model, *_) = measure(lambda: build_cpsat_model(costs, q, capacity, args.vehicles))
+        size = len(model.Proto().constraints)
+        del model
+        t_routes = measure(lambda: routes_from_successors(successor, firsts))[0]
+        print(f"{n:>5} {'arrays':<8} {t_build:>10.2f} {peak:>10.1f} {size:>11} {t_routes:>11.4f}")
+
+        if legacy:
+            t_build, peak, model = measure(lambda: legacy_build(costs, q, capacity, args.vehicles))
+            size = len(model.Proto().constraints)
+            del model
+            edges = [(i, int(successor[i])) for i in range(1, n + 1)] + [(0, int(f)) for f in firsts]
+            t_routes = measure(lambda: legacy_routes(edges))[0]
+            print(f"{n:>5} {'networkx':<8} {t_build:>10.2f} {peak:>10.1f} {size:>11} {t_routes:>11.4f}")
+
+
+if __name__ == "__main__":
+    main()
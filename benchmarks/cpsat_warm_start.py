@@ -0,0 +1,82 @@
+"""
+Benchmark CP-SAT time to first and to good solutions with warm starts.
+
+Each configuration of solve_cvrp_cpsat is run with the same time limit and a
+callback that records when every improving solution was found:
+
+    baseline   no hint, solver defaults
+    hint       sweep clusters + 2-opt tours as solution hint
+    workers    hint plus --workers parallel search workers
+    symmetry   hint plus route direction symmetry breaking
+
+Run from the repository root:
+    python -m benchmarks.cpsat_warm_start --instances E-n76-k8 E-n101-k8 --time-limit 30
+"""
+
+import argparse
+import contextlib
+import io
+import time
+from ortools.sat.python import cp_model
+
+from classical_OR_2 import solve_cvrp_cpsat
+from CVRP_Parser import read_instance
+
+CONFIGS = {
+    'baseline': {},
+    'hint': {'hint': 'sweep'},
+    'workers': {'hint': 'sweep', 'num_workers': None},
+    'symmetry': {'hint': 'sweep', 'break_symmetry': True},
+}
+
+
+class Trace(cp_model.CpSolverSolutionCallback):
+    """Record (seconds since start, objective) of every solution found."""
+
+    def __init__(self):
+        super().__init__()
+        self.start = time.perf_counter()
+        self.points = []
+
+    def on_solution_callback(self):
+        self.points.append((time.perf_counter() - self.start, self.ObjectiveValue() / 100))
+
+    def objective_at(self, seconds):
+        found = [objective for t, objective in self.points if t <= seconds]
+        return found[-1] if found else float('nan')
+
+
+def run(path, config, time_limit):
+    instance = read_instance(path)
+    trace = Trace()
+    with contextlib.redirect_stdout(io.StringIO()):
+        _, total, status = solve_cvrp_cpsat(instance.dimension, instance.capacity, instance.coordinates,
+                                            instance.demands, instance.num_vehicles, time_limit,
+                                            edge_weight_type=instance.edge_weight_type,
+                                            solution_callback=trace, **config)
+    return trace, total, status
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--instances', nargs='+', default=['E-n76-k8', 'E-n101-k8'])
+    parser.add_argument('--configs', nargs='+', choices=sorted(CONFIGS), default=list(CONFIGS))
+    parser.add_argument('--time-limit', type=float, default=30)
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--checkpoints', type=float, nargs='+', default=[1, 5, 10])
+    args = parser.parse_args()
+    CONFIGS['workers']['num_workers'] = args.workers
+
+    columns = ' '.join(f"{f'@{c:g}s':>9}" for c in args.checkpoints)
+    print(f"{'instance':<10} {'config':<9} {'first (s)':>9} {'first':>9} {columns} {'final':>9} status")
+    for instance in args.instances:
+        for name in args.configs:
+            trace, total, status = run(f"Datasets/{instance}.txt", CONFIGS[name], args.time_limit)
+            first_t, first = trace.points[0] if trace.points else (float('nan'), float('nan'))
+            at = ' '.join(f"{trace.objective_at(c):>9.1f}" for c in args.checkpoints)
+            print(f"{instance:<10} {name:<9} {first_t:>9.2f} {first:>9.1f} {at} {total:>9.1f} "
+                  f"{getattr(status, 'name', status)}")
+
+
+if __name__ == "__main__":
+    main()
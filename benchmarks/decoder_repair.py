@@ -0,0 +1,74 @@
+"""
+Benchmark discarding vs repairing invalid sampler outputs.
+
+Random clusters are sampled with the local annealer on a short schedule, so
+many samples break the one-hot constraints. For each number of reads the
+best tour among the first reads is scored both ways: 'discard' keeps valid
+samples only, 'repair' also uses the tours repair_tour builds from invalid
+ones. Lengths are relative to a nearest-neighbour + 2-opt tour, averaged
+over the trials that found a tour; '-' means no trial did in that many reads.
+
+Run from the repository root:
+    python -m benchmarks.decoder_repair --sizes 8 12 16 --reads 1 2 5 10
+"""
+
+import argparse
+import time
+import numpy as np
+import scipy.optimize  # noqa: F401  loaded up front so decode times exclude the import
+
+from CVRP_Decoder import best_valid_tour, samples_to_array
+from CVRP_Heuristics import solve_tour
+from CVRP_QUBO import create_tsp_qubo
+from CVRP_Samplers import SimulatedAnnealingSampler
+
+
+def random_distances(n, seed=0):
+    points = np.random.default_rng(seed).random((n, 2)) * 100
+    return np.linalg.norm(points[:, None, :] - points[None, :, :], axis=-1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[8, 12, 16])
+    parser.add_argument('--reads', type=int, nargs='+', default=[1, 2, 5, 10])
+    parser.add_argument('--sweeps', type=int, default=50, help="annealing sweeps per read")
+    parser.add_argument('--trials', type=int, default=5)
+    args = parser.parse_args()
+
+    reads = sorted(args.reads)
+    columns = ' '.join(f"{f'{r} reads':>9}" for r in reads)
+    print(f"{'n':>3} {'decoder':<8} {'valid %':>8} {'decode ms':>10} {columns}")
+    for n in args.sizes:
+        gaps = {'discard': [], 'repair': []}
+        times = {'discard': 0.0, 'repair': 0.0}
+        valid_rate = []
+        for trial in range(args.trials):
+            distances = random_distances(n, seed=trial)
+            reference = solve_tour(distances)[1]
+            Q, _ = create_tsp_qubo(distances, multiplier=3.6)
+            sampler = SimulatedAnnealingSampler(num_replicas=max(reads), num_sweeps=args.sweeps, seed=trial)
+            samples = samples_to_array(sampler.sample_qubo_many(Q, max(reads)), n * n)
+            for name, repair in (('discard', False), ('repair', True)):
+                row = []
+                for r in reads:
+                    start = time.perf_counter()
+                    _, length, num_valid = best_valid_tour(samples[:r], distances, repair)
+                    times[name] += time.perf_counter() - start
+                    row.append(length / reference - 1)
+                gaps[name].append(row)
+            valid_rate.append(num_valid / max(reads))
+
+        for name in ('discard', 'repair'):
+            gap = np.array(gaps[name])
+            # Mean gap over the trials that found a tour, '-' when none did
+            cells = []
+            for column in gap.T:
+                found = column[np.isfinite(column)]
+                cells.append(f"{100 * found.mean():>8.1f}%" if len(found) else f"{'-':>9}")
+            decode_ms = 1000 * times[name] / (args.trials * len(reads))
+            print(f"{n:>3} {name:<8} {100 * np.mean(valid_rate):>7.1f}% {decode_ms:>10.2f} {' '.join(cells)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Benchmark solver start-up cost with `python -X importtime`.
+
+Run from the repository root:
+    python -m benchmarks.import_time --max-ms 500
+
+Each module is imported in a fresh interpreter; the cumulative import time of
+the module (best of --repeats runs) and its heaviest dependencies are
+reported. With --max-ms the exit code is 1 when any module exceeds the budget.
+"""
+
+import argparse
+import re
+import subprocess
+import sys
+
+MODULES = ["CVRP_Clustering_V4", "CVRP_Solver", "classical_OR_2"]
+LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def import_times(module):
+    """
+    Import module in a fresh interpreter.
+
+    Returns:
+        (total, children): cumulative microseconds of the module and
+        {direct dependency: cumulative microseconds}
+    """
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                          capture_output=True, text=True, check=True)
+    entries = [(m.group(4), int(m.group(2)), len(m.group(3)))
+               for m in map(LINE.match, proc.stderr.splitlines()) if m]
+    index = max(i for i, (name, _, _) in enumerate(entries) if name == module)
+    total, depth = entries[index][1], entries[index][2]
+
+    # Dependencies are listed just before the module, indented one level deeper
+    children = {}
+    for name, cumulative, indent in reversed(entries[:index]):
+        if indent <= depth:
+            break
+        if indent == depth + 2:
+            children[name] = cumulative
+    return total, children
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('modules', nargs='*', default=MODULES)
+    parser.add_argument('--repeats', type=int, default=3)
+    parser.add_argument('--top', type=int, default=5, help="heaviest dependencies to list")
+    parser.add_argument('--max-ms', type=float, default=None, help="fail above this budget")
+    args = parser.parse_args()
+
+    over_budget = []
+    for module in args.modules:
+        total, children = min((import_times(module) for _ in range(args.repeats)),
+                              key=lambda run: run[0])
+        total_ms = total / 1000
+        print(f"{module}: {total_ms:.1f} ms")
+        for name in sorted(children, key=children.get, reverse=True)[:args.top]:
+            print(f"    {name:<30} {children[name] / 1000:8.1f} ms")
+        if args.max_ms is not None and total_ms > args.max_ms:
+            over_budget.append(module)
+
+    if over_budget:
+        print(f"Over the {args.max_ms:.0f} ms budget: {', '.join(over_budget)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
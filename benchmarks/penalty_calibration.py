@@ -0,0 +1,72 @@
+"""
+Benchmark the fixed QUBO penalty multiplier against calibrated penalties.
+
+For each cluster size a few random clusters are sampled with the local
+annealer under the fixed multiplier, the 'bounds' penalty and the
+'feedback' penalty (see CVRP_Penalty). Reported are the mean multiplier,
+sampler calls per cluster, the share of valid samples and the best tour
+length relative to a nearest-neighbour + 2-opt tour. Feedback calibrates on
+the first cluster of each size and reuses the cached factor for the rest.
+
+Run from the repository root:
+    python -m benchmarks.penalty_calibration --sizes 8 12 16 --trials 4
+"""
+
+import argparse
+import numpy as np
+
+from CVRP_Decoder import best_valid_tour, decode_samples, samples_to_array
+from CVRP_Heuristics import solve_tour
+from CVRP_Penalty import PenaltyCache, calibrate_multiplier
+from CVRP_QUBO import build_tsp_qubo
+from CVRP_Samplers import SimulatedAnnealingSampler
+
+
+def random_distances(n, seed=0):
+    points = np.random.default_rng(seed).random((n, 2)) * 100
+    return np.linalg.norm(points[:, None, :] - points[None, :, :], axis=-1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[8, 12, 16])
+    parser.add_argument('--trials', type=int, default=4)
+    parser.add_argument('--reads', type=int, default=8)
+    parser.add_argument('--sweeps', type=int, default=200)
+    parser.add_argument('--fixed', type=float, default=3.6, help="fixed multiplier to compare against")
+    args = parser.parse_args()
+
+    print(f"{'n':>3} {'penalty':<8} {'multiplier':>10} {'calls':>6} {'valid %':>8} {'gap':>7}")
+    for n in args.sizes:
+        for penalty in (args.fixed, 'bounds', 'feedback'):
+            cache = PenaltyCache()
+            multipliers, calls, valid, gaps = [], [], [], []
+            for trial in range(args.trials):
+                distances = random_distances(n, seed=trial)
+                sampler = SimulatedAnnealingSampler(num_replicas=args.reads, num_sweeps=args.sweeps, seed=trial)
+                rounds = []
+
+                def sample(multiplier):
+                    Q, _ = build_tsp_qubo(distances, multiplier)
+                    rounds.append(samples_to_array(sampler.sample_qubo_many(Q, args.reads), n * n))
+                    return float(decode_samples(rounds[-1], n)[1].mean())
+
+                multiplier = penalty
+                if isinstance(penalty, str):
+                    multiplier = calibrate_multiplier(distances, penalty, sample, cache=cache)
+                if not rounds:
+                    sample(multiplier)
+                samples = np.vstack(rounds)
+                _, length, num_valid = best_valid_tour(samples, distances)
+                multipliers.append(multiplier)
+                calls.append(len(rounds))
+                valid.append(num_valid / len(samples))
+                if np.isfinite(length):
+                    gaps.append(length / solve_tour(distances)[1] - 1)
+            gap = f"{100 * np.mean(gaps):>6.1f}%" if gaps else f"{'-':>7}"
+            print(f"{n:>3} {str(penalty):<8} {np.mean(multipliers):>10.2f} {np.mean(calls):>6.1f} "
+                  f"{100 * np.mean(valid):>7.1f}% {gap}")
+
+
+if __name__ == "__main__":
+    main()
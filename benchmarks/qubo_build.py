@@ -0,0 +1,50 @@
+"""
+Benchmark TSP QUBO build time against cluster size.
+
+Run from the repository root:
+    python -m benchmarks.qubo_build --sizes 10 20 30 40
+"""
+
+import argparse
+import time
+import numpy as np
+
+from CVRP_QUBO import tsp_qubo_arrays, create_tsp_qubo
+from CVRP_Solver import create_tsp_bqm
+
+
+def time_call(fn, repeats):
+    """Return the best wall time of fn() over repeats runs."""
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def random_distances(n, seed=0):
+    rng = np.random.default_rng(seed)
+    points = rng.random((n, 2)) * 100
+    return np.linalg.norm(points[:, None, :] - points[None, :, :], axis=-1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10, 20, 30, 40])
+    parser.add_argument('--repeats', type=int, default=3)
+    parser.add_argument('--multiplier', type=float, default=3.6)
+    args = parser.parse_args()
+
+    print(f"{'n':>4} {'vars':>6} {'couplers':>9} {'arrays (s)':>11} {'qubo dict (s)':>14} {'bqm (s)':>9}")
+    for n in args.sizes:
+        distances = random_distances(n)
+        _, (rows, _, _), _ = tsp_qubo_arrays(distances, args.multiplier)
+        t_arrays = time_call(lambda: tsp_qubo_arrays(distances, args.multiplier), args.repeats)
+        t_dict = time_call(lambda: create_tsp_qubo(distances, args.multiplier), args.repeats)
+        t_bqm = time_call(lambda: create_tsp_bqm(distances, args.multiplier), args.repeats)
+        print(f"{n:>4} {n * n:>6} {rows.size:>9} {t_arrays:>11.4f} {t_dict:>14.4f} {t_bqm:>9.4f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Benchmark the full TSP QUBO against the reduced (depot fixed) formulation.
+
+For each cluster size the full one-hot QUBO, the reduced one and the
+reduced one with k-nearest-neighbour pruning are built and sampled with the
+same local annealer. Reported are variables, couplers (distinct pairs),
+build time of the QUBO dict, sampler time, the share of valid samples and
+the best tour length relative to a nearest-neighbour + 2-opt tour.
+
+Run from the repository root:
+    python -m benchmarks.qubo_reduced --sizes 10 15 20 --knn 4
+"""
+
+import argparse
+import time
+import numpy as np
+
+from CVRP_Decoder import best_valid_tour, expand_reduced_samples, samples_to_array
+from CVRP_Heuristics import solve_tour
+from CVRP_QUBO import build_tsp_qubo
+from CVRP_Samplers import SimulatedAnnealingSampler
+
+
+def random_distances(n, seed=0):
+    points = np.random.default_rng(seed).random((n, 2)) * 100
+    return np.linalg.norm(points[:, None, :] - points[None, :, :], axis=-1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10, 15, 20])
+    parser.add_argument('--knn', type=int, default=4)
+    parser.add_argument('--reads', type=int, default=16)
+    parser.add_argument('--sweeps', type=int, default=200)
+    args = parser.parse_args()
+
+    formulations = {
+        'full': {},
+        'reduced': {'reduced': True},
+        f'knn={args.knn}': {'reduced': True, 'knn': args.knn},
+    }
+    print(f"{'n':>3} {'formulation':<11} {'variables':>9} {'couplers':>9} {'build ms':>9} "
+          f"{'sample s':>9} {'valid %':>8} {'gap':>7}")
+    for n in args.sizes:
+        distances = random_distances(n)
+        reference = solve_tour(distances)[1]
+        for name, options in formulations.items():
+            start = time.perf_counter()
+            Q, _ = build_tsp_qubo(distances, 3.6, **options)
+            build = time.perf_counter() - start
+            num_variables = (n - 1) ** 2 if options.get('reduced') else n * n
+
+            sampler = SimulatedAnnealingSampler(num_replicas=args.reads, num_sweeps=args.sweeps, seed=0)
+            start = time.perf_counter()
+            results = sampler.sample_qubo_many(Q, args.reads)
+            sample = time.perf_counter() - start
+
+            samples = samples_to_array(results, num_variables)
+            if options.get('reduced'):
+                samples = expand_reduced_samples(samples, n)
+            _, length, num_valid = best_valid_tour(samples, distances, repair=True)
+            couplers = sum(u != v for u, v in Q)
+            print(f"{n:>3} {name:<11} {num_variables:>9} {couplers:>9} {1000 * build:>9.2f} "
+                  f"{sample:>9.2f} {100 * num_valid / len(results):>7.1f}% "
+                  f"{100 * (length / reference - 1):>6.1f}%")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,232 @@
+"""
+Regression suite over every bundled instance, with a baseline compare.
+
+`run` solves each instance of Datasets/ and Map_Datasets/ with the QUBO
+pipeline (CVRP_Solver on the local annealer) and with OR-Tools
+(classical_OR_2.solve_cvrp_instance), every case in a fresh process so its
+peak memory is its own. Recorded are the wall time of each stage (parse,
+cluster, matrix, qubo, sample, decode, write), peak RSS and the route
+length with its gap to the best-known value in the instance COMMENT, or to
+the OR-Tools route where the instance has none. Results are written as JSON.
+
+`compare` matches the cases of two result files and flags those that got
+slower, heavier, worse or invalid; it exits with status 1 if any did.
+
+Run from the repository root:
+    python -m benchmarks.regression run --output benchmarks/baseline.json
+    python -m benchmarks.regression run --output current.json
+    python -m benchmarks.regression compare benchmarks/baseline.json current.json
+"""
+
+import argparse
+import contextlib
+import glob
+import io
+import json
+import multiprocessing
+import os
+import platform
+import re
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+SOLVERS = ('qubo', 'ortools')
+BEST_KNOWN = re.compile(r'(?:Optimal|Best) value\s*:\s*([\d.]+)', re.IGNORECASE)
+
+
+def best_known(path):
+    """Best-known route length from the instance COMMENT, None if it has none."""
+    with open(path, 'r') as f:
+        for line in f:
+            if line.strip().upper().startswith('NODE_COORD_SECTION'):
+                break
+            match = BEST_KNOWN.search(line)
+            if match:
+                return float(match.group(1))
+    return None
+
+
+def peak_memory_mb():
+    import resource
+    # ru_maxrss is in KiB on Linux and in bytes on macOS
+    unit = 1024 ** 2 if sys.platform == 'darwin' else 1024
+    return max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+               resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss) / unit
+
+
+def run_qubo(path, options):
+    from CVRP_Samplers import SimulatedAnnealingSampler
+    from CVRP_Solver import CVRP_Solver
+
+    sampler = SimulatedAnnealingSampler(num_replicas=options['replicas'], num_sweeps=options['sweeps'],
+                                        seed=options['seed'])
+    with tempfile.TemporaryDirectory() as tmp, contextlib.redirect_stdout(io.StringIO()):
+        result = CVRP_Solver(path, os.path.join(tmp, 'solution.txt'), sampler=sampler, workers=1)
+    t = result['timings']
+    timings = {'parse': t['parse'], 'cluster': t['clustering'], 'matrix': t['distanceMatrix'],
+               'qubo': t['qubo'], 'sample': t['sample'], 'decode': t['decode'], 'write': t['write'],
+               'total': t['parse'] + t['total']}
+    valid = all(cluster['path'] is not None for cluster in result['clusters'])
+    return timings, result['totalDistance'], valid
+
+
+def run_ortools(path, options):
+    from CVRP_Parser import read_instance
+    from classical_OR_2 import solve_cvrp_instance
+
+    start = time.perf_counter()
+    instance = read_instance(path)
+    distances = instance.distance_matrix() if instance.matrix is not None else None
+    parsed = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        routes, length, _ = solve_cvrp_instance(instance.dimension, instance.capacity,
+                                                instance.coordinates, instance.demands,
+                                                instance.num_vehicles or 8, options['time_limit'],
+                                                edge_weight_type=instance.edge_weight_type,
+                                                distances=distances)
+    end = time.perf_counter()
+    timings = {'parse': parsed - start, 'solve': end - parsed, 'total': end - start}
+    return timings, length, bool(routes)
+
+
+def run_case(path, solver, options):
+    """Solve one instance with one solver; meant to run in its own process."""
+    timings, length, valid = (run_qubo if solver == 'qubo' else run_ortools)(path, options)
+    return {
+        "instance": path,
+        "solver": solver,
+        "valid": valid,
+        "length": length if valid else None,
+        "timings": timings,
+        "peakMemoryMB": peak_memory_mb(),
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(args):
+    options = {'replicas': args.replicas, 'sweeps': args.sweeps, 'seed': args.seed,
+               'time_limit': args.time_limit}
+    spawn = multiprocessing.get_context('spawn')
+    cases = []
+    for path in args.datasets:
+        for solver in args.solvers:
+            # A fresh interpreter per case keeps peak memory from leaking between cases
+            with ProcessPoolExecutor(max_workers=1, mp_context=spawn) as pool:
+                try:
+                    case = pool.submit(run_case, path, solver, options).result()
+                except Exception as e:
+                    case = {"instance": path, "solver": solver, "valid": False, "length": None,
+                            "timings": {}, "peakMemoryMB": None, "error": repr(e)}
+            cases.append(case)
+            print(f"{path:<30} {solver:<8} {case['timings'].get('total', float('nan')):>8.2f}s "
+                  f"{case['peakMemoryMB'] or 0:>8.1f} MB {case['length'] or float('nan'):>12.1f}")
+
+    # Gap to the best-known value, or to the OR-Tools route of the same instance
+    references = {case['instance']: case['length'] for case in cases
+                  if case['solver'] == 'ortools' and case['valid']}
+    for case in cases:
+        best = best_known(case['instance'])
+        case['bestKnown'], case['reference'] = (best, 'comment') if best else \
+            (references.get(case['instance']), 'ortools')
+        case['gap'] = (case['length'] / case['bestKnown'] - 1
+                       if case['length'] is not None and case['bestKnown'] else None)
+
+    report = {
+        "meta": {
+            "created": time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "options": options,
+        },
+        "cases": cases,
+    }
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"Wrote {len(cases)} cases to {args.output}")
+
+
+def regressions(base, current, args):
+    """Descriptions of every way current is worse than base."""
+    found = []
+    if base['valid'] and not current['valid']:
+        found.append("no longer valid" + (f" ({current['error']})" if current.get('error') else ""))
+    for stage, seconds in current['timings'].items():
+        before = base['timings'].get(stage)
+        # Stages faster than the floor are noise on any machine
+        if before is not None and seconds - before > max(args.time_floor, args.time_tolerance * before):
+            found.append(f"{stage} {before:.3f}s -> {seconds:.3f}s")
+    before, after = base.get('peakMemoryMB'), current.get('peakMemoryMB')
+    if before and after and after > before * (1 + args.memory_tolerance):
+        found.append(f"peak memory {before:.1f} MB -> {after:.1f} MB")
+    before, after = base.get('gap'), current.get('gap')
+    if before is not None and after is not None and after - before > args.gap_tolerance:
+        found.append(f"gap {100 * before:.2f}% -> {100 * after:.2f}%")
+    return found
+
+
+def compare(args):
+    with open(args.baseline, 'r') as f:
+        baseline = {(case['instance'], case['solver']): case for case in json.load(f)['cases']}
+    with open(args.current, 'r') as f:
+        current = {(case['instance'], case['solver']): case for case in json.load(f)['cases']}
+
+    flagged = 0
+    for key in sorted(baseline.keys() | current.keys()):
+        if key not in current or key not in baseline:
+            print(f"{key[0]:<30} {key[1]:<8} only in {'baseline' if key in baseline else 'current'}")
+            continue
+        for problem in regressions(baseline[key], current[key], args):
+            print(f"{key[0]:<30} {key[1]:<8} {problem}")
+            flagged += 1
+    print(f"{flagged} regression(s) over {len(baseline.keys() & current.keys())} cases")
+    return 1 if flagged else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = commands.add_parser('run', help="solve the instances and write a JSON report")
+    run_parser.add_argument('--datasets', nargs='+',
+                            default=sorted(glob.glob('Datasets/*.txt') + glob.glob('Map_Datasets/*.txt')
+                                           + glob.glob('Map_Datasets/*.vrp')))
+    run_parser.add_argument('--solvers', nargs='+', default=list(SOLVERS), choices=SOLVERS)
+    run_parser.add_argument('--replicas', type=int, default=8, help="annealing replicas per QUBO")
+    run_parser.add_argument('--sweeps', type=int, default=300, help="annealing sweeps per replica")
+    run_parser.add_argument('--seed', type=int, default=0)
+    run_parser.add_argument('--time-limit', type=int, default=10, help="OR-Tools time limit in seconds")
+    run_parser.add_argument('--output', default='benchmark_results.json')
+
+    compare_parser = commands.add_parser('compare', help="flag regressions against a baseline report")
+    compare_parser.add_argument('baseline')
+    compare_parser.add_argument('current')
+    compare_parser.add_argument('--time-tolerance', type=float, default=0.25,
+                                help="allowed relative slowdown of a stage")
+    compare_parser.add_argument('--time-floor', type=float, default=0.05,
+                                help="slowdowns below this many seconds are ignored")
+    compare_parser.add_argument('--memory-tolerance', type=float, default=0.10,
+                                help="allowed relative growth of peak memory")
+    compare_parser.add_argument('--gap-tolerance', type=float, default=0.01,
+                                help="allowed absolute growth of the gap to best known")
+    args = parser.parse_args()
+
+    if args.command == 'run':
+        run(args)
+    else:
+        sys.exit(compare(args))
+
+
+if __name__ == "__main__":
+    main()
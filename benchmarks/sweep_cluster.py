@@ -0,0 +1,49 @@
+"""
+Benchmark sweep clustering time against the number of customers.
+
+Run from the repository root:
+    python -m benchmarks.sweep_cluster --sizes 1000 10000 100000
+"""
+
+import argparse
+import time
+import numpy as np
+import scipy.spatial  # noqa: F401  loaded up front so merge times exclude the import
+
+from CVRP_Clustering_V4 import CVRPSweepCluster
+
+
+def random_instance(n, capacity, seed=0):
+    """Depot at the centre of n random customers, fleet sized to the total demand."""
+    rng = np.random.default_rng(seed)
+    points = rng.random((n + 1, 2)) * 1000
+    points[0] = 500
+    demands = rng.integers(1, 30, n + 1)
+    demands[0] = 0
+    num_vehicles = int(np.ceil(demands.sum() / capacity))
+    return np.arange(1, n + 2), points, demands, num_vehicles
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000])
+    parser.add_argument('--capacity', type=int, default=2000)
+    args = parser.parse_args()
+
+    print(f"{'n':>7} {'vehicles':>9} {'initial':>8} {'setup (s)':>10} {'sweep (s)':>10} {'merge (s)':>10}")
+    for n in args.sizes:
+        node_ids, points, demands, num_vehicles = random_instance(n, args.capacity)
+        start = time.perf_counter()
+        clusterer = CVRPSweepCluster.from_arrays(node_ids, points, demands, args.capacity, num_vehicles)
+        t_setup = time.perf_counter() - start
+        start = time.perf_counter()
+        clusters = clusterer.create_initial_clusters()
+        t_sweep = time.perf_counter() - start
+        start = time.perf_counter()
+        clusterer.merge_clusters(clusters)
+        t_merge = time.perf_counter() - start
+        print(f"{n:>7} {num_vehicles:>9} {len(clusters):>8} {t_setup:>10.4f} {t_sweep:>10.4f} {t_merge:>10.4f}")
+
+
+if __name__ == "__main__":
+    main()
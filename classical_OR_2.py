@@ -1,8 +1,11 @@
-import networkx as nx
 import math
-import matplotlib.pyplot as plt
 from ortools.sat.python import cp_model
 import time
+import numpy as np
+
+from CVRP_Distance import DEFAULT_EDGE_WEIGHT_TYPE, DistanceMatrix
+from CVRP_Parser import read_instance
+from CVRP_Metrics import span
 
 def haversine(lat1, lon1, lat2, lon2):
     R = 6371.0  # Earth radius in km
@@ -15,61 +18,14 @@ def haversine(lat1, lon1, lat2, lon2):
     c = 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
     return R * c  # distance in km
 
+def parse_edge_weight_type(filename):
+    """Return the EDGE_WEIGHT_TYPE of a CVRP dataset file, GEO when it has none"""
+    return read_instance(filename).edge_weight_type
+
 def parse_cvrp_file(filename):
-    """Parse the CVRP dataset file"""
-    with open(filename, 'r') as f:
-        lines = f.readlines()
-    
-    # Parse header information
-    dimension = None
-    capacity = None
-    
-    for line in lines:
-        if line.startswith('DIMENSION'):
-            dimension = int(line.split(':')[1].strip())
-        elif line.startswith('CAPACITY'):
-            capacity = int(line.split(':')[1].strip())
-    
-    # Parse coordinates
-    coordinates = {}
-    in_coord_section = False
-    
-    for line in lines:
-        if line.strip() == 'NODE_COORD_SECTION':
-            in_coord_section = True
-            continue
-        elif line.strip() == 'DEMAND_SECTION':
-            in_coord_section = False
-            continue
-        
-        if in_coord_section and line.strip() and not line.startswith('DEMAND'):
-            parts = line.strip().split()
-            if len(parts) == 3:
-                node_id = int(parts[0])
-                x = float(parts[1])
-                y = float(parts[2])
-                coordinates[node_id] = (x, y)
-    
-    # Parse demands
-    demands = {}
-    in_demand_section = False
-    
-    for line in lines:
-        if line.strip() == 'DEMAND_SECTION':
-            in_demand_section = True
-            continue
-        elif line.strip() == 'DEPOT_SECTION':
-            in_demand_section = False
-            continue
-        
-        if in_demand_section and line.strip() and not line.startswith('DEPOT'):
-            parts = line.strip().split()
-            if len(parts) == 2:
-                node_id = int(parts[0])
-                demand = int(parts[1])
-                demands[node_id] = demand
-    
-    return dimension, capacity, coordinates, demands
+    """Parse the CVRP dataset file (see CVRP_Parser.read_instance)"""
+    instance = read_instance(filename)
+    return instance.dimension, instance.capacity, instance.coordinates, instance.demands
 
 def parse_cvrp_data():
     """Parse the dataset from the provided text (E-n101-k8 equivalent)"""
@@ -120,14 +76,15 @@ def parse_cvrp_data():
     
     return dimension, capacity, coordinates, demands
 
-def solve_cvrp_ortools(filename=None, k=8, time_limit_seconds=300):
+def solve_cvrp_ortools(filename=None, k=8, time_limit_seconds=300, engine='auto'):
     """
-    Solve CVRP using OR-Tools CP-SAT solver
+    Solve CVRP using OR-Tools (CP-SAT or RoutingModel)
     
     Args:
         filename: Path to CVRP dataset file (optional)
         k: Number of vehicles
         time_limit_seconds: Time limit for solver
+        engine: 'cp-sat', 'routing' or 'auto', see solve_cvrp_instance
     
     Returns:
         routes: List of routes, where each route is a list of nodes
@@ -136,106 +93,370 @@ def solve_cvrp_ortools(filename=None, k=8, time_limit_seconds=300):
     """
     
     # Parse dataset
+    edge_weight_type = 'EUC_2D'  # embedded dataset is planar
+    distances = None
     if filename:
-        dimension, capacity, coordinates, demands = parse_cvrp_file(filename)
-        # Extract k from filename if follows standard format
-        if 'k' in filename:
-            k = int(filename.split('k')[1].split('.')[0].split('-')[0])
+        with span('parse', solver='classical'):
+            instance = read_instance(filename)
+        dimension, capacity = instance.dimension, instance.capacity
+        coordinates, demands = instance.coordinates, instance.demands
+        edge_weight_type = instance.edge_weight_type
+        # Vehicle count from the instance (VEHICLES, NAME E-n22-k4, ...) when it has one
+        k = instance.num_vehicles or k
+        if instance.matrix is not None:
+            distances = instance.distance_matrix()
     else:
         dimension, capacity, coordinates, demands = parse_cvrp_data()
     
-    # Problem parameters
+    return solve_cvrp_instance(dimension, capacity, coordinates, demands, k, time_limit_seconds,
+                               edge_weight_type=edge_weight_type, distances=distances, engine=engine)
+
+ROUTING_MIN_CUSTOMERS = 20  # engine='auto' uses RoutingModel from this many customers
+
+def solve_cvrp_instance(dimension, capacity, coordinates, demands, k=8, time_limit_seconds=300,
+                        edge_weight_type=DEFAULT_EDGE_WEIGHT_TYPE, distances=None, engine='auto',
+                        **engine_options):
+    """
+    Solve an already parsed CVRP instance using OR-Tools
+    
+    Args:
+        dimension: Number of nodes including the depot (node 1)
+        capacity: Vehicle capacity
+        coordinates: Node ID to (x, y) coordinates
+        demands: Node ID to demand
+        k: Number of vehicles
+        time_limit_seconds: Time limit for solver
+        edge_weight_type: EUC_2D, or GEO for (lat, lon) coordinates in degrees
+        distances: Precomputed CVRP_Distance.DistanceMatrix, overrides edge_weight_type
+        engine: 'cp-sat' (exact MTZ model), 'routing' (RoutingModel with guided
+            local search) or 'auto' to pick routing from ROUTING_MIN_CUSTOMERS
+        engine_options: Extra arguments of the engine, e.g. hint / num_workers
+            of solve_cvrp_cpsat
+    
+    Returns:
+        Same as solve_cvrp_ortools
+    """
+    if engine == 'auto':
+        engine = 'routing' if dimension - 1 >= ROUTING_MIN_CUSTOMERS else 'cp-sat'
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown engine '{engine}', expected 'auto' or one of {sorted(ENGINES)}")
+    return ENGINES[engine](dimension, capacity, coordinates, demands, k, time_limit_seconds,
+                           edge_weight_type=edge_weight_type, distances=distances, **engine_options)
+
+def solve_cvrp_routing(dimension, capacity, coordinates, demands, k=8, time_limit_seconds=300,
+                       edge_weight_type=DEFAULT_EDGE_WEIGHT_TYPE, distances=None):
+    """
+    Solve an already parsed CVRP instance with the OR-Tools RoutingModel
+    
+    Builds routes with the path-cheapest-arc heuristic and improves them
+    with guided local search until the time limit. Scales to thousands of
+    customers. Like the CP-SAT model, every one of the k vehicles drives a
+    route. The routing search status is mapped onto the cp_model status
+    constants the other engines return: a solution is FEASIBLE unless the
+    search proved it OPTIMAL.
+    
+    Args and Returns:
+        Same as solve_cvrp_instance
+    """
+    from ortools.constraint_solver import pywrapcp, routing_enums_pb2
+    
     n = dimension - 1  # number of demand points (excluding depot)
     depot = 0
-    dem_points = list(range(1, n + 1))
     
-    # Create position and demand mappings (0-based indexing)
-    my_pos = {}
-    q = {}
+    # Model node i is dataset node i + 1
+    with span('matrix', solver='classical'):
+        if distances is None:
+            distances = DistanceMatrix.from_coordinates(coordinates, edge_weight_type)
+        D = distances.submatrix(range(1, n + 2))
+    scale_factor = 100  # Scale distances to avoid floating point issues
+    q = [int(demands[i + 1]) for i in range(n + 1)]
     
-    # Map depot (node 1 in dataset becomes node 0)
-    my_pos[depot] = coordinates[1]
-    q[depot] = demands[1]  # should be 0
+    print(f"Solving CVRP with OR-Tools RoutingModel")
+    print(f"Nodes: {dimension} (including depot)")
+    print(f"Vehicles: {k}")
+    print(f"Capacity: {capacity}")
+    print(f"Total demand: {sum(q[1:])}")
     
-    # Map demand points (nodes 2-n+1 in dataset become nodes 1-n)
-    for i in range(1, n + 1):
-        my_pos[i] = coordinates[i + 1]
-        q[i] = demands[i + 1]
+    with span('build_model', solver='classical', engine='routing'):
+        manager = pywrapcp.RoutingIndexManager(n + 1, k, depot)
+        routing = pywrapcp.RoutingModel(manager)
+        
+        # Matrix and vector transits are evaluated in C++, no Python callback per arc
+        transit = routing.RegisterTransitMatrix((D * scale_factor).astype(int).tolist())
+        routing.SetArcCostEvaluatorOfAllVehicles(transit)
+        demand = routing.RegisterUnaryTransitVector(q)
+        routing.AddDimensionWithVehicleCapacity(demand, 0, [int(capacity)] * k, True, 'Capacity')
+        # Every vehicle leaves for a customer; otherwise, with room to spare,
+        # vehicles stay at the depot and fewer than k routes come back
+        for vehicle in range(k):
+            routing.solver().Add(routing.NextVar(routing.Start(vehicle)) != routing.End(vehicle))
+    
+    search_parameters = pywrapcp.DefaultRoutingSearchParameters()
+    search_parameters.first_solution_strategy = (
+        routing_enums_pb2.FirstSolutionStrategy.PATH_CHEAPEST_ARC)
+    search_parameters.local_search_metaheuristic = (
+        routing_enums_pb2.LocalSearchMetaheuristic.GUIDED_LOCAL_SEARCH)
+    search_parameters.time_limit.FromMilliseconds(int(time_limit_seconds * 1000))
     
-    # Create complete directed graph and calculate distances
-    G = nx.complete_graph(n + 1, nx.DiGraph())
+    print("Solving...")
+    with span('solve', solver='classical', engine='routing'):
+        solution = routing.SolveWithParameters(search_parameters)
+    
+    search_status = routing_enums_pb2.RoutingSearchStatus
+    status_map = {
+        search_status.ROUTING_SUCCESS: cp_model.FEASIBLE,
+        search_status.ROUTING_PARTIAL_SUCCESS_LOCAL_OPTIMUM_NOT_REACHED: cp_model.FEASIBLE,
+        search_status.ROUTING_OPTIMAL: cp_model.OPTIMAL,
+        search_status.ROUTING_INFEASIBLE: cp_model.INFEASIBLE,
+        search_status.ROUTING_INVALID: cp_model.MODEL_INVALID,
+    }
+    status = status_map.get(routing.status(), cp_model.UNKNOWN)
     
-    def eucl_dist(x1, y1, x2, y2):
-        return math.sqrt((x1 - x2)**2 + (y1 - y2)**2)
+    routes = []
+    total_distance = 0
+    if solution is None:
+        print(f"No solution found. Status: {routing.status()}")
+        return routes, total_distance, status
+    
+    print(f"\nSolution found!")
+    print(f"Status: {'OPTIMAL' if status == cp_model.OPTIMAL else 'FEASIBLE'}")
+    print(f"Objective value: {solution.ObjectiveValue() / scale_factor:.2f}")
+    
+    for vehicle in range(k):
+        index = solution.Value(routing.NextVar(routing.Start(vehicle)))
+        route = [depot]
+        while not routing.IsEnd(index):
+            route.append(manager.IndexToNode(index))
+            index = solution.Value(routing.NextVar(index))
+        route.append(depot)
+        routes.append(route)
+    
+    for s, route in enumerate(routes, 1):
+        route_distance = float(D[route[:-1], route[1:]].sum())
+        total_distance += route_distance
+        print(f"Route {s}: {route} - Distance: {route_distance:.2f}, Demand: {sum(q[i] for i in route)}")
+    print(f"Total distance: {total_distance:.2f}")
     
-    # Calculate distance matrix (scaled to integers for CP-SAT)
-    distances = {}
-    scale_factor = 100  # Scale distances to avoid floating point issues
+    return routes, total_distance, status
+
+def build_cpsat_model(costs, q, capacity, k, break_symmetry=False):
+    """
+    Build the CP-SAT MTZ model of a CVRP from arrays.
     
-    for i, j in G.edges:
-        (x1, y1) = my_pos[i]
-        (x2, y2) = my_pos[j]
-        dist = haversine(x1, y1, x2, y2)
-        distances[(i, j)] = int(dist * scale_factor)
-        G.edges[i, j]['length'] = dist
+    Args:
+        costs: (n+1, n+1) integer arc costs, node 0 is the depot
+        q: (n+1,) integer demands, q[0] = 0
+        capacity: Vehicle capacity
+        k: Number of vehicles
+        break_symmetry: Keep only one direction of each route (see
+            add_route_direction_symmetry); ignored for asymmetric costs
     
-    Q = capacity
+    Returns:
+        model: The CpModel
+        x: One BoolVar per arc, in the order of tails / heads
+        u: Load variable of every node
+        labels: Route label variables of add_route_direction_symmetry, None
+            when symmetry is not broken
+        tails, heads: (E,) arc endpoints, every ordered pair i != j
+    """
+    costs = np.asarray(costs)
+    q = np.asarray(q)
+    size = len(costs)
+    depot = 0
+    Q = int(capacity)
     
-    print(f"Solving CVRP with OR-Tools")
-    print(f"Nodes: {dimension} (including depot)")
-    print(f"Vehicles: {k}")
-    print(f"Capacity: {Q}")
-    print(f"Total demand: {sum(q[i] for i in dem_points)}")
+    # Arcs in row-major order: the outgoing arcs of node i are contiguous
+    tails, heads = np.nonzero(~np.eye(size, dtype=bool))
+    arc = np.full((size, size), -1, dtype=np.int64)
+    arc[tails, heads] = np.arange(len(tails))
     
-    # Create CP-SAT model
     model = cp_model.CpModel()
     
-    # Decision variables: x[i][j] = 1 if edge (i,j) is used
-    x = {}
-    for i, j in G.edges:
-        x[(i, j)] = model.NewBoolVar(f'x_{i}_{j}')
+    # Decision variables: x[a] = 1 if arc a = (tails[a], heads[a]) is used
+    x = [model.new_bool_var(f'x_{i}_{j}') for i, j in zip(tails.tolist(), heads.tolist())]
     
     # Load variables for MTZ constraints
-    u = {}
-    for i in G.nodes:
+    u = [model.new_int_var(0, 0, f'u_{depot}')]
+    u += [model.new_int_var(int(q[i]), Q, f'u_{i}') for i in range(1, size)]
+    
+    # Objective: minimize total distance, written straight into the proto
+    objective = model.Proto().objective
+    objective.vars.extend(var.index for var in x)
+    objective.coeffs.extend(costs[tails, heads].tolist())
+    
+    # 1. Enter and 2. leave each demand point exactly once
+    for i in range(1, size):
+        model.add_exactly_one([x[a] for a in arc[:, i].tolist() if a >= 0])
+        model.add_exactly_one([x[a] for a in arc[i].tolist() if a >= 0])
+    
+    # 3. Leave depot exactly k times
+    model.add(sum(x[a] for a in arc[depot].tolist() if a >= 0) == k)
+    
+    # 4. MTZ constraints for subtour elimination and capacity:
+    # u[i] - u[j] + Q * x[i,j] <= Q - q[j] for every arc into a demand point
+    for a, i, j in zip(range(len(x)), tails.tolist(), heads.tolist()):
+        if j != depot:
+            model.add(u[i] - u[j] + Q * x[a] <= Q - int(q[j]))
+    
+    labels = None
+    if break_symmetry and np.array_equal(costs, costs.T):
+        labels = add_route_direction_symmetry(model, x, tails, heads)
+    
+    return model, x, u, labels, tails, heads
+
+def add_route_direction_symmetry(model, x, tails, heads, depot=0):
+    """
+    Break the reversal symmetry of routes under symmetric costs.
+    
+    The model has no vehicle index, so identical vehicles are not a source of
+    symmetry; what remains is that every route can be driven either way at
+    the same cost. Each customer gets the label of the first customer on its
+    route, and a route may only end at a customer not smaller than that label.
+    
+    Returns:
+        The label variable of every node, None for the depot
+    """
+    size = int(max(tails.max(), heads.max())) + 1
+    label = [None] + [model.new_int_var(1, size - 1, f'r_{i}') for i in range(1, size)]
+    for a, i, j in zip(range(len(x)), tails.tolist(), heads.tolist()):
         if i == depot:
-            u[i] = model.NewIntVar(0, 0, f'u_{i}')
+            model.add(label[j] == j).only_enforce_if(x[a])
+        elif j == depot:
+            model.add(label[i] <= i).only_enforce_if(x[a])
         else:
-            u[i] = model.NewIntVar(q[i], Q, f'u_{i}')
+            model.add(label[j] == label[i]).only_enforce_if(x[a])
+    return label
+
+def add_route_hint(model, x, u, labels, tails, heads, routes, q):
+    """
+    Hint CP-SAT with routes ([0, ..., 0] in model numbering), e.g. from
+    sweep_hint_routes or the routes of a previous run on the same instance.
+    Arcs on the routes are hinted 1, all other arcs 0, and loads accumulate
+    along each route. Routes are driven towards their larger end customer and
+    labels, when given, are hinted too, so the hint also satisfies
+    add_route_direction_symmetry.
+    """
+    size = len(u)
+    used = np.zeros((size, size), dtype=bool)
+    load = np.zeros(size, dtype=np.int64)
+    label = np.zeros(size, dtype=np.int64)
+    for route in routes:
+        if len(route) > 2 and route[1] > route[-2]:
+            route = route[::-1]
+        used[route[:-1], route[1:]] = True
+        customers = [node for node in route if node != 0]
+        load[customers] = np.cumsum(np.asarray(q)[customers])
+        label[customers] = customers[0] if customers else 0
+    hint = model.Proto().solution_hint
+    hint.vars.extend(var.index for var in x)
+    hint.values.extend(used[tails, heads].astype(int).tolist())
+    hint.vars.extend(var.index for var in u)
+    hint.values.extend(load.tolist())
+    if labels is not None:
+        hinted = np.nonzero(label)[0]
+        hint.vars.extend(labels[i].index for i in hinted)
+        hint.values.extend(label[hinted].tolist())
+
+def sweep_hint_routes(coordinates, demands, capacity, k, D):
+    """
+    Feasible-looking warm start routes: sweep clusters, each ordered by a
+    nearest-neighbour + 2-opt tour over D (model numbering, depot 0).
+    """
+    from CVRP_Clustering_V4 import CVRPSweepCluster
+    from CVRP_Heuristics import solve_tour
     
-    # Objective: minimize total distance
-    objective_terms = []
-    for i, j in G.edges:
-        objective_terms.append(distances[(i, j)] * x[(i, j)])
+    size = len(D)
+    clusterer = CVRPSweepCluster({i: coordinates[i] for i in range(1, size + 1)},
+                                 demands, capacity, k)
+    clusters, _ = clusterer.create_clusters()
+    routes = []
+    for cluster in clusters:
+        nodes = np.array([0] + [node - 1 for node in cluster])
+        tour, _ = solve_tour(D[np.ix_(nodes, nodes)], start=0)
+        routes.append(nodes[tour].tolist() + [0])
+    return routes
+
+def routes_from_successors(successor, depot_successors, depot=0):
+    """
+    Follow successor links from each arc leaving the depot back to it.
     
-    model.Minimize(sum(objective_terms))
+    Args:
+        successor: (n+1,) next node of every demand point
+        depot_successors: First node of each route
     
-    # Constraints
+    Returns:
+        List of routes, each [depot, ..., depot]
+    """
+    routes = []
+    for first in depot_successors:
+        route = [depot, int(first)]
+        while route[-1] != depot and len(route) <= len(successor) + 1:
+            route.append(int(successor[route[-1]]))
+        routes.append(route)
+    return routes
+
+def solve_cvrp_cpsat(dimension, capacity, coordinates, demands, k=8, time_limit_seconds=300,
+                     edge_weight_type=DEFAULT_EDGE_WEIGHT_TYPE, distances=None,
+                     hint=None, num_workers=None, break_symmetry=False, solution_callback=None):
+    """
+    Solve an already parsed CVRP instance using OR-Tools CP-SAT solver
     
-    # 1. Enter each demand point exactly once
-    for j in dem_points:
-        model.Add(sum(x[(i, j)] for i in G.predecessors(j)) == 1)
+    Args:
+        Same as solve_cvrp_instance, plus
+        hint: Warm start; 'sweep' for sweep clusters with 2-opt tours, or the
+            routes returned by an earlier run on the same instance
+        num_workers: CP-SAT parallel search workers, None for the solver default
+        break_symmetry: Add route direction symmetry breaking
+        solution_callback: cp_model.CpSolverSolutionCallback called on each solution
     
-    # 2. Leave each demand point exactly once  
-    for i in dem_points:
-        model.Add(sum(x[(i, j)] for j in G.successors(i)) == 1)
+    Returns:
+        Same as solve_cvrp_ortools
+    """
     
-    # 3. Leave depot exactly k times
-    model.Add(sum(x[(depot, j)] for j in G.successors(depot)) == k)
+    # Problem parameters
+    n = dimension - 1  # number of demand points (excluding depot)
+    depot = 0
     
-    # 4. MTZ constraints for subtour elimination and capacity
-    for i, j in G.edges:
-        if j != depot:
-            # u[i] - u[j] + Q * x[i,j] <= Q - q[j]
-            model.Add(u[i] - u[j] + Q * x[(i, j)] <= Q - q[j])
+    # Model node i is dataset node i + 1 (node 1 in dataset is the depot)
+    q = np.array([demands[i + 1] for i in range(n + 1)], dtype=np.int64)
+    
+    # Distance matrix computed once
+    with span('matrix', solver='classical'):
+        if distances is None:
+            distances = DistanceMatrix.from_coordinates(coordinates, edge_weight_type)
+        D = distances.submatrix(range(1, n + 2))
+    
+    # Scaled to integers for CP-SAT
+    scale_factor = 100  # Scale distances to avoid floating point issues
+    D_scaled = (D * scale_factor).astype(np.int64)
+    
+    Q = capacity
+    
+    print(f"Solving CVRP with OR-Tools")
+    print(f"Nodes: {dimension} (including depot)")
+    print(f"Vehicles: {k}")
+    print(f"Capacity: {Q}")
+    print(f"Total demand: {q[1:].sum()}")
+    
+    with span('build_model', solver='classical', engine='cp-sat'):
+        model, x, u, labels, tails, heads = build_cpsat_model(D_scaled, q, Q, k, break_symmetry)
     
     # Create solver and set time limit
     solver = cp_model.CpSolver()
     solver.parameters.max_time_in_seconds = time_limit_seconds
+    if num_workers is not None:
+        solver.parameters.num_workers = num_workers
+    
+    if hint is not None:
+        routes = sweep_hint_routes(coordinates, demands, Q, k, D) if hint == 'sweep' else hint
+        add_route_hint(model, x, u, labels, tails, heads, routes, q)
+        # The hint may use fewer than k routes or drop customers; let CP-SAT fix it up
+        solver.parameters.repair_hint = True
     
     # Solve
     print("Solving...")
-    status = solver.Solve(model)
+    with span('solve', solver='classical', engine='cp-sat'):
+        status = solver.Solve(model, solution_callback)
     
     # Extract solution
     routes = []
@@ -246,90 +467,33 @@ def solve_cvrp_ortools(filename=None, k=8, time_limit_seconds=300):
         print(f"Status: {'OPTIMAL' if status == cp_model.OPTIMAL else 'FEASIBLE'}")
         print(f"Objective value: {solver.ObjectiveValue() / scale_factor:.2f}")
         
-        # Extract used edges
-        used_edges = []
-        for i, j in G.edges:
-            if solver.Value(x[(i, j)]) > 0.5:
-                used_edges.append((i, j))
-        
-        print(f"Used edges: {len(used_edges)}")
-        
-        # Build routes by following edges from depot
-        routes = []
-        remaining_edges = used_edges.copy()
-        
-        # Find all routes starting from depot
-        depot_edges = [(i, j) for i, j in remaining_edges if i == depot]
-        
-        for depot_edge in depot_edges:
-            route = [depot]
-            current_node = depot_edge[1]
-            route.append(current_node)
-            remaining_edges.remove(depot_edge)
-            
-            # Follow the route until we return to depot
-            while current_node != depot:
-                next_edges = [(i, j) for i, j in remaining_edges if i == current_node]
-                if not next_edges:
-                    break
-                
-                next_edge = next_edges[0]
-                current_node = next_edge[1]
-                route.append(current_node)
-                remaining_edges.remove(next_edge)
-                
-                if current_node == depot:
-                    break
-            
-            routes.append(route)
+        # Used arcs as a successor array: O(n) route reconstruction
+        used = np.fromiter((solver.BooleanValue(var) for var in x), dtype=bool, count=len(x))
+        print(f"Used edges: {int(used.sum())}")
+        successor = np.zeros(n + 1, dtype=np.int64)
+        from_depot = used & (tails == depot)
+        successor[tails[used & ~from_depot]] = heads[used & ~from_depot]
+        routes = routes_from_successors(successor, heads[from_depot], depot)
         
         # Calculate actual total distance
-        total_distance = 0
-        s = 0 
-        for route in routes:
-            s+=1
-            route_distance = 0
-            route_demand = 0
-            for i in range(len(route) - 1):
-                from_node = route[i]
-                to_node = route[i + 1]
-                route_distance += G.edges[from_node, to_node]['length']
-                if to_node != depot:
-                    route_demand += q[to_node]
+        for s, route in enumerate(routes, 1):
+            route_distance = float(D[route[:-1], route[1:]].sum())
+            route_demand = int(q[route[1:-1]].sum())
             total_distance += route_distance
             print(f"Route {s}: {route} - Distance: {route_distance:.2f}, Demand: {route_demand}")
         
         print(f"Total distance: {total_distance:.2f}")
         
-        # Visualize solution
-        # plt.figure(figsize=(12, 10))
-        
-        # Draw all nodes
-        # nx.draw_networkx_nodes(G, pos=my_pos, node_color='lightblue', 
-        #                       node_size=50, alpha=0.7)
-        
-        # # Draw depot in different color
-        # nx.draw_networkx_nodes(G, pos=my_pos, nodelist=[depot], 
-                            #   node_color='red', node_size=100)
-        
-        # Draw solution edges
-        # solution_graph = G.edge_subgraph(used_edges)
-        # nx.draw_networkx_edges(solution_graph, pos=my_pos, edge_color='blue', 
-        #                       width=2, alpha=0.8)
-        
-        # # Add node labels
-        # nx.draw_networkx_labels(G, pos=my_pos, font_size=6)
-        
-        # plt.title(f"CVRP Solution using OR-Tools\nVehicles: {k}, Distance: {total_distance:.2f}")
-        # plt.axis('equal')
-        # plt.grid(True, alpha=0.3)
-        # plt.show()
-        
     else:
         print(f"No solution found. Status: {status}")
     
     return routes, total_distance, status
 
+ENGINES = {
+    'cp-sat': solve_cvrp_cpsat,
+    'routing': solve_cvrp_routing,
+}
+
 # Example usage
 if __name__ == "__main__":
     # Solve using embedded data
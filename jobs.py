@@ -0,0 +1,186 @@
+"""
+Asynchronous solver jobs for the FastAPI backend.
+
+A submitted job waits in an asyncio queue and costs no thread until one of a
+fixed number of dispatchers picks it up and runs it on the worker pool, so the
+server can hold many outstanding solves while only pool-size threads block.
+"""
+
+from collections import Counter, OrderedDict
+from typing import Any, Callable, Dict, Optional
+import asyncio
+import time
+import uuid
+
+from worker_pool import JobCancelled, SolverWorkerPool, WorkerCrashed
+
+QUEUED, RUNNING, DONE, FAILED, CANCELLED = "queued", "running", "done", "failed", "cancelled"
+FINISHED = (DONE, FAILED, CANCELLED)
+
+
+class Job:
+    """One solver job and, once finished, its HTTP status code and response body."""
+
+    def __init__(self, kind: str, payload: Dict[str, Any],
+                 finalize: Callable[[Dict[str, Any]], Dict[str, Any]],
+                 meta: Optional[Dict[str, Any]] = None):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.payload = payload
+        self.finalize = finalize
+        self.meta = meta or {}
+        self.status = QUEUED
+        self.status_code: Optional[int] = None
+        self.content: Optional[Dict[str, Any]] = None
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.cancel_requested = False
+        self._done = asyncio.Event()
+
+    def finish(self, status: str, status_code: int, content: Dict[str, Any]) -> None:
+        self.status = status
+        self.status_code = status_code
+        self.content = content
+        self.finished_at = time.time()
+        self.payload = None
+        self._done.set()
+
+    def fail(self, status: str, status_code: int, message: str, **extra) -> None:
+        self.finish(status, status_code, {"ok": False, "message": message, **self.meta, **extra})
+
+    async def wait(self) -> None:
+        await self._done.wait()
+
+    def describe(self) -> Dict[str, Any]:
+        return {
+            "jobId": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "createdAt": self.created_at,
+            "startedAt": self.started_at,
+            "finishedAt": self.finished_at,
+            **self.meta,
+            "result": self.content,
+        }
+
+
+class JobManager:
+    """
+    Queue of solver jobs served by `concurrency` dispatchers on a SolverWorkerPool.
+
+    Finished jobs are kept for polling until more than max_finished have
+    accumulated, then the oldest are dropped. failures counts failed runs by
+    (kind, reason) over the life of the manager, evicted jobs included.
+    """
+
+    def __init__(self, pool: SolverWorkerPool, concurrency: int, timeout: float = 600,
+                 max_finished: int = 1000):
+        self.pool = pool
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.max_finished = max_finished
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._queue: Optional[asyncio.Queue] = None
+        self._dispatchers = []
+        self.failures: Counter = Counter()
+
+    async def start(self) -> None:
+        self._queue = asyncio.Queue()
+        self._dispatchers = [asyncio.create_task(self._dispatch()) for _ in range(self.concurrency)]
+
+    async def stop(self) -> None:
+        for task in self._dispatchers:
+            task.cancel()
+        await asyncio.gather(*self._dispatchers, return_exceptions=True)
+        self._dispatchers = []
+
+    def submit(self, kind: str, payload: Dict[str, Any],
+               finalize: Callable[[Dict[str, Any]], Dict[str, Any]],
+               meta: Optional[Dict[str, Any]] = None) -> Job:
+        """
+        Queue a job and return it immediately.
+
+        finalize turns the worker output into the response body of a job that
+        ran to completion; meta is merged into every response of the job.
+        """
+        job = Job(kind, payload, finalize, meta)
+        self._jobs[job.id] = job
+        self._queue.put_nowait(job)
+        self._evict()
+        return job
+
+    def completed(self, kind: str, content: Dict[str, Any],
+                  meta: Optional[Dict[str, Any]] = None) -> Job:
+        """Register a job that is already answered, e.g. from the solution cache."""
+        job = Job(kind, None, finalize=None, meta=meta)
+        job.started_at = job.created_at
+        self._jobs[job.id] = job
+        job.finish(DONE, 200, {**content, **job.meta})
+        self._evict()
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self._jobs.get(job_id)
+
+    def cancel(self, job_id: str) -> Optional[Job]:
+        """Cancel a queued job, or kill the worker of a running one."""
+        job = self._jobs.get(job_id)
+        if job is None or job.status in FINISHED:
+            return job
+        if job.status == QUEUED:
+            job.fail(CANCELLED, 409, "Job cancelled.")
+        else:
+            # Set before pool.cancel: a job not on a worker yet sees the flag
+            # before it is sent, one that already answered is dropped by the dispatcher
+            job.cancel_requested = True
+            self.pool.cancel(job.id)
+        return job
+
+    def counts(self) -> Dict[str, int]:
+        counts = {status: 0 for status in (QUEUED, RUNNING) + FINISHED}
+        for job in self._jobs.values():
+            counts[job.status] += 1
+        return counts
+
+    def _evict(self) -> None:
+        finished = [job_id for job_id, job in self._jobs.items() if job.status in FINISHED]
+        for job_id in finished[: max(len(finished) - self.max_finished, 0)]:
+            del self._jobs[job_id]
+
+    async def _dispatch(self) -> None:
+        while True:
+            job = await self._queue.get()
+            if job.status != QUEUED:
+                continue  # cancelled while queued
+            job.status = RUNNING
+            job.started_at = time.time()
+            try:
+                out = await asyncio.to_thread(self.pool.run, job.kind, job.payload,
+                                              self.timeout, job.id,
+                                              lambda: job.cancel_requested)
+            except JobCancelled:
+                job.fail(CANCELLED, 409, "Job cancelled.")
+            except TimeoutError:
+                self.failures[(job.kind, "timeout")] += 1
+                job.fail(FAILED, 504, "Solver timed out.")
+            except WorkerCrashed as e:
+                self.failures[(job.kind, "crash")] += 1
+                job.fail(FAILED, 500, "Solver crashed.", stderr=str(e))
+            except Exception as e:
+                self.failures[(job.kind, "dispatch")] += 1
+                job.fail(FAILED, 500, "Solver failed.", stderr=repr(e))
+            else:
+                if job.cancel_requested:
+                    job.fail(CANCELLED, 409, "Job cancelled.")
+                    continue
+                if not out.get("ok"):
+                    # The solver raised inside the worker; the traceback is in stderr
+                    self.failures[(job.kind, "error")] += 1
+                    job.fail(FAILED, 500, "Solver crashed.", stderr=out.get("stderr", ""))
+                    continue
+                try:
+                    job.finish(DONE, 200, {**job.finalize(out), **job.meta})
+                except Exception as e:
+                    self.failures[(job.kind, "output")] += 1
+                    job.fail(FAILED, 500, "Could not read solver output.", stderr=repr(e))
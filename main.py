@@ -1,12 +1,39 @@
-from pathlib import Path
-from typing import Dict, List, Optional, Union
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from typing import Any, Dict, List, Optional, Union
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 from pydantic import BaseModel
-import subprocess, sys, re
+import os
+import time
 
-app = FastAPI()
+import CVRP_Metrics
+from jobs import JobManager
+from metrics import CONTENT_TYPE, Exposition, RequestMetrics
+from solution_cache import SolutionCache, problem_key
+from worker_pool import SolverWorkerPool
+
+# Warm solver processes, started with the app (QUBITX_WORKERS sets the size);
+# they time their solver stages and hand the spans back for /metrics
+solver_pool = SolverWorkerPool(size=int(os.environ.get("QUBITX_WORKERS", "2")), metrics=True)
+job_manager = JobManager(solver_pool, concurrency=solver_pool.size, timeout=600)
+# Solved problems, optionally persisted under QUBITX_CACHE_DIR
+solution_cache = SolutionCache(
+    max_entries=int(os.environ.get("QUBITX_CACHE_SIZE", "256")),
+    ttl=float(os.environ.get("QUBITX_CACHE_TTL", str(24 * 3600))),
+    directory=os.environ.get("QUBITX_CACHE_DIR") or None,
+)
+request_metrics = RequestMetrics()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    solver_pool.start()
+    await job_manager.start()
+    yield
+    await job_manager.stop()
+    solver_pool.shutdown()
+
+app = FastAPI(lifespan=lifespan)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["http://localhost:5173","http://127.0.0.1:5173","*"],
@@ -14,6 +41,20 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.middleware("http")
+async def count_requests(request: Request, call_next):
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        # The route template keeps job IDs out of the labels
+        route = request.scope.get("route")
+        request_metrics.observe(request.method, getattr(route, "path", "unmatched"), status,
+                                time.perf_counter() - start)
+
 # ---------- Models ----------
 class City(BaseModel):
     name: str
@@ -29,194 +70,205 @@ class ProblemRequest(BaseModel):
     demands: Dict[Union[int,str], int] = {}
 
 # ---------- Utils ----------
-BASE_DIR = Path(__file__).resolve().parent
-MAP_DIR  = BASE_DIR / "Map_Datasets"
-MAP_DIR.mkdir(parents=True, exist_ok=True)
+def problem_name(req: ProblemRequest) -> str:
+    return f"E-n{req.depots}-k{req.fleet}"
 
-SOLVER_PATH = Path(r"C:\Users\USER\Documents\Quantum UI Ordered\CVRP_Solver.py")
-CLASSICAL_SOLVER_PATH = Path(r"C:\Users\USER\Documents\Quantum UI Ordered\classical_OR_2.py")
-SOLUTION_PATH = BASE_DIR / "CVRP_solution.txt"  # your solver writes here
-
-def write_problem_file(req: ProblemRequest) -> Path:
+def build_problem(req: ProblemRequest) -> Dict[str, Any]:
+    """
+    Normalize a request into the parsed instance the solvers take in memory:
+    node IDs 1..depots (node 1 is the depot), coordinates rounded as the
+    TSPLIB files store them, and demands taken from req.demands or the city.
+    """
     # normalize demands keys to int
     demand_map: Dict[int, int] = {
         int(k): int(v) for k, v in (req.demands or {}).items()
         if str(k).strip().lstrip("-").isdigit()
     }
 
-    name = f"E-n{req.depots}-k{req.fleet}"
-    out_path = MAP_DIR / f"{name}.txt"
-
-    lines: List[str] = []
-    lines.append(f"NAME : {name}")
-    lines.append("TYPE : CVRP")
-    lines.append(f"DIMENSION : {req.depots}")
-    lines.append(f"CAPACITY : {req.capacity}")
-    lines.append("EDGE_WEIGHT_TYPE : EUC_2D")
-    lines.append("NODE_COORD_SECTION")
+    coordinates: Dict[int, tuple] = {}
     for idx, city in enumerate(req.cities[: req.depots], start=1):
-        lines.append(f"{idx} {city.lat:.4f} {city.lng:.4f}")
+        coordinates[idx] = (round(city.lat, 4), round(city.lng, 4))
 
-    lines.append("DEMAND_SECTION")
+    demands: Dict[int, int] = {}
     for idx in range(1, req.depots + 1):
         fallback_city_demand = req.cities[idx-1].demand if idx-1 < len(req.cities) else 0
         d = demand_map.get(idx, fallback_city_demand or 0)
         # If your depot must be zero demand, uncomment:
         # if idx == 1: d = 0
-        lines.append(f"{idx} {int(d)}")
+        demands[idx] = int(d)
+
+    return {
+        "name": problem_name(req),
+        "dimension": req.depots,
+        "capacity": req.capacity,
+        "fleet": req.fleet,
+        "coordinates": coordinates,
+        "demands": demands,
+    }
 
-    lines.append("DEPOT_SECTION")
-    lines.append("1")
-    lines.append("-1")
-    lines.append("EOF")
+CLASSICAL_TIME_LIMIT = 20  # seconds given to CP-SAT per request
 
-    out_path.write_text("\n".join(lines), encoding="utf-8")
-    return out_path
+def classical_payload(problem: Dict[str, Any]) -> Dict[str, Any]:
+    """Arguments of classical_OR_2.solve_cvrp_instance for a built problem."""
+    return {
+        "dimension": problem["dimension"],
+        "capacity": problem["capacity"],
+        "coordinates": problem["coordinates"],
+        "demands": problem["demands"],
+        "k": problem["fleet"],
+        "time_limit_seconds": CLASSICAL_TIME_LIMIT,
+        "edge_weight_type": "GEO",  # cities are (lat, lng)
+    }
 
-def execute_classical_solver(problem_path: Path, timeout_sec: int = 300) -> Dict[str, str]:
-    """
-    Calls: python CVRP_Solver.py <problem_path>
-    Returns captured stdout/stderr for debugging in UI if needed.
-    """
-    if not CLASSICAL_SOLVER_PATH.exists():
-        return {"stdout": "", "stderr": f"Solver not found: {CLASSICAL_SOLVER_PATH}"}
+def quantum_payload(problem: Dict[str, Any]) -> Dict[str, Any]:
+    """Arguments of CVRP_Solver.solve_CVRP_instance for a built problem."""
+    return {
+        "coordinates": problem["coordinates"],
+        "demands": problem["demands"],
+        "capacity": problem["capacity"],
+        "num_vehicles": problem["fleet"],
+        "num_nodes": problem["dimension"],
+        "output_file_path": None,  # results come back in memory
+        "problem_name": problem["name"],
+        "edge_weight_type": "GEO",  # cities are (lat, lng)
+    }
 
-    # Use the same interpreter that runs FastAPI (good for venvs)
-    cmd = [sys.executable, str(CLASSICAL_SOLVER_PATH), str(problem_path)]
-    proc = subprocess.run(cmd, capture_output=True, text=True, timeout=timeout_sec)
-    return {"stdout": proc.stdout, "stderr": proc.stderr}
+# ---------- Endpoint ----------
+@app.get("/health")
+async def health():
+    return {**solver_pool.health(), "jobs": job_manager.counts(), "cache": solution_cache.stats()}
 
-def execute_quantum_solver(problem_path: Path, timeout_sec: int = 300) -> Dict[str, str]:
-    """
-    Calls: python CVRP_Solver.py <problem_path>
-    Returns captured stdout/stderr for debugging in UI if needed.
-    """
-    if not SOLVER_PATH.exists():
-        return {"stdout": "", "stderr": f"Solver not found: {SOLVER_PATH}"}
+@app.get("/metrics")
+async def get_metrics():
+    """Prometheus text exposition of requests, jobs, cache, workers and solver stage timings."""
+    out = Exposition()
+    request_metrics.write(out)
+    counts = job_manager.counts()
+    out.gauge("qubitx_jobs", "Jobs held for polling by status",
+              {(("status", status),): n for status, n in counts.items()})
+    out.gauge("qubitx_queue_depth", "Jobs waiting for a solver worker", {(): counts["queued"]})
+    out.counter("qubitx_solver_failures", "Failed solver runs by kind and reason",
+                {(("kind", kind), ("reason", reason)): n
+                 for (kind, reason), n in job_manager.failures.items()})
+    cache = solution_cache.stats()
+    out.counter("qubitx_cache_hits", "Solution cache hits", {(): cache["hits"]})
+    out.counter("qubitx_cache_misses", "Solution cache misses", {(): cache["misses"]})
+    out.counter("qubitx_cache_evictions", "Solution cache evictions", {(): cache["evictions"]})
+    out.gauge("qubitx_cache_entries", "Solutions in the cache", {(): cache["entries"]})
+    pool = solver_pool.health()
+    out.gauge("qubitx_workers", "Solver worker processes by state",
+              {(("state", "alive"),): pool["alive"], (("state", "idle"),): pool["idle"],
+               (("state", "running"),): pool["running"]})
+    out.counter("qubitx_worker_respawns", "Solver workers replaced after a timeout or crash",
+                {(): pool["respawns"]})
+    out.stages("qubitx_stage_seconds", "Solver stage durations", CVRP_Metrics.RECORDER)
+    return Response(out.render(), media_type=CONTENT_TYPE)
 
-    # Use the same interpreter that runs FastAPI (good for venvs)
-    cmd = [sys.executable, str(SOLVER_PATH), str(problem_path)]
-    proc = subprocess.run(cmd, capture_output=True, text=True, timeout=timeout_sec)
-    return {"stdout": proc.stdout, "stderr": proc.stderr}
+@app.post("/warmup")
+def warmup():
+    workers = solver_pool.warmup()
+    return {"ok": all(w["ok"] for w in workers), "workers": workers, **solver_pool.health()}
 
-def parse_solution(solution_path: Path):
+def format_solution(result: Optional[Dict[str, Any]]) -> Dict[str, Any]:
     """
-    Expects a file similar to your sample:
-      Problem: ./Map_Datasets/E-n22-k4.txt
-      ...
-      Cluster N:
-      Path: [1, 15, 22, ...]
-      Length: 93.57
-      ...
-      SUMMARY
-      Total distance: 205.94
-      Total runtime: 13.66 seconds
+    Display fields for the UI from a CVRP_Solver result:
+      paths:   ["Truck #1: 1 → 15 → 22 → ...", ...] for every valid cluster
+      summary: {"Total distance": "205.94", "Total runtime": "13.66", ...}
     """
-    if not solution_path.exists():
-        return {"paths": [], "summary": {}, "raw": ""}
+    if not result:
+        return {"paths": [], "summary": {}}
+    valid = [c["path"] for c in result["clusters"] if c["path"] is not None]
+    paths = [f"Truck #{i+1}: " + " \u2192 ".join(str(node) for node in path)
+             for i, path in enumerate(valid)]
+    summary = {
+        "Total distance": f"{result['totalDistance']:.2f}",
+        "Total runtime": f"{result['runtime']:.2f}",
+        "Average runtime": f"{result['averageRuntime']:.2f}",
+    }
+    return {"paths": paths, "summary": summary}
 
-    text = solution_path.read_text(encoding="utf-8", errors="ignore")
+def quantum_response(problem: Dict[str, Any], run_out: Dict[str, Any]) -> Dict[str, Any]:
+    formatted = format_solution(run_out.get("result"))
+    return {
+        "ok": True,
+        "message": f"Ran solver on {problem['name']}.",
+        "solverStdout": run_out.get("stdout", ""),
+        "solverStderr": run_out.get("stderr", ""),
+        "paths": formatted["paths"],
+        "summary": formatted["summary"],
+        "result": run_out.get("result"),
+    }
 
-    # Extract all "Path: [ ... ]"
-    path_strs = re.findall(r"Path:\s*\[(.*?)\]", text)
-    # Turn into nice display strings ("Truck #1: 1 → 15 → 22 → ...")
-    paths = [f"Truck #{i+1}: " + " \u2192 ".join(s.strip() for s in p.split(","))
-             for i, p in enumerate(path_strs)]
+def classical_response(problem: Dict[str, Any], run_out: Dict[str, Any]) -> Dict[str, Any]:
+    # mirror /run_quantum_solver shape; the UI parses the routes from stdout
+    return {
+        "ok": True,
+        "message": f"Ran classical OR solver on {problem['name']}.",
+        "solverStdout": run_out.get("stdout", ""),
+        "solverStderr": run_out.get("stderr", ""),
+        "result": run_out.get("result"),
+    }
 
-    # Summary
-    def grab(rx):
-        m = re.search(rx, text)
-        return m.group(1).strip() if m else None
+SOLVERS = {
+    "quantum": (quantum_payload, quantum_response),
+    "classical": (classical_payload, classical_response),
+}
 
-    summary = {}
-    td = grab(r"Total distance:\s*([\d.]+)")
-    tr = grab(r"Total runtime:\s*([\d.]+)")
-    ar = grab(r"Average runtime:\s*([\d.]+)")
-    if td: summary["Total distance"] = td
-    if tr: summary["Total runtime"]  = tr
-    if ar: summary["Average runtime"] = ar
+def cache_options(kind: str) -> Dict[str, Any]:
+    """Solver settings that change the answer and so belong in the cache key."""
+    if kind == "quantum":
+        return {"sampler": os.environ.get("CVRP_SAMPLER", "quanfluence")}
+    return {"time_limit_seconds": CLASSICAL_TIME_LIMIT}
 
-    return {"paths": paths, "summary": summary, "raw": text}
+def submit_job(kind: str, req: ProblemRequest):
+    problem = build_problem(req)
+    payload, respond = SOLVERS[kind]
+    key = problem_key(kind, problem, **cache_options(kind))
+    meta = {"problemFile": problem["name"]}
+
+    cached = solution_cache.get(key)
+    if cached is not None:
+        return job_manager.completed(kind, cached, meta={**meta, "cached": True})
+
+    def finalize(run_out: Dict[str, Any]) -> Dict[str, Any]:
+        # Only called for solves that ran to completion, a solver error fails the job
+        content = respond(problem, run_out)
+        solution_cache.set(key, content)
+        return content
+
+    return job_manager.submit(kind, payload(problem), finalize=finalize,
+                              meta={**meta, "cached": False})
+
+# The job handlers touch JobManager state (its asyncio queue and events, the
+# jobs dict), which is only safe on the event loop: they must stay async def
+@app.post("/jobs/{kind}", status_code=202)
+async def create_job(kind: str, req: ProblemRequest):
+    if kind not in SOLVERS:
+        raise HTTPException(status_code=404, detail=f"Unknown solver '{kind}'")
+    return submit_job(kind, req).describe()
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job.describe()
+
+@app.delete("/jobs/{job_id}")
+async def cancel_job(job_id: str):
+    job = job_manager.cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job.describe()
 
-# ---------- Endpoint ----------
 @app.post("/run_quantum_solver")
-def run_quantum_solver(req: ProblemRequest):
-    # 1) write problem file
-    problem_path = write_problem_file(req)
-    print(problem_path)
-    # 2) run solver
-    try:
-        run_out = execute_quantum_solver(problem_path, timeout_sec=600)
-    except subprocess.TimeoutExpired:
-        return JSONResponse(
-            status_code=504,
-            content={
-                "ok": False,
-                "message": "Solver timed out.",
-                "problemFile": problem_path.name,
-            },
-        )
-    except subprocess.CalledProcessError as e:
-        return JSONResponse(
-            status_code=500,
-            content={
-                "ok": False,
-                "message": "Solver crashed.",
-                "problemFile": problem_path.name,
-                "stderr": getattr(e, "stderr", ""),
-            },
-        )
-
-    # 3) parse solution file (your solver writes CVRP_solution.txt in project root)
-    parsed = parse_solution(SOLUTION_PATH)
-
-    return JSONResponse({
-        "ok": True,
-        "message": f"Saved {problem_path.name} and ran solver.",
-        "problemFile": problem_path.name,
-        "solverStdout": run_out.get("stdout", ""),
-        "solverStderr": run_out.get("stderr", ""),
-        "paths": parsed["paths"],
-        "summary": parsed["summary"],
-    })
+async def run_quantum_solver(req: ProblemRequest):
+    job = submit_job("quantum", req)
+    await job.wait()
+    return JSONResponse(status_code=job.status_code, content=job.content)
 
 @app.post("/run_or_solver")
-def run_or_solver(req: ProblemRequest):
-    # 1) write problem file
-    problem_path = write_problem_file(req)
-    print(problem_path)
-    # 2) run solver
-    try:
-        run_out = execute_classical_solver(problem_path, timeout_sec=600)
-    except subprocess.TimeoutExpired:
-        return JSONResponse(
-            status_code=504,
-            content={
-                "ok": False,
-                "message": "Solver timed out.",
-                "problemFile": problem_path.name,
-            },
-        )
-    except subprocess.CalledProcessError as e:
-        return JSONResponse(
-            status_code=500,
-            content={
-                "ok": False,
-                "message": "Solver crashed.",
-                "problemFile": problem_path.name,
-                "stderr": getattr(e, "stderr", ""),
-            },
-        )
-    # 3) parse solution file if your classical solver writes one
-    # parsed = parse_solution(SOLUTION_PATH)
-
-    # 4) respond (mirror /run_quantum_solver shape)
-    return JSONResponse({
-        "ok": True,
-        "message": f"Saved {problem_path.name} and ran classical OR solver.",
-        "problemFile": problem_path.name,
-        "solverStdout": run_out.get("stdout", ""),
-        "solverStderr": run_out.get("stderr", ""),
-        # "paths": parsed["paths"],
-        # "summary": parsed["summary"],
-    })
\ No newline at end of file
+async def run_or_solver(req: ProblemRequest):
+    job = submit_job("classical", req)
+    await job.wait()
+    return JSONResponse(status_code=job.status_code, content=job.content)
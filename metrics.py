@@ -0,0 +1,93 @@
+"""
+Prometheus metrics of the FastAPI backend.
+
+Samples are kept in process and rendered in the Prometheus text exposition
+format, so /metrics needs no client library. Solver stage timings come from
+CVRP_Metrics.RECORDER, into which the worker pool merges the spans of each job.
+"""
+
+from collections import Counter
+from typing import Dict, Iterable, List, Tuple
+import math
+import threading
+
+from CVRP_Metrics import BUCKETS, Histogram, Labels, StageRecorder
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: Labels) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(str(value))}"' for key, value in labels) + "}"
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class Exposition:
+    """Lines of one /metrics response, one metric family at a time."""
+
+    def __init__(self):
+        self.lines: List[str] = []
+
+    def _family(self, name: str, kind: str, help: str) -> None:
+        self.lines.append(f"# HELP {name} {help}")
+        self.lines.append(f"# TYPE {name} {kind}")
+
+    def counter(self, name: str, help: str, samples: Dict[Labels, float]) -> None:
+        self._family(name, "counter", help)
+        for labels, value in sorted(samples.items()):
+            self.lines.append(f"{name}_total{_format_labels(labels)} {_format_value(value)}")
+
+    def gauge(self, name: str, help: str, samples: Dict[Labels, float]) -> None:
+        self._family(name, "gauge", help)
+        for labels, value in sorted(samples.items()):
+            self.lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+
+    def histogram(self, name: str, help: str, samples: Iterable[Tuple[Labels, Histogram]]) -> None:
+        self._family(name, "histogram", help)
+        for labels, histogram in samples:
+            cumulative = 0
+            for bound, count in zip(BUCKETS, histogram.counts):
+                cumulative += count
+                bucket = labels + (("le", _format_value(bound)),)
+                self.lines.append(f"{name}_bucket{_format_labels(bucket)} {cumulative}")
+            self.lines.append(f"{name}_sum{_format_labels(labels)} {_format_value(histogram.sum)}")
+            self.lines.append(f"{name}_count{_format_labels(labels)} {cumulative}")
+
+    def stages(self, name: str, help: str, recorder: StageRecorder) -> None:
+        """Histograms of a StageRecorder, the stage as a label."""
+        self.histogram(name, help, [((("stage", stage),) + labels, histogram)
+                                    for stage, labels, histogram in recorder.items()])
+
+    def render(self) -> str:
+        return "\n".join(self.lines) + "\n"
+
+
+class RequestMetrics:
+    """Thread-safe count and latency of HTTP requests by method, route and status."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counts: Counter = Counter()
+        self.latency = StageRecorder()
+
+    def observe(self, method: str, route: str, status: int, seconds: float) -> None:
+        with self._lock:
+            self.counts[(("method", method), ("route", route), ("status", str(status)))] += 1
+        self.latency.observe("request", seconds, (("method", method), ("route", route)))
+
+    def write(self, exposition: Exposition) -> None:
+        with self._lock:
+            counts = dict(self.counts)
+        exposition.counter("qubitx_http_requests", "HTTP requests by method, route and status", counts)
+        exposition.histogram("qubitx_http_request_duration_seconds", "HTTP request latency",
+                             ((labels, histogram) for _, labels, histogram in self.latency.items()))
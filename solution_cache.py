@@ -0,0 +1,137 @@
+"""
+Content-addressed cache of solver responses for the FastAPI backend.
+
+Responses are keyed on a hash of the normalized problem, so re-submitting the
+same cities, demands, capacity and fleet to the same solver skips the solve.
+Entries live in an in-memory LRU with a TTL and, when a directory is given,
+are also written to disk so they survive a restart.
+"""
+
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional, Union
+import hashlib
+import json
+import os
+import threading
+import time
+
+
+def problem_key(solver: str, problem: Dict[str, Any], precision: int = 4,
+                **options: Any) -> str:
+    """
+    Hash a built problem (see main.build_problem) for one solver.
+
+    Node order is kept rather than sorted: node IDs label the returned routes,
+    so a reordered city list is a different answer. City names are ignored and
+    coordinates are rounded to `precision` decimals.
+    """
+    canonical = {
+        "solver": solver,
+        "options": options,
+        "capacity": int(problem["capacity"]),
+        "fleet": int(problem["fleet"]),
+        "nodes": [
+            [int(node), round(float(lat), precision), round(float(lng), precision),
+             int(problem["demands"].get(node, 0))]
+            for node, (lat, lng) in sorted(problem["coordinates"].items())
+        ],
+    }
+    blob = json.dumps(canonical, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+class SolutionCache:
+    """
+    Thread-safe LRU cache with TTL, size limits and optional disk persistence.
+
+    Args:
+        max_entries: In-memory entries kept before the least recently used is evicted
+        ttl: Seconds an entry stays valid, None for no expiry
+        directory: Where entries are persisted as <key>.json, None for memory only
+        max_disk_entries: Files kept on disk before the oldest are removed
+    """
+
+    def __init__(self, max_entries: int = 256, ttl: Optional[float] = 24 * 3600,
+                 directory: Union[str, Path, None] = None, max_disk_entries: int = 4096):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.directory = Path(directory) if directory else None
+        self.max_disk_entries = max_disk_entries
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()  # key -> (created, value)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        if self.directory:
+            self.directory.mkdir(parents=True, exist_ok=True)
+
+    def _expired(self, created: float) -> bool:
+        return self.ttl is not None and time.time() - created > self.ttl
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.json"
+
+    def _load(self, key: str) -> Optional[tuple]:
+        if not self.directory:
+            return None
+        try:
+            entry = json.loads(self._path(key).read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        return entry["created"], entry["value"]
+
+    def _store(self, key: str, created: float, value: Dict[str, Any]) -> None:
+        path = self._path(key)
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(json.dumps({"created": created, "value": value}), encoding="utf-8")
+        os.replace(tmp, path)
+        files = sorted(self.directory.glob("*.json"), key=lambda p: p.stat().st_mtime)
+        for old in files[: max(len(files) - self.max_disk_entries, 0)]:
+            old.unlink(missing_ok=True)
+
+    def _put(self, key: str, entry: tuple) -> None:
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get(key) or self._load(key)
+            if entry is None or self._expired(entry[0]):
+                if entry is not None:
+                    self._entries.pop(key, None)
+                    if self.directory:
+                        self._path(key).unlink(missing_ok=True)
+                self.misses += 1
+                return None
+            self._put(key, entry)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key: str, value: Dict[str, Any]) -> None:
+        created = time.time()
+        with self._lock:
+            self._put(key, (created, value))
+            if self.directory:
+                self._store(key, created, value)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            if self.directory:
+                for path in self.directory.glob("*.json"):
+                    path.unlink(missing_ok=True)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hitRate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "persistent": self.directory is not None,
+        }
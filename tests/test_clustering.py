@@ -0,0 +1,21 @@
+from CVRP_Clustering_V4 import CVRPCapacitatedKMeans, CVRPSweepCluster
+
+# Seven 6s and two 4s into five vehicles of 10: k-means cannot repair this one
+TIGHT_COORDINATES = {1: (26.0, 30.0), 2: (81.0, 9.0), 3: (60.0, 73.0), 4: (19.0, 6.0), 5: (27.0, 66.0),
+                     6: (56.0, 15.0), 7: (43.0, 67.0), 8: (42.0, 63.0), 9: (97.0, 68.0), 10: (39.0, 19.0)}
+TIGHT_DEMANDS = {1: 0, 2: 4, 3: 4, 4: 6, 5: 6, 6: 6, 7: 6, 8: 6, 9: 6, 10: 6}
+
+
+def test_kmeans_clusters_stay_within_tight_capacity():
+    clusterer = CVRPCapacitatedKMeans(TIGHT_COORDINATES, TIGHT_DEMANDS, capacity=10, num_vehicles=5)
+    clusters, demands = clusterer.create_clusters()
+    assert max(demands) <= 10
+    sweep = CVRPSweepCluster(TIGHT_COORDINATES, TIGHT_DEMANDS, capacity=10, num_vehicles=5)
+    assert (clusters, demands) == sweep.create_clusters()
+
+
+def test_kmeans_covers_every_customer_with_room_to_spare():
+    clusterer = CVRPCapacitatedKMeans(TIGHT_COORDINATES, TIGHT_DEMANDS, capacity=20, num_vehicles=5)
+    clusters, demands = clusterer.create_clusters()
+    assert max(demands) <= 20
+    assert sorted(node for cluster in clusters for node in cluster) == list(range(2, 11))
@@ -0,0 +1,28 @@
+import numpy as np
+import pytest
+
+from CVRP_Penalty import PenaltyCache, calibrate_multiplier, penalty_bounds
+
+
+def random_distances(n, seed):
+    points = np.random.default_rng(seed).uniform(0, 100, size=(n, 2))
+    return np.linalg.norm(points[:, None] - points[None, :], axis=-1)
+
+
+@pytest.mark.parametrize("n", [3, 8, 12, 16])
+@pytest.mark.parametrize("mode", ["bounds", "feedback"])
+def test_uncached_multiplier_is_above_lower_bound(n, mode):
+    distances = random_distances(n, seed=n)
+    lower, _ = penalty_bounds(distances)
+    multiplier = calibrate_multiplier(distances, mode, evaluate=lambda m: 1.0, cache=PenaltyCache())
+    assert multiplier * distances.mean() > lower
+
+
+def test_feedback_caches_factor_for_size_bucket():
+    cache = PenaltyCache()
+    distances = random_distances(9, seed=0)
+    rates = iter([0.0, 0.2, 0.9])
+    first = calibrate_multiplier(distances, 'feedback', evaluate=lambda m: next(rates), cache=cache)
+    again = calibrate_multiplier(distances, 'bounds', cache=cache)
+    assert again == pytest.approx(first)
+    assert first * distances.mean() > penalty_bounds(distances)[0]
@@ -0,0 +1,330 @@
+"""
+Pool of warm solver worker processes for the FastAPI backend.
+
+Each worker imports the solver modules once at startup and then serves jobs
+sent over a pipe, so a request no longer pays for a fresh interpreter and the
+numpy / ortools imports. A job that runs past its timeout, or a worker
+that dies, is killed and replaced by a fresh worker, and a running job can be
+cancelled by killing its worker. Each worker leads its own process group and
+is killed with it, so nothing a solve started outlives the worker. With
+metrics on, workers record solver stage spans (CVRP_Metrics) and return them
+with each job, merged into this process.
+"""
+
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import contextlib
+import importlib
+import io
+import multiprocessing as mp
+import os
+import queue
+import signal
+import threading
+import time
+import traceback
+
+import CVRP_Metrics
+
+WARM_MODULES = ("numpy", "CVRP_Solver", "classical_OR_2")
+CANCEL_POLL = 0.5  # seconds between cancel checks while waiting for a worker
+
+
+class WorkerCrashed(RuntimeError):
+    """Raised when a worker process exits while running a job."""
+
+
+class JobCancelled(RuntimeError):
+    """Raised by run() when its job was cancelled and the worker killed."""
+
+
+def _run_quantum(problem: Dict[str, Any]) -> Dict[str, Any]:
+    import CVRP_Solver
+    # The pool already runs solves in parallel processes; clusters share the
+    # worker's threads instead of starting processes and shared memory of their own
+    return CVRP_Solver.solve_CVRP_instance(**{"executor": "thread", **problem})
+
+
+def _run_classical(problem: Dict[str, Any]) -> Dict[str, Any]:
+    import classical_OR_2
+    from ortools.sat.python import cp_model
+    status_names = {cp_model.OPTIMAL: "OPTIMAL", cp_model.FEASIBLE: "FEASIBLE",
+                    cp_model.INFEASIBLE: "INFEASIBLE", cp_model.MODEL_INVALID: "MODEL_INVALID",
+                    cp_model.UNKNOWN: "UNKNOWN"}
+    start = time.time()
+    routes, total_distance, status = classical_OR_2.solve_cvrp_instance(**problem)
+    runtime = time.time() - start
+    # Same tail as the classical_OR_2 script; the UI reads the runtime from stdout
+    print(f"\nFinal Results:")
+    print(f"Total distance: {total_distance:.2f}")
+    print(f"Actual Runtime: {runtime:.2f}s")
+    return {
+        # The model numbers nodes from 0; node IDs start at 1 with the depot
+        "routes": [[node + 1 for node in route] for route in routes],
+        "totalDistance": total_distance,
+        "status": status_names.get(status, str(status)),
+        "timings": {"total": runtime},
+    }
+
+
+JOBS: Dict[str, Callable[[Dict[str, Any]], Dict[str, Any]]] = {
+    "quantum": _run_quantum,
+    "classical": _run_classical,
+}
+
+
+def _worker_main(conn, warm_modules: Tuple[str, ...], metrics: bool = False) -> None:
+    """Worker loop: import the solvers, report ready, then serve jobs until stopped."""
+    if hasattr(os, "setsid"):
+        os.setsid()  # own process group, see _Worker.kill_group
+    CVRP_Metrics.enable(metrics)
+    loaded, failed = [], {}
+    for name in warm_modules:
+        try:
+            importlib.import_module(name)
+            loaded.append(name)
+        except Exception as e:
+            failed[name] = repr(e)
+    conn.send(("ready", {"pid": os.getpid(), "loaded": loaded, "failed": failed}))
+
+    while True:
+        try:
+            kind, payload = conn.recv()
+        except (EOFError, KeyboardInterrupt):
+            break
+        if kind == "stop":
+            break
+        if kind == "ping":
+            conn.send(("ok", {"pid": os.getpid()}))
+            continue
+
+        stdout = io.StringIO()
+        try:
+            with contextlib.redirect_stdout(stdout):
+                result = JOBS[kind](payload)
+            reply = ("ok", {"result": result, "stdout": stdout.getvalue(), "stderr": ""})
+        except Exception:
+            reply = ("error", {"result": None, "stdout": stdout.getvalue(),
+                               "stderr": traceback.format_exc()})
+        if metrics:
+            reply[1]["metrics"] = CVRP_Metrics.RECORDER.drain()
+        conn.send(reply)
+
+
+class _Worker:
+    """Handle on one worker process and its pipe."""
+
+    def __init__(self, ctx, warm_modules: Tuple[str, ...], metrics: bool = False):
+        self.conn, child_conn = ctx.Pipe()
+        self.process = ctx.Process(target=_worker_main, args=(child_conn, warm_modules, metrics),
+                                   name="solver-worker")
+        self.process.start()
+        child_conn.close()
+        self.info: Optional[Dict[str, Any]] = None
+        self.jobs = 0
+        self.cancelled = False
+
+    def recv(self, deadline: float) -> Tuple[str, Dict[str, Any]]:
+        """Receive the next reply before deadline, consuming the startup message."""
+        while True:
+            if not self.conn.poll(max(deadline - time.monotonic(), 0)):
+                raise TimeoutError("Worker did not reply in time")
+            status, data = self.conn.recv()
+            if status != "ready":
+                return status, data
+            self.info = data
+
+    def kill_group(self) -> None:
+        """SIGKILL the worker and every process it started, without waiting."""
+        if hasattr(os, "killpg"):
+            try:
+                # Before join() the worker's pid, and so its group id, cannot be reused
+                os.killpg(self.process.pid, signal.SIGKILL)
+            except (ProcessLookupError, PermissionError):
+                pass
+        if self.process.is_alive():
+            self.process.kill()
+
+    def kill(self) -> None:
+        self.kill_group()
+        self.process.join()
+        self.conn.close()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        try:
+            self.conn.send(("stop", None))
+        except (OSError, ValueError):
+            pass
+        self.process.join(timeout)
+        self.kill()
+
+
+class SolverWorkerPool:
+    """
+    Fixed-size pool of warm solver processes.
+
+    run() hands a job to the next idle worker and blocks until it answers, the
+    timeout passes (the worker is killed and respawned, TimeoutError is raised)
+    or the worker dies (it is respawned and WorkerCrashed is raised).
+    With metrics, the stage spans of every finished job are merged into
+    CVRP_Metrics.RECORDER of this process.
+    """
+
+    def __init__(self, size: int = 2, warm_modules: Tuple[str, ...] = WARM_MODULES,
+                 metrics: bool = False):
+        self.size = size
+        self.warm_modules = warm_modules
+        self.metrics = metrics
+        self._ctx = mp.get_context("spawn")
+        self._idle: "queue.Queue[_Worker]" = queue.Queue()
+        self._workers: List[_Worker] = []
+        self._running: Dict[str, _Worker] = {}
+        self._lock = threading.Lock()
+        self.respawns = 0
+
+    def start(self) -> None:
+        for _ in range(self.size):
+            self._idle.put(self._spawn())
+
+    def _spawn(self) -> _Worker:
+        worker = _Worker(self._ctx, self.warm_modules, self.metrics)
+        with self._lock:
+            self._workers.append(worker)
+        return worker
+
+    def _replace(self, worker: _Worker) -> None:
+        worker.kill()
+        with self._lock:
+            if worker not in self._workers:
+                return  # pool is shutting down
+            self._workers.remove(worker)
+            self.respawns += 1
+        self._idle.put(self._spawn())
+
+    def run(self, kind: str, payload: Dict[str, Any], timeout: float = 600,
+            job_id: Optional[str] = None,
+            cancelled: Optional[Callable[[], bool]] = None) -> Dict[str, Any]:
+        """
+        Run one job on a warm worker.
+
+        job_id, when given, lets cancel() stop the job while it runs.
+        cancelled, when given, is polled while waiting for a worker and once
+        more before the job is sent; if it returns True, JobCancelled is
+        raised and nothing runs. Set it before calling cancel(job_id), then
+        a cancel at any point either stops the worker or the send.
+
+        Returns:
+            dict: {"ok", "result", "stdout", "stderr"}; ok is False when the
+            solver raised, with the traceback in stderr
+        """
+        if kind not in JOBS:
+            raise ValueError(f"Unknown job kind '{kind}', expected one of {sorted(JOBS)}")
+        deadline = time.monotonic() + timeout
+        while True:
+            if cancelled is not None and cancelled():
+                raise JobCancelled(f"Job {job_id} was cancelled before it started")
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise TimeoutError("No solver worker became available in time")
+            try:
+                worker = self._idle.get(timeout=min(remaining, CANCEL_POLL))
+                break
+            except queue.Empty:
+                pass
+        with self._lock:
+            # Checked under the lock cancel() takes, so a cancel lands either here or on the worker
+            if cancelled is not None and cancelled():
+                self._idle.put(worker)
+                raise JobCancelled(f"Job {job_id} was cancelled before it started")
+            if job_id is not None:
+                self._running[job_id] = worker
+        try:
+            worker.conn.send((kind, payload))
+            status, data = worker.recv(deadline)
+        except TimeoutError:
+            self._release(job_id)
+            self._replace(worker)
+            raise
+        except (EOFError, OSError) as e:
+            self._release(job_id)
+            self._replace(worker)
+            if worker.cancelled:
+                raise JobCancelled(f"Job {job_id} was cancelled") from e
+            raise WorkerCrashed(f"Solver worker exited: {e!r}") from e
+        # From here on cancel() refuses; a cancel that got in before still killed the worker
+        if self._release(job_id):
+            self._replace(worker)
+            raise JobCancelled(f"Job {job_id} was cancelled")
+        worker.jobs += 1
+        self._idle.put(worker)
+        spans = data.pop("metrics", None)
+        if spans:
+            CVRP_Metrics.RECORDER.merge(spans)
+        return {"ok": status == "ok", **data}
+
+    def _release(self, job_id: Optional[str]) -> bool:
+        """Unregister job_id from cancel(); True if it was cancelled before that."""
+        if job_id is None:
+            return False
+        with self._lock:
+            worker = self._running.pop(job_id, None)
+            return worker is not None and worker.cancelled
+
+    def cancel(self, job_id: str) -> bool:
+        """
+        Kill the worker running job_id, so that its run() raises JobCancelled.
+
+        Returns False if job_id is not on a worker, or its reply has already
+        arrived; run() then returns or raises as it would have anyway.
+        """
+        with self._lock:
+            worker = self._running.get(job_id)
+            if worker is None:
+                return False
+            worker.cancelled = True
+            # Under the lock, so run() cannot reap and reuse the pid in between
+            worker.kill_group()
+        return True
+
+    def warmup(self, timeout: float = 60) -> List[Dict[str, Any]]:
+        """Ping every idle worker, waiting for its imports to finish, and report latency."""
+        idle = []
+        while True:
+            try:
+                idle.append(self._idle.get_nowait())
+            except queue.Empty:
+                break
+
+        report = []
+        for worker in idle:
+            start = time.monotonic()
+            try:
+                worker.conn.send(("ping", None))
+                worker.recv(start + timeout)
+            except (TimeoutError, EOFError, OSError) as e:
+                report.append({"pid": worker.process.pid, "ok": False, "error": repr(e)})
+                self._replace(worker)
+                continue
+            report.append({"pid": worker.process.pid, "ok": True,
+                           "latencyMs": round((time.monotonic() - start) * 1000, 2)})
+            self._idle.put(worker)
+        return report
+
+    def health(self) -> Dict[str, Any]:
+        with self._lock:
+            workers = list(self._workers)
+        return {
+            "size": self.size,
+            "alive": sum(w.process.is_alive() for w in workers),
+            "idle": self._idle.qsize(),
+            "running": len(self._running),
+            "respawns": self.respawns,
+            "workers": [{"pid": w.process.pid, "alive": w.process.is_alive(),
+                         "warm": w.info is not None, "jobs": w.jobs,
+                         "failedImports": (w.info or {}).get("failed", {})} for w in workers],
+        }
+
+    def shutdown(self) -> None:
+        with self._lock:
+            workers, self._workers = list(self._workers), []
+        for worker in workers:
+            worker.stop()